@@ -0,0 +1,81 @@
+import json
+import sys
+from argparse import ArgumentParser
+from os.path import abspath, dirname
+from subprocess import run
+
+
+# Modules of the computation core, which are imported by the batch workers
+CORE_MODULE_LIST = [
+    "layer_centrality",
+    "layer_centrality.utils.centrality_helpers",
+    "layer_centrality.utils.dataset_helpers",
+    "layer_centrality.utils.snapshot_helpers",
+    "layer_centrality.algo.core.layer_centrality",
+    "layer_centrality.algo.core.temporal_layer_centrality"
+]
+
+# Dependencies which are only needed for plotting, clustering and data frames, and must not be imported by the core
+HEAVY_MODULE_LIST = ["matplotlib", "seaborn", "sklearn", "pandas", "uunet"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start_time = time.perf_counter()
+for module_name in {0!r}:
+    __import__(module_name)
+print(json.dumps({{'import_time': time.perf_counter() - start_time, 'module_list': sorted(sys.modules)}}))
+"""
+
+
+def measure_import_time(module_list):
+    """
+    Imports modules in a new interpreter, so that no module is already imported.
+
+    :param module_list: List of module names.
+    :return: Tuple of the import time in seconds and of the list of all modules imported by the interpreter.
+    """
+
+    completed_process = run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(module_list)], capture_output=True, text=True, check=True,
+        cwd=dirname(dirname(abspath(__file__))))
+    result_dict = json.loads(completed_process.stdout)
+
+    return result_dict['import_time'], result_dict['module_list']
+
+
+def main():
+    argument_parser = ArgumentParser(description="Measures the import time of the computation core and checks that "
+                                                 "it does not import the plotting, clustering and data frame stack.")
+    argument_parser.add_argument("--repeat", type=int, default=5, help="Number of measured imports.")
+    argument_parser.add_argument("--max-import-time", type=float, default=None,
+                                 help="Fail if the best import time, in seconds, exceeds this value.")
+    arguments = argument_parser.parse_args()
+
+    import_time_list = []
+    imported_heavy_module_set = set()
+
+    for _ in range(arguments.repeat):
+        import_time, imported_module_list = measure_import_time(CORE_MODULE_LIST)
+
+        import_time_list.append(import_time)
+        imported_heavy_module_set.update(
+            heavy_module for heavy_module in HEAVY_MODULE_LIST if heavy_module in imported_module_list)
+
+    print("Core import time: best {0:.3f}s, median {1:.3f}s over {2} runs".format(
+        min(import_time_list), sorted(import_time_list)[len(import_time_list) // 2], len(import_time_list)))
+
+    failed = False
+
+    if imported_heavy_module_set:
+        print("The core imports {0}".format(", ".join(sorted(imported_heavy_module_set))))
+        failed = True
+
+    if arguments.max_import_time is not None and min(import_time_list) > arguments.max_import_time:
+        print("The core import time exceeds {0:.3f}s".format(arguments.max_import_time))
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,21 @@
-from .clustering import *
-from .core import *
-from .functions import *
+from layer_centrality.utils.import_helpers import attach_lazy_submodules
+
+
+# The subpackages are imported when one of their names is first accessed, so that the core does not import the
+# clustering dependencies
+__getattr__, __dir__, __all__ = attach_lazy_submodules(__name__, {
+    'clustering': ['create_layer_combinations_node_communities', 'compute_layer_combinations_node_communities',
+        'compute_flattened_layer_combination_node_community', 'compute_clusters', 'perform_pca', 'analyze_pca',
+        'perform_kmeans', 'analyze_kmeans', 'UncertainDBSCANHelper'],
+    'core': ['compute_multinet_layer_centrality', 'compute_shapley_weight_list',
+        'create_layer_type_game_tuple', 'compute_layer_type_coalition_weight_array',
+        'compute_pruned_multinet_layer_centrality_for_node', 'compute_degree_multinet_layer_centrality',
+        'compute_degree_layer_centrality_matrix', 'create_degree_nodes_layer_centrality_dict',
+        'compute_vectorized_multinet_layer_centrality', 'compute_multinet_layer_centrality_for_nodes',
+        'iterate_multinet_layer_centrality', 'update_multinet_layer_centrality', 'update_multinet_layers_centrality',
+        'create_coalition_node_value_matrix', 'compute_shapley_value_matrix',
+        'compute_layer_centrality_percentage_matrix', 'compute_sampled_multinet_layer_centrality',
+        'compute_snapshot_edge_delta_dict', 'can_apply_snapshot_edge_delta',
+        'compute_temporal_multinet_layer_centrality'],
+    'functions': ['compute_shannon_entropy', 'kl_divergence', 'js_divergence']
+})
@@ -1,3 +1,11 @@
-from .communities_clustering import *
-from .kmeans_clustering import *
-from .UncertainDBSCANHelper import *
+from layer_centrality.utils.import_helpers import attach_lazy_submodules
+
+
+# The submodules are imported when one of their names is first accessed, so that importing the package does not
+# import scikit-learn, seaborn and matplotlib
+__getattr__, __dir__, __all__ = attach_lazy_submodules(__name__, {
+    'communities_clustering': ['create_layer_combinations_node_communities',
+        'compute_layer_combinations_node_communities', 'compute_flattened_layer_combination_node_community'],
+    'kmeans_clustering': ['compute_clusters', 'perform_pca', 'analyze_pca', 'perform_kmeans', 'analyze_kmeans'],
+    'UncertainDBSCANHelper': ['UncertainDBSCANHelper']
+})
@@ -1,6 +1,5 @@
-from itertools import combinations
-from uunet.multinet import empty, add_nx_layer, flatten, layers, to_nx_dict
 from networkx.algorithms.community import greedy_modularity_communities
+from layer_centrality.utils.coalition_helpers import CoalitionIndex, flatten_layer_combination
 from layer_centrality.utils.result_helpers import draw_network_clustering_results
 
 
@@ -20,11 +19,12 @@ def create_layer_combinations_node_communities(
 
     node_cluster_label_dict_list = []
 
+    coalition_index = CoalitionIndex(nx_layer_dict.keys())
+
     # Generate all possible layer combinations of all possible lengths
     for i in range(len(nx_layer_dict)):
-        layer_combination_tuple_list = list(combinations(nx_layer_dict.keys(), i + 1))
-        compute_layer_combinations_node_communities(data_set_name, nx_layer_dict,
-            layer_combination_tuple_list, node_cluster_label_dict_list, save_to_path)
+        compute_layer_combinations_node_communities(data_set_name, nx_layer_dict, coalition_index,
+            list(coalition_index.get_coalition_masks(i + 1)), node_cluster_label_dict_list, save_to_path)
 
     return node_cluster_label_dict_list
 
@@ -32,26 +32,27 @@ def create_layer_combinations_node_communities(
 def compute_layer_combinations_node_communities(
         data_set_name,
         nx_layer_dict,
-        layer_combination_tuple_list,
+        coalition_index,
+        coalition_mask_list,
         node_cluster_label_dict_list,
         save_to_path
 ):
     """
-    Computes the node communities for each layer combination in :param layer_combination_tuple_list. Each tuple
-    is sorted in lexicographic order. The layer combinations are flattened to avoid duplicate connections.
+    Computes the node communities for each layer combination in :param coalition_mask_list. The layer combinations
+    are flattened to avoid duplicate connections.
 
     :param data_set_name: Name of the data set.
     :param nx_layer_dict: Multilayer network layer dictionary.
-    :param layer_combination_tuple_list: List of tuples containing layer combinations of same length.
+    :param coalition_index: Coalition index of the multilayer network.
+    :param coalition_mask_list: List of coalition bitmasks of layer combinations of same length.
     :param node_cluster_label_dict_list: List of dictionaries containing node clusters.
     :param save_to_path: Disk path for saving the plots.
     :return: void
     """
 
-    for layer_combination_tuple in layer_combination_tuple_list:
-        compute_flattened_layer_combination_node_community(data_set_name,
-            nx_layer_dict, layer_combination_tuple, node_cluster_label_dict_list, save_to_path)
-        # print(''.join(sorted(list(layerTuple))), layerTupleDict[''.join(sorted(list(layerTuple)))])
+    for coalition_mask in coalition_mask_list:
+        compute_flattened_layer_combination_node_community(data_set_name, nx_layer_dict,
+            coalition_index.get_coalition_layers(coalition_mask), node_cluster_label_dict_list, save_to_path)
 
 
 def compute_flattened_layer_combination_node_community(
@@ -72,13 +73,6 @@ def compute_flattened_layer_combination_node_community(
     :return: void
     """
 
-    temp_multilayered_network = empty()
-
-    for layer in layer_combination_tuple:
-        add_nx_layer(temp_multilayered_network, nx_layer_dict[layer], layer)
-
-    flatten(temp_multilayered_network, "flattened_layer", layers=layers(temp_multilayered_network))
-
     flattened_layer_name = ''
 
     for layer_name_index in range(0, len(layer_combination_tuple)):
@@ -86,7 +80,7 @@ def compute_flattened_layer_combination_node_community(
         if layer_name_index != (len(layer_combination_tuple)-1):
             flattened_layer_name += '_'
 
-    flattened_layer = to_nx_dict(temp_multilayered_network)["flattened_layer"]
+    flattened_layer = flatten_layer_combination(nx_layer_dict, layer_combination_tuple)
 
     c = list(greedy_modularity_communities(flattened_layer))
 
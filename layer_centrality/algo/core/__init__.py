@@ -1 +1,16 @@
-from .layer_centrality import *
+from layer_centrality.utils.import_helpers import attach_lazy_submodules
+
+
+# The submodules are imported when one of their names is first accessed
+__getattr__, __dir__, __all__ = attach_lazy_submodules(__name__, {
+    'layer_centrality': ['compute_multinet_layer_centrality', 'compute_shapley_weight_list',
+        'create_layer_type_game_tuple', 'compute_layer_type_coalition_weight_array',
+        'compute_pruned_multinet_layer_centrality_for_node', 'compute_degree_multinet_layer_centrality',
+        'compute_degree_layer_centrality_matrix', 'create_degree_nodes_layer_centrality_dict',
+        'compute_vectorized_multinet_layer_centrality', 'compute_multinet_layer_centrality_for_nodes',
+        'iterate_multinet_layer_centrality', 'update_multinet_layer_centrality', 'update_multinet_layers_centrality',
+        'create_coalition_node_value_matrix', 'compute_shapley_value_matrix',
+        'compute_layer_centrality_percentage_matrix', 'compute_sampled_multinet_layer_centrality'],
+    'temporal_layer_centrality': ['compute_snapshot_edge_delta_dict', 'can_apply_snapshot_edge_delta',
+        'compute_temporal_multinet_layer_centrality']
+})
@@ -1,10 +1,25 @@
-from itertools import permutations
-from uunet.multinet import to_nx_dict, read, vertices
+from itertools import islice
+from fractions import Fraction
+from math import factorial
+from statistics import NormalDist
+from time import perf_counter
+from numpy import arange, array, asarray, bincount, flatnonzero, full, isnan, nan, nansum, sqrt, where, zeros
+from numpy.random import default_rng
+from layer_centrality.utils.centrality_helpers import DegreeCentralityHelper
+from layer_centrality.utils.store_helpers import CoalitionValueMapping
 
 
 def compute_multinet_layer_centrality(nx_layer_dict, nodes, centrality_helper):
     """
-    Computes the layer centrality for each node in a given multilayer network.
+    Computes the layer centrality for each node in a given multilayer network, i.e. the Shapley value of each layer
+    in the game whose value on a coalition of layers is the centrality of the node on the flattened coalition. A
+    marginal contribution is only taken into account when the node is present in both the coalition and the
+    coalition joined by the layer, the empty coalition counting as present, which gives the same values as averaging
+    over all layer permutations in order of arrival. The values are returned as percentages of their sum.
+
+    When :param centrality_helper holds the values of all layer combinations without a memory budget, e.g. after
+    precomputing them, all nodes are evaluated at once by compute_vectorized_multinet_layer_centrality. Otherwise
+    the nodes are evaluated one by one, so that only the layer combinations on which a node is present are evaluated.
 
     :param nx_layer_dict: Multilayer network layer dictionary.
     :param nodes: List containing all nodes for which the layer centrality is computed.
@@ -12,92 +27,774 @@ def compute_multinet_layer_centrality(nx_layer_dict, nodes, centrality_helper):
     :return: Dictionary of dictionaries containing the centrality of each layer for each node in :param nodes.
     """
 
-    nodes_layer_centrality_dict = {}
+    if isinstance(centrality_helper, DegreeCentralityHelper):
+        return compute_degree_multinet_layer_centrality(nodes, centrality_helper.layer_adjacency)
 
-    layer_combinations_tuple_dict = \
-        centrality_helper.layer_combinations_node_centrality_dict
+    # Group the identical layers once, shared by all nodes
+    layer_type_game_tuple = create_layer_type_game_tuple(centrality_helper.layer_adjacency)
+    coalition_node_centrality_dict = centrality_helper.coalition_node_centrality_dict
 
-    # Generate all possible layer permutations
-    layer_permutations_tuple_list = list(permutations(nx_layer_dict.keys(), len(nx_layer_dict)))
+    if getattr(coalition_node_centrality_dict, 'memory_budget', None) is None and all(
+            int(coalition_mask) in coalition_node_centrality_dict for coalition_mask in layer_type_game_tuple[2][1:]):
+        return compute_vectorized_multinet_layer_centrality(
+            nx_layer_dict, nodes, centrality_helper, layer_type_game_tuple=layer_type_game_tuple)
+
+    nodes_layer_centrality_dict = {}
+    coalition_weight_array_dict = {}
 
     for node in nodes:
-        nodes_layer_centrality_dict[node] = compute_multinet_layer_centrality_for_node(
-            nx_layer_dict, layer_combinations_tuple_dict, layer_permutations_tuple_list, node)
+        nodes_layer_centrality_dict[node] = compute_pruned_multinet_layer_centrality_for_node(
+            centrality_helper, layer_type_game_tuple, coalition_weight_array_dict, node)
         #  print("Node {0}: Shapley = {1}".format(nodes, nodes_layer_centrality_dict))
 
     return nodes_layer_centrality_dict
 
 
-def compute_multinet_layer_centrality_for_node(
-        nx_layer_dict,
-        layer_combinations_tuple_dict,
-        layer_permutations_tuple_list,
+def compute_shapley_weight_list(number_of_layers):
+    """
+    Computes the Shapley weight of a coalition for each possible coalition size. A coalition of size s which
+    does not contain a layer is followed by that layer in s!(L-s-1)! of the L! layer permutations, therefore
+    its marginal contribution is weighted by s!(L-s-1)!/L!.
+
+    :param number_of_layers: Number of layers L in the multilayer network.
+    :return: List containing the Shapley weight for each coalition size from 0 to L-1.
+    """
+
+    return [factorial(size) * factorial(number_of_layers - size - 1) / factorial(number_of_layers)
+            for size in range(number_of_layers)]
+
+
+def create_layer_type_game_tuple(layer_adjacency):
+    """
+    Groups the layers of a multilayer network which have the same nodes and connections into layer types. Identical
+    layers are symmetric players, so the layer centrality game can be solved over the K layer types instead of the
+    L layers, each layer of a type receiving the Shapley value of a single layer of that type.
+
+    :param layer_adjacency: Sparse adjacency of the layers of the multilayer network.
+    :return: Tuple of the array containing the type of each layer, the array containing the number of layers of each
+             type, and the array mapping the bitmask of each coalition of layer types to the bitmask of the
+             coalition of the first layers of these types.
+    """
+
+    layer_representative_index_list = layer_adjacency.get_layer_representative_index_list()
+    representative_index_list = sorted(set(layer_representative_index_list))
+
+    layer_type_array = array([representative_index_list.index(i) for i in layer_representative_index_list], dtype=int)
+    layer_type_multiplicity_array = bincount(layer_type_array, minlength=len(representative_index_list))
+
+    type_coalition_mask_array = zeros(1 << len(representative_index_list), dtype=int)
+
+    for layer_type, representative_index in enumerate(representative_index_list):
+        type_coalition_mask_array |= (arange(len(type_coalition_mask_array)) >> layer_type & 1) << representative_index
+
+    return layer_type_array, layer_type_multiplicity_array, type_coalition_mask_array
+
+
+def compute_layer_type_coalition_weight_array(layer_type_multiplicity_tuple):
+    """
+    Computes the Shapley weight of each coalition T of layer types, in a game in which layer type g has m_g identical
+    layers. A layer of a type outside T adds its marginal contribution to T if, in the random layer permutation, it
+    comes first among the layers of its type and the layers before it have exactly the types in T. With L layers in
+    total and m(T) layers of the types in T, this happens with probability
+    integral from 0 to 1 of y^(L - m(T) - 1) * prod over g in T of (1 - y^m_g) dy, which is independent of the type
+    of the layer. The integral is computed exactly with rational arithmetic. Without identical layers, the weight of
+    a coalition of size s is s!(L-s-1)!/L!, as in compute_shapley_weight_list.
+
+    :param layer_type_multiplicity_tuple: Tuple containing the number of layers of each layer type.
+    :return: Array containing the Shapley weight of each coalition of layer types, indexed by bitmask.
+    """
+
+    number_of_layer_types = len(layer_type_multiplicity_tuple)
+    number_of_layers = sum(layer_type_multiplicity_tuple)
+
+    coalition_weight_array = zeros(1 << number_of_layer_types)
+
+    # Coefficients of prod over g in T of (1 - y^m_g) and number of layers m(T), built from T without its lowest type
+    coalition_polynomial_list = [[1]]
+    coalition_multiplicity_list = [0]
+
+    for coalition_mask in range(1, 1 << number_of_layer_types):
+        lowest_type = (coalition_mask & -coalition_mask).bit_length() - 1
+        multiplicity = layer_type_multiplicity_tuple[lowest_type]
+        previous_polynomial = coalition_polynomial_list[coalition_mask & (coalition_mask - 1)]
+
+        polynomial = previous_polynomial + [0] * multiplicity
+
+        for k, coefficient in enumerate(previous_polynomial):
+            polynomial[k + multiplicity] -= coefficient
+
+        coalition_polynomial_list.append(polynomial)
+        coalition_multiplicity_list.append(coalition_multiplicity_list[coalition_mask & (coalition_mask - 1)] +
+                                           multiplicity)
+
+    for coalition_mask in range(1 << number_of_layer_types):
+        # The coalition of all layer types is never extended
+        if coalition_multiplicity_list[coalition_mask] == number_of_layers:
+            continue
+
+        coalition_weight_array[coalition_mask] = float(sum(
+            Fraction(coefficient, number_of_layers - coalition_multiplicity_list[coalition_mask] + k)
+            for k, coefficient in enumerate(coalition_polynomial_list[coalition_mask]) if coefficient != 0))
+
+    return coalition_weight_array
+
+
+def compute_pruned_multinet_layer_centrality_for_node(
+        centrality_helper,
+        layer_type_game_tuple,
+        coalition_weight_array_dict,
         node
 ):
     """
-    Computes the layer centrality for a given node in a given multilayer network.
+    Computes the layer centrality for a given node, solving the layer centrality game over the layer types of
+    :param layer_type_game_tuple instead of the layers, with the marginal contribution rule of
+    compute_multinet_layer_centrality.
 
-    :param nx_layer_dict: Multilayer network layer dictionary.
-    :param layer_permutations_tuple_list: List of tuples containing all layer permutations.
-    :param layer_combinations_tuple_dict: Dictionary containing node centrality values for all layer combinations
-           of all possible lengths.
-    :param node: Nodes for which the layer centrality is computed.
-    :return:
+    For local centrality measures, the game of the node is further reduced to the layer types on which it has
+    connections. The other layers do not change its centrality value, so they are null players of the game in which
+    the value of a coalition on which the node is not present is 0, and only the Shapley value of this game over the
+    layers on which the node has connections is computed. The marginal contributions which are skipped because the
+    node is not present in the coalition are then subtracted: for a node present on p of the L layers, a layer is
+    preceded only by layers on which the node is not present, excluding the empty coalition, with probability
+    1/p - 1/L, in which case its marginal contribution is its value on its own. A node with connections on a single
+    layer type has all its centrality on these layers.
+
+    :param centrality_helper: The centrality helper which is being used.
+    :param layer_type_game_tuple: Tuple as returned by create_layer_type_game_tuple.
+    :param coalition_weight_array_dict: Dictionary caching the arrays returned by
+           compute_layer_type_coalition_weight_array, keyed by their layer type multiplicity tuple.
+    :param node: Node for which the layer centrality is computed.
+    :return: Dictionary containing the centrality of each layer for :param node, as percentages.
     """
 
-    shapley_value_dict = {}
+    layer_type_array, layer_type_multiplicity_array, type_coalition_mask_array = layer_type_game_tuple
+
+    layer_adjacency = centrality_helper.layer_adjacency
+    layer_list = centrality_helper.coalition_index.layer_list
+
+    shapley_value_array = zeros(len(layer_list))
+
+    if node not in layer_adjacency.node_index_dict:
+        return dict(zip(layer_list, shapley_value_array.tolist()))
+
+    # Layer types played in the game of the node
+    game_layer_type_array = arange(len(layer_type_multiplicity_array))
+
+    if centrality_helper.is_local_measure:
+        node_index = layer_adjacency.node_index_dict[node]
+
+        layer_type_presence_array = zeros(len(layer_type_multiplicity_array), dtype=bool)
+        layer_type_connection_array = zeros(len(layer_type_multiplicity_array), dtype=bool)
 
-    for layer in nx_layer_dict.keys():
-        shapley_value_dict[layer] = 0
+        for layer_type in range(len(layer_type_multiplicity_array)):
+            layer = layer_list[int(type_coalition_mask_array[1 << layer_type]).bit_length() - 1]
+            layer_adjacency_matrix = layer_adjacency.get_layer_adjacency_matrix(layer)
 
-    for layer_permutation_tuple in layer_permutations_tuple_list:
-        compute_shapley_for_tuple(layer_permutation_tuple, layer_combinations_tuple_dict, shapley_value_dict, node)
+            layer_type_presence_array[layer_type] = layer_adjacency.get_layer_node_presence_array(layer)[node_index]
+            layer_type_connection_array[layer_type] = \
+                layer_adjacency_matrix.indptr[node_index + 1] > layer_adjacency_matrix.indptr[node_index]
 
-    # Marginal Contribution: divide by number of total combinations
-    for key in shapley_value_dict:
-        shapley_value_dict[key] = shapley_value_dict[key] / len(layer_permutations_tuple_list)
+        game_layer_type_array = flatnonzero(layer_type_connection_array)
+
+        if len(game_layer_type_array) == 0:
+            return dict(zip(layer_list, shapley_value_array.tolist()))
+
+        if len(game_layer_type_array) == 1:
+            shapley_value_array[layer_type_array == game_layer_type_array[0]] = \
+                100 / layer_type_multiplicity_array[game_layer_type_array[0]]
+
+            return dict(zip(layer_list, shapley_value_array.tolist()))
+
+    game_layer_type_multiplicity_tuple = tuple(layer_type_multiplicity_array[game_layer_type_array].tolist())
+
+    if game_layer_type_multiplicity_tuple not in coalition_weight_array_dict:
+        coalition_weight_array_dict[game_layer_type_multiplicity_tuple] = \
+            compute_layer_type_coalition_weight_array(game_layer_type_multiplicity_tuple)
+
+    # Values of the node on the coalitions of the game, where it is NaN if the node is not present
+    game_coalition_value_array = zeros(1 << len(game_layer_type_array))
+
+    for game_coalition_mask in range(1, len(game_coalition_value_array)):
+        coalition_mask = 0
+
+        for i, layer_type in enumerate(game_layer_type_array):
+            if game_coalition_mask >> i & 1:
+                coalition_mask |= int(type_coalition_mask_array[1 << layer_type])
+
+        game_coalition_value_array[game_coalition_mask] = \
+            centrality_helper.get_coalition_node_centrality_dict(coalition_mask).get(node, nan)
+
+    game_shapley_value_array = compute_shapley_value_matrix(
+        game_coalition_value_array[:, None], len(game_layer_type_array),
+        coalition_weight_array=coalition_weight_array_dict[game_layer_type_multiplicity_tuple])[0]
+
+    if centrality_helper.is_local_measure:
+        number_of_present_layers = layer_type_multiplicity_array[layer_type_presence_array].sum()
+
+        game_shapley_value_array -= game_coalition_value_array[1 << arange(len(game_layer_type_array))] * (
+            1 / number_of_present_layers - 1 / len(layer_list))
+
+    for i, layer_type in enumerate(game_layer_type_array):
+        shapley_value_array[layer_type_array == layer_type] = game_shapley_value_array[i]
 
     # Transform to percentages
-    shapley_value_sum = sum(shapley_value_dict.values())
+    shapley_value_sum = shapley_value_array.sum()
+
+    if shapley_value_sum != 0:
+        shapley_value_array = shapley_value_array / shapley_value_sum * 100
+
+    return dict(zip(layer_list, shapley_value_array.tolist()))
+
+
+def compute_degree_multinet_layer_centrality(nodes, layer_adjacency):
+    """
+    Computes the degree layer centrality for each node in a given multilayer network in closed form, without
+    evaluating any layer coalition. The degree of a node on a coalition is the number of its neighbours on the
+    union of the coalition layers, which is a coverage game: a neighbour connected to the node on k layers adds 1/k
+    to the Shapley value of each of these layers. Layers on which the node is present contribute their degree on
+    the empty coalition, but not on coalitions of layers on which the node is absent, which are skipped as in
+    compute_multinet_layer_centrality. For a node present on p of the L layers, this lowers the Shapley
+    value of each layer by its degree times (1/p - 1/L). The computation is linear in the number of edges.
+
+    :param nodes: List containing all nodes for which the layer centrality is computed.
+    :param layer_adjacency: Sparse adjacency of the layers of the multilayer network.
+    :return: Dictionary of dictionaries containing the centrality of each layer for each node in :param nodes.
+    """
+
+    return create_degree_nodes_layer_centrality_dict(
+        nodes, layer_adjacency, compute_degree_layer_centrality_matrix(layer_adjacency))
+
+
+def compute_degree_layer_centrality_matrix(layer_adjacency, node_index_array=None):
+    """
+    Computes the degree layer centrality of the nodes of :param layer_adjacency in closed form, as described in
+    compute_degree_multinet_layer_centrality. The closed form of a node only depends on its own connections, so only
+    the rows of the adjacency matrices of the requested nodes are used.
+
+    :param layer_adjacency: Sparse adjacency of the layers of the multilayer network.
+    :param node_index_array: Indices of the nodes in the node list of :param layer_adjacency, or None for all nodes.
+    :return: (N x L) matrix containing the centrality of each layer for each node, in the order of
+             :param node_index_array, or of the node list, and of the layer list of :param layer_adjacency.
+    """
+
+    layer_list = layer_adjacency.coalition_index.layer_list
+    number_of_layers = len(layer_list)
+
+    if node_index_array is None:
+        node_index_array = arange(len(layer_adjacency.node_list))
+
+    layer_adjacency_matrix_list = [
+        layer_adjacency.get_layer_adjacency_matrix(layer)[node_index_array].astype(float) for layer in layer_list]
+    layer_node_presence_array_list = [
+        layer_adjacency.get_layer_node_presence_array(layer)[node_index_array] for layer in layer_list]
+
+    # Number of layers on which each pair of nodes is connected
+    inverse_connection_count_matrix = sum(layer_adjacency_matrix_list[1:], layer_adjacency_matrix_list[0])
+    inverse_connection_count_matrix.data = 1 / inverse_connection_count_matrix.data
+
+    number_of_present_layers_array = sum(layer_node_presence_array_list, zeros(len(node_index_array)))
+    skipped_coalition_weight_array = where(
+        number_of_present_layers_array > 0,
+        1 / where(number_of_present_layers_array > 0, number_of_present_layers_array, 1) - 1 / number_of_layers, 0)
+
+    shapley_value_matrix = zeros((len(node_index_array), number_of_layers))
+
+    # Position of the connection of each row to its own node
+    self_loop_index_tuple = (arange(len(node_index_array)), node_index_array)
+    inverse_self_loop_count_array = asarray(inverse_connection_count_matrix[self_loop_index_tuple]).ravel()
+
+    for i, layer_adjacency_matrix in enumerate(layer_adjacency_matrix_list):
+        # As in networkx, a self loop counts twice towards the degree of its node
+        layer_self_loop_array = asarray(layer_adjacency_matrix[self_loop_index_tuple]).ravel()
+        layer_degree_array = layer_adjacency_matrix.getnnz(axis=1) + layer_self_loop_array
+        layer_coverage_array = \
+            asarray(layer_adjacency_matrix.multiply(inverse_connection_count_matrix).sum(axis=1)).ravel() + \
+            layer_self_loop_array * inverse_self_loop_count_array
+
+        shapley_value_matrix[:, i] = layer_coverage_array - layer_degree_array * skipped_coalition_weight_array
+
+    return compute_layer_centrality_percentage_matrix(shapley_value_matrix)
+
+
+def create_degree_nodes_layer_centrality_dict(nodes, layer_adjacency, layer_centrality_matrix):
+    """
+    Creates the result dictionary of the degree layer centrality of :param nodes. The nodes which are not present
+    on any layer have a centrality of 0 on each layer.
+
+    :param nodes: List containing the nodes.
+    :param layer_adjacency: Sparse adjacency of the layers of the multilayer network.
+    :param layer_centrality_matrix: Matrix as returned by compute_degree_layer_centrality_matrix.
+    :return: Dictionary of dictionaries containing the centrality of each layer for each node in :param nodes.
+    """
+
+    layer_list = layer_adjacency.coalition_index.layer_list
+
+    nodes_layer_centrality_dict = {}
+
+    for node in nodes:
+        if node in layer_adjacency.node_index_dict:
+            nodes_layer_centrality_dict[node] = dict(zip(
+                layer_list, layer_centrality_matrix[layer_adjacency.node_index_dict[node]].tolist()))
+        else:
+            nodes_layer_centrality_dict[node] = dict.fromkeys(layer_list, 0)
+
+    return nodes_layer_centrality_dict
+
+
+def compute_vectorized_multinet_layer_centrality(
+        nx_layer_dict,
+        nodes,
+        centrality_helper,
+        node_chunk_size=10000,
+        layer_type_game_tuple=None,
+        coalition_weight_array=None
+):
+    """
+    Computes the layer centrality for each node in a given multilayer network using matrix operations over a
+    coalition x node value matrix, instead of a Python loop over the nodes. Gives the same values as
+    compute_multinet_layer_centrality.
+
+    :param nx_layer_dict: Multilayer network layer dictionary.
+    :param nodes: List containing all nodes for which the layer centrality is computed.
+    :param centrality_helper: The centrality helper which is being used.
+    :param node_chunk_size: Number of nodes whose marginal contributions are computed at once, bounding the memory
+           used by the intermediate matrices.
+    :param layer_type_game_tuple: Tuple as returned by create_layer_type_game_tuple for the layers of
+           :param centrality_helper, or None to create it. Passed by callers which evaluate the nodes in chunks.
+    :param coalition_weight_array: Array as returned by compute_layer_type_coalition_weight_array for the layer
+           types of :param layer_type_game_tuple, or None to compute it.
+    :return: Dictionary of dictionaries containing the centrality of each layer for each node in :param nodes.
+    """
+
+    layer_list = centrality_helper.coalition_index.layer_list
+
+    # Solve the game over the types of identical layers
+    if layer_type_game_tuple is None:
+        layer_type_game_tuple = create_layer_type_game_tuple(centrality_helper.layer_adjacency)
+
+    layer_type_array, layer_type_multiplicity_array, type_coalition_mask_array = layer_type_game_tuple
+
+    if coalition_weight_array is None:
+        coalition_weight_array = compute_layer_type_coalition_weight_array(
+            tuple(layer_type_multiplicity_array.tolist()))
+
+    coalition_node_value_matrix = create_coalition_node_value_matrix(
+        centrality_helper.coalition_index, nodes, centrality_helper.coalition_node_centrality_dict,
+        type_coalition_mask_array)
+
+    shapley_value_matrix = compute_shapley_value_matrix(
+        coalition_node_value_matrix, len(layer_type_multiplicity_array), node_chunk_size,
+        coalition_weight_array)[:, layer_type_array]
+
+    layer_centrality_matrix = compute_layer_centrality_percentage_matrix(shapley_value_matrix)
+
+    nodes_layer_centrality_dict = {}
+
+    for node_index, node in enumerate(nodes):
+        nodes_layer_centrality_dict[node] = dict(zip(layer_list, layer_centrality_matrix[node_index].tolist()))
+
+    return nodes_layer_centrality_dict
 
-    for key in shapley_value_dict:
-        if shapley_value_sum != 0:
-            shapley_value_dict[key] = shapley_value_dict[key] / shapley_value_sum * 100
 
-    return shapley_value_dict
+def compute_multinet_layer_centrality_for_nodes(nx_layer_dict, nodes, centrality_helper, node_chunk_size=10000):
+    """
+    Computes the layer centrality of a subset of the nodes of a multilayer network, evaluating the layer
+    combinations only for the nodes of the subset. The degree layer centrality is computed in closed form from the
+    connections of the nodes, the harmonic centrality by breadth first searches started from the nodes. Layer
+    combinations already stored by :param centrality_helper are reused, therefore it can be created with
+    precompute=False. Gives the same values as compute_vectorized_multinet_layer_centrality.
+
+    :param nx_layer_dict: Multilayer network layer dictionary.
+    :param nodes: List containing the nodes for which the layer centrality is computed.
+    :param centrality_helper: The centrality helper which is being used.
+    :param node_chunk_size: Number of nodes whose marginal contributions are computed at once.
+    :return: Dictionary of dictionaries containing the centrality of each layer for each node in :param nodes.
+    """
+
+    layer_adjacency = centrality_helper.layer_adjacency
+    layer_list = centrality_helper.coalition_index.layer_list
+
+    known_nodes = [node for node in nodes if node in layer_adjacency.node_index_dict]
+    node_index_array = array([layer_adjacency.node_index_dict[node] for node in known_nodes], dtype=int)
+
+    if isinstance(centrality_helper, DegreeCentralityHelper):
+        layer_centrality_matrix = compute_degree_layer_centrality_matrix(layer_adjacency, node_index_array)
+    else:
+        # Solve the game over the types of identical layers
+        layer_type_array, layer_type_multiplicity_array, type_coalition_mask_array = \
+            create_layer_type_game_tuple(layer_adjacency)
+
+        coalition_node_value_matrix = full((len(type_coalition_mask_array), len(known_nodes)), nan)
+        coalition_node_value_matrix[0] = 0
+
+        for type_coalition_mask in range(1, len(type_coalition_mask_array)):
+            coalition_mask = int(type_coalition_mask_array[type_coalition_mask])
+
+            if coalition_mask in centrality_helper.coalition_node_centrality_dict:
+                coalition_node_value_matrix[type_coalition_mask] = \
+                    centrality_helper.coalition_node_centrality_dict.get_row(coalition_mask)[node_index_array]
+            else:
+                coalition_node_value_matrix[type_coalition_mask] = \
+                    centrality_helper.compute_coalition_node_centrality_subarray(coalition_mask, node_index_array)
+
+        layer_centrality_matrix = compute_layer_centrality_percentage_matrix(compute_shapley_value_matrix(
+            coalition_node_value_matrix, len(layer_type_multiplicity_array), node_chunk_size,
+            compute_layer_type_coalition_weight_array(tuple(layer_type_multiplicity_array.tolist())))[
+                :, layer_type_array])
+
+    nodes_layer_centrality_dict = dict.fromkeys(nodes)
+
+    for node_index, node in enumerate(known_nodes):
+        nodes_layer_centrality_dict[node] = dict(zip(layer_list, layer_centrality_matrix[node_index].tolist()))
+
+    # The nodes which are not present on any layer have a centrality of 0 on each layer
+    for node in nodes:
+        if nodes_layer_centrality_dict[node] is None:
+            nodes_layer_centrality_dict[node] = dict.fromkeys(layer_list, 0)
+
+    return nodes_layer_centrality_dict
 
 
-def compute_shapley_for_tuple(layer_permutation_tuple, layer_combinations_tuple_dict, shapley_value_dict, node):
+def iterate_multinet_layer_centrality(nx_layer_dict, nodes, centrality_helper, node_chunk_size=10000):
     """
-    Computes the Shapley value of a layer permutation in order of arrival for a given node. The values used to
-    compute the shapley value are taken from the :param layer_combinations_tuple_dict.
+    Generates the layer centrality of the nodes in chunks, each chunk being yielded as soon as it is computed, so
+    that only the results and the coalition x node value matrix of one chunk are kept in memory. Gives the same
+    values as compute_vectorized_multinet_layer_centrality.
 
-    :param layer_permutation_tuple: Tuple containing a layer permutation.
-    :param layer_combinations_tuple_dict: Dictionary containing node centrality values for all layer combinations
-           of all possible lengths.
-    :param shapley_value_dict: Reference to dictionary containing the shapley value of each layer given by the
-                               :param layer_permutation_tuple in order of arrival.
-    :param node: Node for which the shapley value is computed.
-    :return:
+    :param nx_layer_dict: Multilayer network layer dictionary.
+    :param nodes: Iterable containing all nodes for which the layer centrality is computed.
+    :param centrality_helper: The centrality helper which is being used.
+    :param node_chunk_size: Number of nodes of each chunk.
+    :return: Generator of dictionaries of dictionaries containing the centrality of each layer for each node of a
+             chunk of :param nodes.
     """
 
-    for i in range(len(layer_permutation_tuple)):
-        if i == 0:
-            if node in layer_combinations_tuple_dict[layer_permutation_tuple[0]]:
-                shapley_value_dict[layer_permutation_tuple[0]] += \
-                    layer_combinations_tuple_dict[layer_permutation_tuple[0]][node]
-            # print("Perm:", layer_permutation_tuple, "First Position", layer_permutation_tuple[0], "Shapley value",
-            # shapley_value_dict[layer_permutation_tuple[0]])
+    node_iterator = iter(nodes)
+
+    degree_layer_centrality_matrix = None
+    layer_type_game_tuple = None
+    coalition_weight_array = None
+
+    # The layer types and the coalition weights are shared by all chunks
+    if isinstance(centrality_helper, DegreeCentralityHelper):
+        degree_layer_centrality_matrix = compute_degree_layer_centrality_matrix(centrality_helper.layer_adjacency)
+    else:
+        layer_type_game_tuple = create_layer_type_game_tuple(centrality_helper.layer_adjacency)
+        coalition_weight_array = compute_layer_type_coalition_weight_array(
+            tuple(layer_type_game_tuple[1].tolist()))
+
+    while True:
+        node_chunk = list(islice(node_iterator, node_chunk_size))
+
+        if not node_chunk:
+            return
+
+        if degree_layer_centrality_matrix is not None:
+            yield create_degree_nodes_layer_centrality_dict(
+                node_chunk, centrality_helper.layer_adjacency, degree_layer_centrality_matrix)
         else:
-            if node in layer_combinations_tuple_dict[''.join(sorted(list(layer_permutation_tuple[0:i + 1])))] and \
-                    node in layer_combinations_tuple_dict[''.join(sorted(list(layer_permutation_tuple[0:i])))]:
-                shapley_value_dict[layer_permutation_tuple[i]] += \
-                    layer_combinations_tuple_dict[''.join(sorted(list(layer_permutation_tuple[0:i + 1])))][node] - \
-                    layer_combinations_tuple_dict[''.join(sorted(list(layer_permutation_tuple[0:i])))][node]
-                # print(''.join(layer_permutation_tuple[0:i+1]), ''.join(layer_permutation_tuple[0:i]))
+            yield compute_vectorized_multinet_layer_centrality(
+                nx_layer_dict, node_chunk, centrality_helper, node_chunk_size, layer_type_game_tuple,
+                coalition_weight_array)
+
+
+def update_multinet_layer_centrality(
+        nodes_layer_centrality_dict,
+        nx_layer_dict,
+        centrality_helper,
+        layer,
+        added_edges=(),
+        removed_edges=(),
+        node_chunk_size=10000
+):
+    """
+    Updates the layer centrality of the nodes in :param nodes_layer_centrality_dict after connections are removed
+    from and inserted in a layer, in place. The centrality helper only recomputes the layer combinations which
+    contain the layer, and only the layer centrality of the nodes whose centrality changed in at least one layer
+    combination is recomputed.
+
+    :param nodes_layer_centrality_dict: Dictionary of dictionaries containing the centrality of each layer for each
+           node, as returned by compute_vectorized_multinet_layer_centrality for the network before the update.
+    :param nx_layer_dict: Multilayer network layer dictionary of the centrality helper.
+    :param centrality_helper: The centrality helper which is being used.
+    :param layer: Layer name.
+    :param added_edges: Iterable of (source, target) node tuples of the inserted connections.
+    :param removed_edges: Iterable of (source, target) node tuples of the removed connections.
+    :param node_chunk_size: Number of nodes whose marginal contributions are computed at once.
+    :return: List of the nodes of :param nodes_layer_centrality_dict whose layer centrality was recomputed.
+    """
+
+    return update_multinet_layers_centrality(
+        nodes_layer_centrality_dict, nx_layer_dict, centrality_helper, {layer: (added_edges, removed_edges)},
+        node_chunk_size)
+
+
+def update_multinet_layers_centrality(
+        nodes_layer_centrality_dict,
+        nx_layer_dict,
+        centrality_helper,
+        layer_edge_delta_dict,
+        node_chunk_size=10000
+):
+    """
+    Updates the layer centrality of the nodes in :param nodes_layer_centrality_dict after connections are removed
+    from and inserted in several layers, in place. The centrality helper recomputes each layer combination which
+    contains at least one of the layers once, and only the layer centrality of the nodes whose centrality changed in
+    at least one layer combination is recomputed.
+
+    :param nodes_layer_centrality_dict: Dictionary of dictionaries containing the centrality of each layer for each
+           node, as returned by compute_vectorized_multinet_layer_centrality for the network before the update.
+    :param nx_layer_dict: Multilayer network layer dictionary of the centrality helper.
+    :param centrality_helper: The centrality helper which is being used.
+    :param layer_edge_delta_dict: Dictionary containing an (added_edges, removed_edges) tuple for each changed layer,
+           where both are iterables of (source, target) node tuples.
+    :param node_chunk_size: Number of nodes whose marginal contributions are computed at once.
+    :return: List of the nodes of :param nodes_layer_centrality_dict whose layer centrality was recomputed.
+    """
+
+    changed_nodes = centrality_helper.update_layers_edges(layer_edge_delta_dict)
+
+    updated_nodes = [node for node in changed_nodes if node in nodes_layer_centrality_dict]
+
+    if updated_nodes:
+        nodes_layer_centrality_dict.update(compute_vectorized_multinet_layer_centrality(
+            nx_layer_dict, updated_nodes, centrality_helper, node_chunk_size))
+
+    return updated_nodes
+
+
+def create_coalition_node_value_matrix(
+        coalition_index,
+        nodes,
+        coalition_node_centrality_dict,
+        coalition_mask_array=None
+):
+    """
+    Creates a dense (2^L x N) matrix containing the centrality of each node on each layer coalition. The row of a
+    coalition is its bitmask in :param coalition_index, so row 0 is the empty coalition, whose value is 0 for all
+    nodes. A node which is not present in the flattened network of a coalition has the value NaN.
+
+    :param coalition_index: Coalition index of the multilayer network.
+    :param nodes: List containing the nodes, in the order of the matrix columns.
+    :param coalition_node_centrality_dict: Dictionary or coalition value container containing node centrality values
+           for all layer combinations of all possible lengths, keyed by coalition bitmask.
+    :param coalition_mask_array: Array containing the coalition bitmask of each row, starting with the empty
+           coalition, e.g. the coalitions of layer types of create_layer_type_game_tuple, or None for all coalitions.
+    :return: Matrix containing the centrality of each node on each layer coalition.
+    """
+
+    if coalition_mask_array is None:
+        coalition_mask_array = arange(coalition_index.full_coalition_mask + 1)
+
+    coalition_node_value_matrix = full((len(coalition_mask_array), len(nodes)), nan)
+    coalition_node_value_matrix[0] = 0
+
+    if isinstance(coalition_node_centrality_dict, CoalitionValueMapping):
+        # Copy the rows of the coalitions, restricted to the nodes which are known to the container
+        node_index_dict = coalition_node_centrality_dict.node_index_dict
+        column_array = array([i for i, node in enumerate(nodes) if node in node_index_dict], dtype=int)
+        row_index_array = array([node_index_dict[nodes[i]] for i in column_array], dtype=int)
+
+        for row_index in range(1, len(coalition_mask_array)):
+            coalition_node_value_matrix[row_index, column_array] = coalition_node_centrality_dict.get_row(
+                int(coalition_mask_array[row_index]))[row_index_array]
+
+        return coalition_node_value_matrix
+
+    for row_index in range(1, len(coalition_mask_array)):
+        node_centrality_dict = coalition_node_centrality_dict[int(coalition_mask_array[row_index])]
+
+        coalition_node_value_matrix[row_index] = [node_centrality_dict.get(node, nan) for node in nodes]
+
+    return coalition_node_value_matrix
+
+
+def compute_shapley_value_matrix(
+        coalition_node_value_matrix,
+        number_of_layers,
+        node_chunk_size=10000,
+        coalition_weight_array=None
+):
+    """
+    Computes the Shapley value of each layer for each node from a coalition x node value matrix. A marginal
+    contribution involving a NaN value, i.e. a coalition on which the node is not present, counts as 0, which is
+    the same rule as in compute_multinet_layer_centrality.
+
+    :param coalition_node_value_matrix: Matrix as returned by create_coalition_node_value_matrix.
+    :param number_of_layers: Number of layers L in the multilayer network.
+    :param node_chunk_size: Number of nodes whose marginal contributions are computed at once.
+    :param coalition_weight_array: Array containing the Shapley weight of each coalition, indexed by bitmask, e.g.
+           as returned by compute_layer_type_coalition_weight_array, or None for the weights of
+           compute_shapley_weight_list.
+    :return: (N x L) matrix containing the Shapley value of each layer for each node.
+    """
+
+    number_of_nodes = coalition_node_value_matrix.shape[1]
+
+    shapley_value_matrix = zeros((number_of_nodes, number_of_layers))
+
+    coalition_mask_array = arange(2 ** number_of_layers)
+
+    if coalition_weight_array is None:
+        coalition_size_array = zeros(2 ** number_of_layers, dtype=int)
+
+        for i in range(number_of_layers):
+            coalition_size_array += coalition_mask_array >> i & 1
+
+        coalition_weight_array = array(compute_shapley_weight_list(number_of_layers) + [0])[coalition_size_array]
+
+    for i in range(number_of_layers):
+        # Coalitions which do not contain layer i, and the same coalitions joined by layer i
+        layer_coalition_mask_array = coalition_mask_array[(coalition_mask_array >> i & 1) == 0]
+        extended_coalition_mask_array = layer_coalition_mask_array | (1 << i)
+        layer_coalition_weight_array = coalition_weight_array[layer_coalition_mask_array]
+
+        for start in range(0, number_of_nodes, node_chunk_size):
+            end = min(start + node_chunk_size, number_of_nodes)
+
+            marginal_contribution_matrix = \
+                coalition_node_value_matrix[extended_coalition_mask_array, start:end] - \
+                coalition_node_value_matrix[layer_coalition_mask_array, start:end]
+
+            shapley_value_matrix[start:end, i] = nansum(
+                layer_coalition_weight_array[:, None] * marginal_contribution_matrix, axis=0)
+
+    return shapley_value_matrix
+
+
+def compute_layer_centrality_percentage_matrix(shapley_value_matrix):
+    """
+    Transforms the Shapley values of each node into percentages of their sum. Nodes whose Shapley values sum up to 0
+    keep their values.
+
+    :param shapley_value_matrix: (N x L) matrix containing the Shapley value of each layer for each node.
+    :return: (N x L) matrix containing the layer centrality of each node as percentages.
+    """
+
+    shapley_value_sum_array = shapley_value_matrix.sum(axis=1, keepdims=True)
+    has_non_zero_sum_array = shapley_value_sum_array != 0
+
+    return where(
+        has_non_zero_sum_array,
+        shapley_value_matrix / where(has_non_zero_sum_array, shapley_value_sum_array, 1) * 100,
+        shapley_value_matrix)
+
+
+def compute_sampled_multinet_layer_centrality(
+        nx_layer_dict,
+        nodes,
+        centrality_helper,
+        target_standard_error=0.01,
+        min_number_of_samples=30,
+        max_number_of_samples=10000,
+        time_budget=None,
+        confidence_level=0.95,
+        seed=None
+):
+    """
+    Approximates the layer centrality for each node in a given multilayer network by sampling layer permutations.
+    Only the coalitions which are prefixes of the sampled permutations are evaluated, on demand through the
+    :param centrality_helper, therefore it can be created with precompute=False. Sampling stops once the standard
+    error of every layer estimate of every node is at most :param target_standard_error, or when the sample or time
+    budget runs out.
+
+    :param nx_layer_dict: Multilayer network layer dictionary.
+    :param nodes: List containing all nodes for which the layer centrality is computed.
+    :param centrality_helper: The centrality helper which is being used.
+    :param target_standard_error: Standard error of the Shapley value estimates, in units of the centrality measure,
+           at which sampling stops.
+    :param min_number_of_samples: Minimum number of permutations sampled before checking the standard error.
+    :param max_number_of_samples: Maximum number of permutations sampled.
+    :param time_budget: Maximum sampling time in seconds, or None for no time limit.
+    :param confidence_level: Confidence level of the returned confidence intervals.
+    :param seed: Seed of the random number generator used to sample the layer permutations.
+    :return: Tuple of two dictionaries of dictionaries, containing for each node in :param nodes the estimated
+             centrality of each layer as percentages and the (lower, upper) confidence interval of each estimate.
+             The confidence intervals are scaled to percentages by the same factor as the estimates.
+    """
+
+    layer_list = centrality_helper.coalition_index.layer_list
+    number_of_layers = len(layer_list)
+
+    random_number_generator = default_rng(seed)
+
+    coalition_node_value_array_dict = {0: zeros(len(nodes))}
+
+    number_of_samples = 0
+    shapley_value_mean_matrix = zeros((len(nodes), number_of_layers))
+    shapley_value_m2_matrix = zeros((len(nodes), number_of_layers))
+    sample_marginal_contribution_matrix = zeros((len(nodes), number_of_layers))
+
+    start_time = perf_counter()
+
+    while number_of_samples < max_number_of_samples:
+        layer_permutation_array = random_number_generator.permutation(number_of_layers)
+
+        coalition_mask = 0
+
+        for layer_index in layer_permutation_array:
+            extended_coalition_mask = coalition_mask | (1 << int(layer_index))
+
+            if extended_coalition_mask not in coalition_node_value_array_dict:
+                node_centrality_dict = centrality_helper.get_coalition_node_centrality_dict(extended_coalition_mask)
+                coalition_node_value_array_dict[extended_coalition_mask] = array(
+                    [node_centrality_dict.get(node, nan) for node in nodes])
+
+            marginal_contribution_array = \
+                coalition_node_value_array_dict[extended_coalition_mask] - \
+                coalition_node_value_array_dict[coalition_mask]
+            sample_marginal_contribution_matrix[:, layer_index] = where(
+                isnan(marginal_contribution_array), 0, marginal_contribution_array)
+
+            coalition_mask = extended_coalition_mask
+
+        # Welford update of the running mean and sum of squared deviations
+        number_of_samples += 1
+        delta_matrix = sample_marginal_contribution_matrix - shapley_value_mean_matrix
+        shapley_value_mean_matrix += delta_matrix / number_of_samples
+        shapley_value_m2_matrix += delta_matrix * (sample_marginal_contribution_matrix - shapley_value_mean_matrix)
+
+        if number_of_samples >= max(min_number_of_samples, 2):
+            standard_error_matrix = sqrt(shapley_value_m2_matrix / (number_of_samples - 1) / number_of_samples)
+
+            if standard_error_matrix.max(initial=0) <= target_standard_error:
+                break
+
+        if time_budget is not None and perf_counter() - start_time >= time_budget:
+            break
+
+    if number_of_samples > 1:
+        standard_error_matrix = sqrt(shapley_value_m2_matrix / (number_of_samples - 1) / number_of_samples)
+    else:
+        standard_error_matrix = full(shapley_value_mean_matrix.shape, nan)
+
+    confidence_interval_half_width_matrix = NormalDist().inv_cdf(0.5 + confidence_level / 2) * standard_error_matrix
+
+    # Transform the estimates and confidence intervals to percentages
+    layer_centrality_matrix = compute_layer_centrality_percentage_matrix(shapley_value_mean_matrix)
+
+    shapley_value_sum_array = shapley_value_mean_matrix.sum(axis=1, keepdims=True)
+    percentage_scale_array = where(shapley_value_sum_array != 0, 100 / where(
+        shapley_value_sum_array != 0, shapley_value_sum_array, 1), 1)
+    confidence_interval_half_width_matrix = abs(percentage_scale_array) * confidence_interval_half_width_matrix
+
+    lower_bound_matrix = layer_centrality_matrix - confidence_interval_half_width_matrix
+    upper_bound_matrix = layer_centrality_matrix + confidence_interval_half_width_matrix
+
+    nodes_layer_centrality_dict = {}
+    nodes_layer_confidence_interval_dict = {}
+
+    for node_index, node in enumerate(nodes):
+        nodes_layer_centrality_dict[node] = dict(zip(layer_list, layer_centrality_matrix[node_index].tolist()))
+        nodes_layer_confidence_interval_dict[node] = dict(zip(layer_list, zip(
+            lower_bound_matrix[node_index].tolist(), upper_bound_matrix[node_index].tolist())))
+
+    return nodes_layer_centrality_dict, nodes_layer_confidence_interval_dict
 
 
 if __name__ == "__main__":
+    from uunet.multinet import to_nx_dict, read, vertices
+
     multilayeredNetwork = read("../../internal/resources/test_network.txt")
     nodeList = sorted(set(vertices(multilayeredNetwork)["actor"]))
     layers = to_nx_dict(multilayeredNetwork)
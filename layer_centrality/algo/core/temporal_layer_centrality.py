@@ -0,0 +1,165 @@
+from concurrent.futures import ProcessPoolExecutor
+from numpy import array_split, concatenate, zeros
+from layer_centrality.algo.core.layer_centrality import compute_vectorized_multinet_layer_centrality, \
+    update_multinet_layers_centrality
+
+
+def compute_snapshot_edge_delta_dict(previous_nx_layer_dict, nx_layer_dict):
+    """
+    Computes the connections which are inserted and removed on each layer between two snapshots of a multilayer
+    network with the same layers.
+
+    :param previous_nx_layer_dict: Multilayer network layer dictionary of the previous snapshot.
+    :param nx_layer_dict: Multilayer network layer dictionary of the next snapshot.
+    :return: Dictionary containing, for each layer whose connections changed, a tuple of the lists of inserted and
+             removed (source, target) connections.
+    """
+
+    edge_delta_dict = {}
+
+    for layer, nx_layer in nx_layer_dict.items():
+        previous_nx_layer = previous_nx_layer_dict[layer]
+
+        added_edges = [edge for edge in nx_layer.edges if not previous_nx_layer.has_edge(*edge)]
+        removed_edges = [edge for edge in previous_nx_layer.edges if not nx_layer.has_edge(*edge)]
+
+        if added_edges or removed_edges:
+            edge_delta_dict[layer] = (added_edges, removed_edges)
+
+    return edge_delta_dict
+
+
+def can_apply_snapshot_edge_delta(previous_nx_layer_dict, nx_layer_dict, edge_delta_dict):
+    """
+    Checks whether a snapshot can be obtained from the previous one only by inserting and removing connections, i.e.
+    whether the nodes of each layer are the nodes of the previous snapshot together with the end nodes of the
+    inserted connections.
+
+    :param previous_nx_layer_dict: Multilayer network layer dictionary of the previous snapshot.
+    :param nx_layer_dict: Multilayer network layer dictionary of the next snapshot.
+    :param edge_delta_dict: Dictionary as returned by compute_snapshot_edge_delta_dict.
+    :return: True if the edge delta transforms the previous snapshot into the next one, False otherwise.
+    """
+
+    for layer, nx_layer in nx_layer_dict.items():
+        added_edges, _ = edge_delta_dict.get(layer, ([], []))
+
+        expected_node_set = set(previous_nx_layer_dict[layer].nodes)
+        expected_node_set.update(node for edge in added_edges for node in edge)
+
+        if expected_node_set != set(nx_layer.nodes):
+            return False
+
+    return True
+
+
+def compute_temporal_multinet_layer_centrality(
+        nx_layer_dict_list,
+        nodes,
+        centrality_helper_class,
+        centrality_helper_kwargs=None,
+        number_of_workers=1,
+        node_chunk_size=10000
+):
+    """
+    Computes the layer centrality of the nodes for an ordered series of snapshots of a multilayer network with the
+    same layers. Consecutive snapshots usually share most of their connections, so a snapshot is not evaluated from
+    scratch: the connections inserted and removed since the previous snapshot are applied to the centrality helper,
+    which only recomputes the affected layer combinations, and only the nodes whose centrality changed are
+    recomputed. A snapshot whose nodes can not be reached by changing connections, e.g. because a node appears
+    without connections, is evaluated with a new centrality helper.
+
+    With several workers, the series is split into contiguous time windows, evaluated independently in a pool of
+    processes, each window starting from a new centrality helper.
+
+    :param nx_layer_dict_list: List of multilayer network layer dictionaries, ordered by time. The snapshots are not
+           modified.
+    :param nodes: List containing all nodes for which the layer centrality is computed.
+    :param centrality_helper_class: Class of the centrality helper which is being used, e.g. DegreeCentralityHelper.
+    :param centrality_helper_kwargs: Dictionary of keyword arguments of the centrality helper.
+    :param number_of_workers: Number of processes evaluating time windows.
+    :param node_chunk_size: Number of nodes whose marginal contributions are computed at once.
+    :return: Tuple of the (N x L x T) array containing the centrality of each layer for each node of :param nodes on
+             each snapshot, as percentages, and of the list of layers in the order of the second axis.
+    """
+
+    if not nx_layer_dict_list:
+        return zeros((len(nodes), 0, 0)), []
+
+    layer_list = list(nx_layer_dict_list[0].keys())
+
+    for nx_layer_dict in nx_layer_dict_list:
+        if set(nx_layer_dict.keys()) != set(layer_list):
+            raise ValueError("All snapshots must have the same layers {0}".format(layer_list))
+
+    # Take the layers of all snapshots in the same order, so that they share the coalition bitmasks
+    nx_layer_dict_list = [{layer: nx_layer_dict[layer] for layer in layer_list} for nx_layer_dict in nx_layer_dict_list]
+
+    window_argument_list = [
+        (window_nx_layer_dict_list, nodes, centrality_helper_class, centrality_helper_kwargs, node_chunk_size)
+        for window_nx_layer_dict_list in _split_time_windows(nx_layer_dict_list, number_of_workers)]
+
+    if number_of_workers > 1 and len(window_argument_list) > 1:
+        with ProcessPoolExecutor(max_workers=number_of_workers) as executor:
+            layer_centrality_cube_list = list(executor.map(_compute_time_window_layer_centrality, window_argument_list))
+    else:
+        layer_centrality_cube_list = [
+            _compute_time_window_layer_centrality(window_argument) for window_argument in window_argument_list]
+
+    return concatenate(layer_centrality_cube_list, axis=2), layer_list
+
+
+def _split_time_windows(nx_layer_dict_list, number_of_windows):
+    return [
+        [nx_layer_dict_list[i] for i in time_index_array]
+        for time_index_array in array_split(range(len(nx_layer_dict_list)), max(1, number_of_windows))
+        if len(time_index_array) > 0]
+
+
+def _compute_time_window_layer_centrality(window_argument):
+    nx_layer_dict_list, nodes, centrality_helper_class, centrality_helper_kwargs, node_chunk_size = window_argument
+
+    layer_list = list(nx_layer_dict_list[0].keys())
+    layer_centrality_cube = zeros((len(nodes), len(layer_list), len(nx_layer_dict_list)))
+
+    previous_nx_layer_dict = None
+    centrality_helper = None
+    nodes_layer_centrality_dict = None
+
+    for time_index, nx_layer_dict in enumerate(nx_layer_dict_list):
+        edge_delta_dict = None
+
+        if previous_nx_layer_dict is not None:
+            edge_delta_dict = compute_snapshot_edge_delta_dict(previous_nx_layer_dict, nx_layer_dict)
+
+            # The node list of the centrality helper is fixed, so new nodes require a new centrality helper
+            if not can_apply_snapshot_edge_delta(previous_nx_layer_dict, nx_layer_dict, edge_delta_dict) or any(
+                    node not in centrality_helper.layer_adjacency.node_index_dict
+                    for added_edges, _ in edge_delta_dict.values() for edge in added_edges for node in edge):
+                edge_delta_dict = None
+
+        if edge_delta_dict is None:
+            # The centrality helper updates its layers in place, so it works on a copy of the snapshot
+            helper_nx_layer_dict = {layer: nx_layer.copy() for layer, nx_layer in nx_layer_dict.items()}
+
+            if centrality_helper is not None:
+                centrality_helper.close()
+
+            centrality_helper = centrality_helper_class(helper_nx_layer_dict, **(centrality_helper_kwargs or {}))
+            nodes_layer_centrality_dict = compute_vectorized_multinet_layer_centrality(
+                helper_nx_layer_dict, nodes, centrality_helper, node_chunk_size)
+        else:
+            update_multinet_layers_centrality(
+                nodes_layer_centrality_dict, centrality_helper.nx_layer_dict, centrality_helper, edge_delta_dict,
+                node_chunk_size)
+
+        for node_index, node in enumerate(nodes):
+            layer_centrality_cube[node_index, :, time_index] = [
+                nodes_layer_centrality_dict[node][layer] for layer in layer_list]
+
+        previous_nx_layer_dict = nx_layer_dict
+
+    if centrality_helper is not None:
+        centrality_helper.close()
+
+    return layer_centrality_cube
@@ -1 +1,7 @@
-from .layer_centrality_analyzers import *
+from layer_centrality.utils.import_helpers import attach_lazy_submodules
+
+
+# The submodules are imported when one of their names is first accessed
+__getattr__, __dir__, __all__ = attach_lazy_submodules(__name__, {
+    'layer_centrality_analyzers': ['LayerCentralityAnalyzer']
+})
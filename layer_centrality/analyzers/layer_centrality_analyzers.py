@@ -1,7 +1,9 @@
 from pandas import DataFrame
-from layer_centrality.algo.core.layer_centrality import compute_multinet_layer_centrality
+from layer_centrality.algo.core.layer_centrality import compute_multinet_layer_centrality, \
+    compute_multinet_layer_centrality_for_nodes, iterate_multinet_layer_centrality
 from layer_centrality.utils.centrality_helpers import DegreeCentralityHelper, HarmonicCentralityHelper, \
-    KatzCentralityHelper, SubgraphCentralityHelper
+    KatzCentralityHelper, SubgraphCentralityHelper, create_layer_combinations_node_centrality_dicts
+from layer_centrality.utils.result_helpers import write_layer_centrality_chunks
 
 
 class LayerCentralityAnalyzer:
@@ -11,24 +13,143 @@ class LayerCentralityAnalyzer:
         self.__nodes_layer_centrality_dict = {}
         self.__results_data_frame = DataFrame.from_dict(self.__nodes_layer_centrality_dict)
 
+        # Result data frames of the computed centrality measures, keyed by measure name
+        self.__results_data_frame_dict = {}
+
+    def __create_centrality_helper(self, centrality_measure, precompute=True):
+        centrality_helper_class_dict = {
+            "degree": DegreeCentralityHelper,
+            "harmonic": HarmonicCentralityHelper,
+            "katz": KatzCentralityHelper,
+            "subgraph": SubgraphCentralityHelper
+        }
+
+        if centrality_measure.lower() not in centrality_helper_class_dict:
+            return None
+
+        # The helpers work on the CSR matrices of the dataset, the networkx layers are only passed on when the
+        # dataset was loaded as networkx layers, i.e. for the uunet datasets
+        nx_layer_dict = self.__dataset_helper.get_nx_layer_dict() if self.__dataset_helper.has_nx_layer_dict() else None
+
+        return centrality_helper_class_dict[centrality_measure.lower()](
+            nx_layer_dict, precompute, layer_adjacency=self.__dataset_helper.get_layer_adjacency())
+
     def get_layer_centrality(self, centrality_measure):
 
-        if centrality_measure.lower() == "degree":
-            centrality_helper = DegreeCentralityHelper(self.__dataset_helper.get_nx_layer_dict())
-        elif centrality_measure.lower() == "harmonic":
-            centrality_helper = HarmonicCentralityHelper(self.__dataset_helper.get_nx_layer_dict())
-        elif centrality_measure.lower() == "katz":
-            centrality_helper = KatzCentralityHelper(self.__dataset_helper.get_nx_layer_dict())
-        elif centrality_measure.lower() == "subgraph":
-            centrality_helper = SubgraphCentralityHelper(self.__dataset_helper.get_nx_layer_dict())
-        else:
+        results_data_frame_dict = self.get_layer_centralities([centrality_measure])
+
+        if centrality_measure.lower() not in results_data_frame_dict:
             return self.__results_data_frame
 
-        self.__nodes_layer_centrality_dict = compute_multinet_layer_centrality(
-            self.__dataset_helper.get_nx_layer_dict(), self.__dataset_helper.get_node_list(), centrality_helper)
+        self.__results_data_frame = results_data_frame_dict[centrality_measure.lower()]
 
-        self.__results_data_frame = DataFrame.from_dict(self.__nodes_layer_centrality_dict).T.sort_index(axis=1)
+        return self.__results_data_frame
 
-        self.__results_data_frame = self.__results_data_frame.round(2)
+    def get_layer_centralities(self, centrality_measure_list, number_of_threads=None):
+        """
+        Computes the layer centrality of the nodes of the dataset for several centrality measures. The flattened
+        network of each layer combination is built once and evaluated by all measures, in parallel. The result data
+        frames are kept by the analyzer, so each measure is only computed once.
 
-        return self.__results_data_frame
+        :param centrality_measure_list: List of names of centrality measures.
+        :param number_of_threads: Number of measures evaluating a flattened network in parallel, or None for one
+               thread per measure.
+        :return: Dictionary of data frames with the same layout as the one returned by get_layer_centrality, keyed by
+                 the lower case names of the known centrality measures.
+        """
+
+        centrality_helper_dict = {}
+
+        for centrality_measure in centrality_measure_list:
+            if centrality_measure.lower() in self.__results_data_frame_dict or \
+                    centrality_measure.lower() in centrality_helper_dict:
+                continue
+
+            centrality_helper = self.__create_centrality_helper(centrality_measure, precompute=False)
+
+            if centrality_helper is not None:
+                centrality_helper_dict[centrality_measure.lower()] = centrality_helper
+
+        # The degree layer centrality is computed in closed form, without the values of the layer combinations
+        create_layer_combinations_node_centrality_dicts([
+            centrality_helper for centrality_helper in centrality_helper_dict.values()
+            if not isinstance(centrality_helper, DegreeCentralityHelper)], number_of_threads)
+
+        for centrality_measure, centrality_helper in centrality_helper_dict.items():
+            self.__nodes_layer_centrality_dict = compute_multinet_layer_centrality(
+                centrality_helper.nx_layer_dict, self.__dataset_helper.get_node_list(), centrality_helper)
+
+            self.__results_data_frame_dict[centrality_measure] = DataFrame.from_dict(
+                self.__nodes_layer_centrality_dict).T.sort_index(axis=1).round(2)
+
+            centrality_helper.close()
+
+        return {
+            centrality_measure.lower(): self.__results_data_frame_dict[centrality_measure.lower()]
+            for centrality_measure in centrality_measure_list
+            if centrality_measure.lower() in self.__results_data_frame_dict}
+
+    def get_layer_centrality_for_nodes(self, centrality_measure, nodes):
+        """
+        Computes the layer centrality of a subset of the nodes of the dataset, evaluating the layer combinations only
+        for these nodes, so that the cost of a query for degree and harmonic centrality grows with the number of
+        requested nodes. The results are not kept by the analyzer.
+
+        :param centrality_measure: Name of the centrality measure.
+        :param nodes: Iterable containing the requested nodes.
+        :return: Data frame with the same layout as the one returned by get_layer_centrality, containing the rows of
+                 the requested nodes.
+        """
+
+        centrality_helper = self.__create_centrality_helper(centrality_measure, precompute=False)
+
+        if centrality_helper is None:
+            return DataFrame()
+
+        nodes_layer_centrality_dict = compute_multinet_layer_centrality_for_nodes(
+            centrality_helper.nx_layer_dict, list(nodes), centrality_helper)
+
+        return DataFrame.from_dict(nodes_layer_centrality_dict, orient='index').sort_index(axis=1).round(2)
+
+    def iterate_layer_centrality(self, centrality_measure, node_chunk_size=10000):
+        """
+        Generates the layer centrality of the nodes of the dataset in chunks of :param node_chunk_size nodes, each
+        chunk being yielded as soon as it is computed. The results are not kept by the analyzer. The centrality
+        helper is closed when the generator is exhausted, closed or raises.
+
+        :param centrality_measure: Name of the centrality measure.
+        :param node_chunk_size: Number of nodes of each chunk.
+        :return: Generator of data frames with the same layout as the one returned by get_layer_centrality.
+        """
+
+        centrality_helper = self.__create_centrality_helper(centrality_measure, precompute=False)
+
+        if centrality_helper is None:
+            return
+
+        try:
+            # The degree layer centrality is computed in closed form, without the values of the layer combinations
+            if not isinstance(centrality_helper, DegreeCentralityHelper):
+                create_layer_combinations_node_centrality_dicts([centrality_helper])
+
+            for nodes_layer_centrality_chunk in iterate_multinet_layer_centrality(
+                    centrality_helper.nx_layer_dict, self.__dataset_helper.get_node_list(), centrality_helper,
+                    node_chunk_size):
+                yield DataFrame.from_dict(nodes_layer_centrality_chunk, orient='index').sort_index(axis=1).round(2)
+        finally:
+            centrality_helper.close()
+
+    def save_layer_centrality(self, centrality_measure, path, file_format=None, node_chunk_size=10000):
+        """
+        Computes the layer centrality of the nodes of the dataset and writes it to a .csv or .parquet file chunk by
+        chunk, while it is being computed.
+
+        :param centrality_measure: Name of the centrality measure.
+        :param path: Path of the result file.
+        :param file_format: "csv" or "parquet", or None to use the extension of :param path.
+        :param node_chunk_size: Number of nodes of each chunk.
+        :return: Number of written rows.
+        """
+
+        return write_layer_centrality_chunks(
+            self.iterate_layer_centrality(centrality_measure, node_chunk_size), path, file_format)
@@ -1,4 +1,36 @@
-from .centrality_helpers import *
-from .data_helpers import *
-from .dataset_helpers import *
-from .result_helpers import *
+from layer_centrality.utils.import_helpers import attach_lazy_submodules
+
+
+# The submodules are imported when one of their names is first accessed, so that importing the package does not
+# import their dependencies, e.g. the plotting libraries of result_helpers
+__getattr__, __dir__, __all__ = attach_lazy_submodules(__name__, {
+    'adjacency_helpers': ['PROBING_DISTANCE_MATRIX_MAX_SIZE', 'DENSE_FRONTIER_MIN_DENSITY', 'LayerAdjacency',
+        'create_symmetric_adjacency_matrix', 'get_component_node_index_array', 'compute_harmonic_centrality_array',
+        'compute_breadth_first_harmonic_centrality', 'compute_subgraph_centrality_array',
+        'estimate_subgraph_centrality_array', 'create_greedy_coloring_array', 'estimate_probing_exponential_diagonal'],
+    'cache_helpers': ['COALITION_TABLE_CACHE_VERSION', 'CoalitionTableCache'],
+    'centrality_helpers': ['CENTRALITY_MEASURES', 'DENSE_EIGENVALUE_SOLVER_MAX_NODES', 'KATZ_SOLVERS',
+        'CG_TOLERANCE_KEYWORD', 'SUBGRAPH_SOLVERS', 'SUBGRAPH_DENSE_SOLVER_MAX_NODES', 'DENSE_COALITION_TABLE_MAX_SIZE',
+        'CentralityHelper', 'DegreeCentralityHelper', 'HarmonicCentralityHelper', 'KatzCentralityHelper',
+        'SubgraphCentralityHelper', 'create_layer_combinations_node_centrality_dicts'],
+    'coalition_helpers': ['CoalitionIndex', 'CoalitionKeyView', 'CoalitionGraphBuilder', 'flatten_layer_combination'],
+    'data_helpers': ['get_node_connections_on_layers', 'print_node_layers', 'draw_layers',
+        'get_layer_total_number_of_nodes', 'get_layer_total_number_of_edges', 'get_layer_most_connected_node',
+        'get_layer_number_of_isolated_nodes'],
+    'dataset_helpers': ['UUNET_DATASETS', 'DatasetHelper'],
+    'network_file_helpers': ['NETWORK_FILE_FORMATS', 'MULTINET_TYPE_SECTION', 'MULTINET_LAYERS_SECTION',
+        'MULTINET_VERTICES_SECTION', 'MULTINET_EDGES_SECTION', 'MULTINET_NETWORK_TYPES', 'get_network_file_format',
+        'iterate_network_file_text_chunks', 'split_network_file_columns', 'intern_values',
+        'read_multilayer_network_file'],
+    'result_helpers': ['LAYER_CENTRALITY_RESULT_FILE_FORMATS', 'LAYER_INFLUENCE_CLASS_SETTINGS_DICT',
+        'LayerCentralityExcelModel', 'set_pandas_display_options', 'get_layer_influence_class',
+        'get_layer_influence_class_node_color', 'draw_results_layers', 'draw_flattened_network_clustering_results',
+        'draw_network_clustering_results', 'plot_results_histograms', 'save_results_data_frame_as_csv',
+        'LayerCentralityResultSink', 'write_layer_centrality_chunks', 'save_layer_centrality_excel_models_as_xlsx',
+        'save_results_analysis_data_frames_as_xlsx', 'get_layer_centrality_excel_models', 'get_max_layer_contribution',
+        'get_min_layer_contribution', 'get_number_of_layer_most_influenced_nodes'],
+    'snapshot_helpers': ['NETWORK_SNAPSHOT_VERSION', 'NETWORK_SNAPSHOT_MAGIC', 'NETWORK_SNAPSHOT_PREFIX',
+        'NETWORK_SNAPSHOT_ALIGNMENT', 'is_network_snapshot', 'save_network_snapshot', 'load_network_snapshot'],
+    'store_helpers': ['CoalitionValueMapping', 'CoalitionValueTable', 'CoalitionValueStore', 'CoalitionNodeValueView',
+        'remove_file_if_exists']
+})
@@ -0,0 +1,618 @@
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from numpy import arange, argmin, argsort, array, array_split, bincount, concatenate, diff, float32, flatnonzero, \
+    full, isin, ones, zeros
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import expm_multiply
+from layer_centrality.utils.coalition_helpers import CoalitionIndex
+from layer_centrality.utils.snapshot_helpers import load_network_snapshot
+
+
+# Number of pairs of nodes within the probing distance of each other above which the probing estimate of the
+# subgraph centrality gives way to the exact computation
+PROBING_DISTANCE_MATRIX_MAX_SIZE = 2 ** 27
+
+# Breadth first search frontiers with at least one node in this number of entries of their (node x search) matrix are
+# advanced by a dense matrix product
+DENSE_FRONTIER_MIN_DENSITY = 32
+
+
+class LayerAdjacency:
+    """
+    Keeps each layer of a multilayer network as a boolean scipy CSR adjacency matrix over a node index shared by all
+    layers, together with a boolean array marking the nodes which are present on the layer. The adjacency matrix of a
+    layer coalition is the boolean OR of the adjacency matrices of its layers.
+
+    The layers are either built from networkx graphs or taken as they are from CSR matrices, see from_csr. When the
+    matrices are the read-only views of a memory-mapped network snapshot, :attr snapshot_path is the path of the
+    snapshot, and a pickled copy, e.g. sent to a worker process, maps the snapshot again instead of copying the
+    matrices.
+    """
+
+    def __init__(self, nx_layer_dict, coalition_index=None):
+        self.coalition_index = CoalitionIndex(nx_layer_dict.keys()) if coalition_index is None else coalition_index
+        self.node_list = sorted(set().union(*[nx_layer.nodes for nx_layer in nx_layer_dict.values()]))
+        self.node_index_dict = {node: i for i, node in enumerate(self.node_list)}
+        self.snapshot_path = None
+        self.snapshot_hash = None
+
+        self.__layer_adjacency_matrix_list = []
+        self.__layer_node_presence_array_list = []
+
+        for layer in self.coalition_index.layer_list:
+            nx_layer = nx_layer_dict[layer]
+
+            layer_node_presence_array = zeros(len(self.node_list), dtype=bool)
+            layer_node_presence_array[[self.node_index_dict[node] for node in nx_layer.nodes]] = True
+
+            edge_index_array = array(
+                [(self.node_index_dict[source], self.node_index_dict[target]) for source, target in nx_layer.edges],
+                dtype=int).reshape(-1, 2)
+
+            self.__layer_node_presence_array_list.append(layer_node_presence_array)
+            self.__layer_adjacency_matrix_list.append(self.create_adjacency_matrix(edge_index_array))
+
+    @classmethod
+    def from_csr(
+            cls,
+            layer_csr_matrix_dict,
+            layer_node_presence_array_dict,
+            node_list,
+            node_index_dict=None,
+            coalition_index=None,
+            snapshot_path=None,
+            snapshot_hash=None
+    ):
+        """
+        Creates the layer adjacency of a multilayer network from the CSR adjacency matrices of its layers, e.g. those
+        of a DatasetHelper, without building networkx graphs. The matrices are kept as they are, so read-only views
+        of a memory-mapped snapshot are not copied.
+
+        :param layer_csr_matrix_dict: Dictionary containing the symmetric boolean CSR adjacency matrix of each layer,
+               over the positions of the nodes in :param node_list.
+        :param layer_node_presence_array_dict: Dictionary containing the boolean array marking the nodes which are
+               present on each layer.
+        :param node_list: Sorted list of the nodes.
+        :param node_index_dict: Dictionary containing the position of each node in :param node_list, e.g. the
+               interned ids of a DatasetHelper, or None to create it.
+        :param coalition_index: Coalition index of the layers, or None to index the layers of
+               :param layer_csr_matrix_dict in their order.
+        :param snapshot_path: Path of the network snapshot whose views the matrices are, or None.
+        :param snapshot_hash: Checksum of the network snapshot, checked when it is mapped again.
+        :return: Layer adjacency.
+        """
+
+        layer_adjacency = cls.__new__(cls)
+
+        layer_adjacency.coalition_index = \
+            CoalitionIndex(layer_csr_matrix_dict.keys()) if coalition_index is None else coalition_index
+        layer_adjacency.node_list = node_list
+        layer_adjacency.node_index_dict = \
+            {node: i for i, node in enumerate(node_list)} if node_index_dict is None else node_index_dict
+        layer_adjacency.snapshot_path = snapshot_path
+        layer_adjacency.snapshot_hash = snapshot_hash
+
+        # The presence arrays are updated in place, so they are copied
+        layer_adjacency.__layer_node_presence_array_list = [
+            array(layer_node_presence_array_dict[layer], dtype=bool)
+            for layer in layer_adjacency.coalition_index.layer_list]
+        layer_adjacency.__layer_adjacency_matrix_list = [
+            layer_csr_matrix_dict[layer] for layer in layer_adjacency.coalition_index.layer_list]
+
+        return layer_adjacency
+
+    def __getstate__(self):
+        # The matrices of a snapshot are not copied, the snapshot is mapped again when unpickling
+        state_dict = self.__dict__.copy()
+
+        if self.snapshot_path is not None:
+            state_dict['_LayerAdjacency__layer_adjacency_matrix_list'] = None
+
+        return state_dict
+
+    def __setstate__(self, state_dict):
+        self.__dict__.update(state_dict)
+
+        if self.__layer_adjacency_matrix_list is None:
+            _, _, _, layer_csr_matrix_dict, snapshot_hash = load_network_snapshot(self.snapshot_path)
+
+            if snapshot_hash != self.snapshot_hash:
+                raise ValueError("Network snapshot {0} changed since it was loaded".format(self.snapshot_path))
+
+            self.__layer_adjacency_matrix_list = [
+                layer_csr_matrix_dict[layer] for layer in self.coalition_index.layer_list]
+
+    def create_adjacency_matrix(self, edge_index_array):
+        """
+        Creates a symmetric boolean CSR adjacency matrix over the node index from an array of undirected edges.
+
+        :param edge_index_array: (E x 2) array containing the node indices of the end nodes of each edge.
+        :return: CSR adjacency matrix.
+        """
+
+        return create_symmetric_adjacency_matrix(edge_index_array[:, 0], edge_index_array[:, 1], len(self.node_list))
+
+    def get_layer_adjacency_matrix(self, layer):
+        return self.__layer_adjacency_matrix_list[self.coalition_index.layer_list.index(layer)]
+
+    def get_layer_node_presence_array(self, layer):
+        return self.__layer_node_presence_array_list[self.coalition_index.layer_list.index(layer)]
+
+    def get_coalition_adjacency_matrix(self, coalition_mask):
+        """
+        Returns the adjacency matrix of the flattened network of a coalition.
+
+        :param coalition_mask: Coalition bitmask.
+        :return: Boolean CSR adjacency matrix.
+        """
+
+        coalition_adjacency_matrix = csr_matrix((len(self.node_list), len(self.node_list)), dtype=bool)
+
+        for i in range(self.coalition_index.number_of_layers):
+            if coalition_mask >> i & 1:
+                coalition_adjacency_matrix = coalition_adjacency_matrix + self.__layer_adjacency_matrix_list[i]
+
+        return coalition_adjacency_matrix
+
+    def get_coalition_adjacency_rows(self, coalition_mask, node_index_array):
+        """
+        Returns the rows of the adjacency matrix of the flattened network of a coalition for a subset of nodes.
+
+        :param coalition_mask: Coalition bitmask.
+        :param node_index_array: Indices of the nodes.
+        :return: Boolean CSR matrix with a row for each node in :param node_index_array.
+        """
+
+        coalition_adjacency_rows = csr_matrix((len(node_index_array), len(self.node_list)), dtype=bool)
+
+        for i in range(self.coalition_index.number_of_layers):
+            if coalition_mask >> i & 1:
+                coalition_adjacency_rows = \
+                    coalition_adjacency_rows + self.__layer_adjacency_matrix_list[i][node_index_array]
+
+        return coalition_adjacency_rows
+
+    def update_layer_edges(self, layer, added_edge_index_array, removed_edge_index_array):
+        """
+        Removes and then inserts undirected edges in a layer. The end nodes of inserted edges become present on the
+        layer, while the end nodes of removed edges stay present.
+
+        :param layer: Layer name.
+        :param added_edge_index_array: (E x 2) array containing the node indices of the inserted edges.
+        :param removed_edge_index_array: (E x 2) array containing the node indices of the removed edges.
+        :return: void
+        """
+
+        i = self.coalition_index.layer_list.index(layer)
+
+        layer_adjacency_matrix = self.__layer_adjacency_matrix_list[i]
+
+        if len(removed_edge_index_array) > 0:
+            layer_adjacency_matrix = layer_adjacency_matrix > self.create_adjacency_matrix(removed_edge_index_array)
+
+        if len(added_edge_index_array) > 0:
+            layer_adjacency_matrix = layer_adjacency_matrix + self.create_adjacency_matrix(added_edge_index_array)
+            self.__layer_node_presence_array_list[i][added_edge_index_array.ravel()] = True
+
+        self.__layer_adjacency_matrix_list[i] = layer_adjacency_matrix
+
+        # The layer no longer matches the snapshot
+        self.snapshot_path = None
+        self.snapshot_hash = None
+
+    def get_layer_representative_index_list(self):
+        """
+        Finds the layers which have the same nodes and the same connections. Such layers are symmetric players of the
+        layer centrality game, since a coalition containing one of them has the same flattened network whether it
+        contains the others or not.
+
+        :return: List containing, for each layer, the position of the first layer identical to it in the layer list.
+        """
+
+        layer_representative_index_list = []
+        layer_hash_representative_index_dict = {}
+
+        for i, layer_adjacency_matrix in enumerate(self.__layer_adjacency_matrix_list):
+            layer_adjacency_matrix = layer_adjacency_matrix.sorted_indices()
+
+            layer_hash = sha256()
+            layer_hash.update(self.__layer_node_presence_array_list[i].tobytes())
+            layer_hash.update(layer_adjacency_matrix.indptr.astype('<i8').tobytes())
+            layer_hash.update(layer_adjacency_matrix.indices.astype('<i8').tobytes())
+
+            layer_representative_index_list.append(
+                layer_hash_representative_index_dict.setdefault(layer_hash.digest(), i))
+
+        return layer_representative_index_list
+
+    def create_canonical_coalition_mask_array(self):
+        """
+        Maps each coalition to the coalition obtained by replacing each of its layers by the first identical layer,
+        which has the same flattened network.
+
+        :return: Array containing the canonical bitmask of each coalition bitmask.
+        """
+
+        coalition_mask_array = arange(self.coalition_index.full_coalition_mask + 1)
+        canonical_coalition_mask_array = zeros(len(coalition_mask_array), dtype=int)
+
+        for i, representative_index in enumerate(self.get_layer_representative_index_list()):
+            canonical_coalition_mask_array |= (coalition_mask_array >> i & 1) << representative_index
+
+        return canonical_coalition_mask_array
+
+    def get_coalition_node_presence_array(self, coalition_mask):
+        """
+        Returns the nodes which are present in the flattened network of a coalition.
+
+        :param coalition_mask: Coalition bitmask.
+        :return: Boolean array over the node index.
+        """
+
+        coalition_node_presence_array = zeros(len(self.node_list), dtype=bool)
+
+        for i in range(self.coalition_index.number_of_layers):
+            if coalition_mask >> i & 1:
+                coalition_node_presence_array |= self.__layer_node_presence_array_list[i]
+
+        return coalition_node_presence_array
+
+    def iterate_coalition_adjacency_matrices(self):
+        """
+        Generates the adjacency matrices of all non-empty coalitions by walking the coalition lattice depth first,
+        obtaining each coalition from the coalition without its highest layer, plus that layer.
+
+        :return: Generator of (coalition bitmask, adjacency matrix, node presence array) tuples.
+        """
+
+        yield from self.__iterate_coalition_adjacency_matrices(
+            0, -1, csr_matrix((len(self.node_list), len(self.node_list)), dtype=bool),
+            zeros(len(self.node_list), dtype=bool))
+
+    def __iterate_coalition_adjacency_matrices(
+            self,
+            coalition_mask,
+            highest_layer_index,
+            coalition_adjacency_matrix,
+            coalition_node_presence_array
+    ):
+        for i in range(highest_layer_index + 1, self.coalition_index.number_of_layers):
+            extended_coalition_adjacency_matrix = coalition_adjacency_matrix + self.__layer_adjacency_matrix_list[i]
+            extended_coalition_node_presence_array = \
+                coalition_node_presence_array | self.__layer_node_presence_array_list[i]
+
+            yield coalition_mask | (1 << i), extended_coalition_adjacency_matrix, extended_coalition_node_presence_array
+
+            yield from self.__iterate_coalition_adjacency_matrices(
+                coalition_mask | (1 << i), i, extended_coalition_adjacency_matrix,
+                extended_coalition_node_presence_array)
+
+
+def create_symmetric_adjacency_matrix(source_array, target_array, number_of_nodes):
+    """
+    Creates a symmetric boolean CSR adjacency matrix from the end nodes of undirected edges.
+
+    :param source_array: Array containing the node index of the first end node of each edge.
+    :param target_array: Array containing the node index of the second end node of each edge.
+    :param number_of_nodes: Number of nodes of the network.
+    :return: CSR adjacency matrix.
+    """
+
+    return csr_matrix(
+        (ones(2 * len(source_array), dtype=bool),
+         (concatenate([source_array, target_array]), concatenate([target_array, source_array]))),
+        shape=(number_of_nodes, number_of_nodes), dtype=bool)
+
+
+def get_component_node_index_array(adjacency_matrix, node_index_array):
+    """
+    Returns the nodes of the connected components of an undirected network which contain at least one of the given
+    nodes.
+
+    :param adjacency_matrix: Symmetric CSR adjacency matrix of the network.
+    :param node_index_array: Indices of the nodes.
+    :return: Sorted array containing the indices of the nodes in the components of :param node_index_array.
+    """
+
+    _, component_label_array = connected_components(adjacency_matrix, directed=False)
+
+    return flatnonzero(isin(component_label_array, component_label_array[node_index_array]))
+
+
+def compute_harmonic_centrality_array(
+        adjacency_matrix,
+        source_index_array=None,
+        chunk_size=None,
+        number_of_threads=1
+):
+    """
+    Computes the harmonic centrality, i.e. the sum of the inverse distances to all other reachable nodes, of the
+    source nodes of an unweighted undirected network. The sources are processed in chunks by a batched breadth
+    first search, in which the frontiers of all sources of a chunk are advanced together by a sparse matrix
+    product. The chunks are processed by a pool of threads, since the sparse products release the GIL.
+
+    :param adjacency_matrix: Symmetric CSR adjacency matrix of the network.
+    :param source_index_array: Indices of the nodes for which the harmonic centrality is computed, or None for all
+           nodes.
+    :param chunk_size: Number of sources searched together, or None to bound the memory of a chunk to about 128 MB.
+    :param number_of_threads: Number of chunks searched in parallel.
+    :return: Array containing the harmonic centrality of each node in :param source_index_array.
+    """
+
+    number_of_nodes = adjacency_matrix.shape[0]
+
+    if source_index_array is None:
+        source_index_array = arange(number_of_nodes)
+
+    harmonic_centrality_array = zeros(len(source_index_array))
+
+    # Isolated sources do not reach any other node
+    non_isolated_source_array = flatnonzero(adjacency_matrix.getnnz(axis=1)[source_index_array])
+
+    if len(non_isolated_source_array) == 0:
+        return harmonic_centrality_array
+
+    if chunk_size is None:
+        chunk_size = max(1, min(1024, 2 ** 27 // (10 * number_of_nodes)))
+
+    search_adjacency_matrix = adjacency_matrix.astype(float32)
+    source_chunk_list = array_split(
+        non_isolated_source_array, -(-len(non_isolated_source_array) // chunk_size))
+
+    def compute_source_chunk(source_chunk_array):
+        return compute_breadth_first_harmonic_centrality(
+            search_adjacency_matrix, source_index_array[source_chunk_array])
+
+    with ThreadPoolExecutor(max_workers=max(1, number_of_threads)) as executor:
+        harmonic_centrality_array[non_isolated_source_array] = concatenate(
+            list(executor.map(compute_source_chunk, source_chunk_list)))
+
+    return harmonic_centrality_array
+
+
+def compute_breadth_first_harmonic_centrality(adjacency_matrix, source_index_array):
+    """
+    Computes the harmonic centrality of a chunk of sources with a breadth first search advancing the frontiers of all
+    sources together. The nodes first reached at level d add 1/d to the harmonic centrality of their source.
+
+    Each level only involves the searches which are not finished yet. A frontier covering at least
+    1 / :const DENSE_FRONTIER_MIN_DENSITY of its (node x search) matrix is advanced by a product with a dense matrix,
+    a sparser one by a product with a sparse matrix, which only follows the connections of the nodes of the frontier.
+
+    :param adjacency_matrix: Symmetric CSR adjacency matrix of the network.
+    :param source_index_array: Indices of the source nodes.
+    :return: Array containing the harmonic centrality of each source.
+    """
+
+    number_of_nodes = adjacency_matrix.shape[0]
+    number_of_sources = len(source_index_array)
+
+    harmonic_centrality_array = zeros(number_of_sources)
+
+    visited_matrix = zeros((number_of_nodes, number_of_sources), dtype=bool)
+    visited_matrix[source_index_array, arange(number_of_sources)] = True
+
+    def is_dense_frontier(frontier_size, number_of_active_sources):
+        return DENSE_FRONTIER_MIN_DENSITY * frontier_size >= number_of_nodes * number_of_active_sources
+
+    # A sparse frontier is kept as the (node, source position) pairs of the nodes reached at the previous level, a
+    # dense one as a (node x active source) matrix
+    frontier_node_array = source_index_array
+    frontier_source_array = arange(number_of_sources)
+    frontier_matrix = None
+    active_source_array = None
+
+    level = 0
+
+    while frontier_matrix is not None or len(frontier_node_array) > 0:
+        level += 1
+
+        if frontier_matrix is None:
+            # Positions of the searches which are not finished among the sources of the chunk
+            active_source_array = flatnonzero(bincount(frontier_source_array, minlength=number_of_sources))
+
+            if is_dense_frontier(len(frontier_node_array), len(active_source_array)):
+                active_column_array = zeros(number_of_sources, dtype=int)
+                active_column_array[active_source_array] = arange(len(active_source_array))
+
+                frontier_matrix = zeros((number_of_nodes, len(active_source_array)), dtype=float32)
+                frontier_matrix[frontier_node_array, active_column_array[frontier_source_array]] = 1
+
+        if frontier_matrix is not None:
+            reached_matrix = adjacency_matrix @ frontier_matrix > 0
+
+            # The columns of the visited matrix are only copied when some searches are finished
+            if len(active_source_array) == number_of_sources:
+                reached_matrix &= ~visited_matrix
+                visited_matrix |= reached_matrix
+            else:
+                reached_matrix &= ~visited_matrix[:, active_source_array]
+                visited_matrix[:, active_source_array] |= reached_matrix
+
+            number_of_reached_nodes_array = reached_matrix.sum(axis=0)
+            harmonic_centrality_array[active_source_array] += number_of_reached_nodes_array / level
+
+            active_column_mask = number_of_reached_nodes_array > 0
+
+            if not active_column_mask.all():
+                active_source_array = active_source_array[active_column_mask]
+                reached_matrix = reached_matrix[:, active_column_mask]
+
+            if len(active_source_array) > 0 and \
+                    is_dense_frontier(number_of_reached_nodes_array.sum(), len(active_source_array)):
+                frontier_matrix = reached_matrix.astype(float32)
+            else:
+                frontier_node_array, reached_column_array = reached_matrix.nonzero()
+                frontier_source_array = active_source_array[reached_column_array]
+                frontier_matrix = None
+
+            continue
+
+        frontier_adjacency_matrix = csr_matrix(
+            (ones(len(frontier_node_array), dtype=float32), (frontier_node_array, frontier_source_array)),
+            shape=(number_of_nodes, number_of_sources))
+
+        reached_matrix = (adjacency_matrix @ frontier_adjacency_matrix).tocoo()
+
+        # Keep the nodes which are reached for the first time by the search of their source
+        first_reached_mask = ~visited_matrix[reached_matrix.row, reached_matrix.col]
+        frontier_node_array = reached_matrix.row[first_reached_mask]
+        frontier_source_array = reached_matrix.col[first_reached_mask]
+
+        visited_matrix[frontier_node_array, frontier_source_array] = True
+        harmonic_centrality_array += bincount(frontier_source_array, minlength=number_of_sources) / level
+
+    return harmonic_centrality_array
+
+
+def compute_subgraph_centrality_array(adjacency_matrix, block_size=256):
+    """
+    Computes the subgraph centrality, i.e. the diagonal of exp(A), of the nodes of an undirected network. The columns
+    of exp(A) are computed in blocks by applying expm_multiply to blocks of columns of the identity matrix, so only a
+    (node x block) dense matrix is kept in memory. Only the non-isolated nodes are evaluated, since the subgraph
+    centrality of an isolated node is 1.
+
+    :param adjacency_matrix: Symmetric CSR adjacency matrix of the network.
+    :param block_size: Number of columns of exp(A) computed together.
+    :return: Array containing the subgraph centrality of each node.
+    """
+
+    subgraph_centrality_array = ones(adjacency_matrix.shape[0])
+
+    node_index_array = flatnonzero(adjacency_matrix.getnnz(axis=1))
+
+    if len(node_index_array) == 0:
+        return subgraph_centrality_array
+
+    non_isolated_adjacency_matrix = adjacency_matrix[node_index_array][:, node_index_array].astype(float)
+
+    for block_start in range(0, len(node_index_array), block_size):
+        block_index_array = arange(block_start, min(block_start + block_size, len(node_index_array)))
+
+        identity_block_matrix = zeros((len(node_index_array), len(block_index_array)))
+        identity_block_matrix[block_index_array, arange(len(block_index_array))] = 1
+
+        subgraph_centrality_array[node_index_array[block_index_array]] = expm_multiply(
+            non_isolated_adjacency_matrix, identity_block_matrix)[block_index_array, arange(len(block_index_array))]
+
+    return subgraph_centrality_array
+
+
+def estimate_subgraph_centrality_array(
+        adjacency_matrix,
+        tolerance=1e-6,
+        block_size=256,
+        max_probing_distance=32
+):
+    """
+    Estimates the subgraph centrality, i.e. the diagonal of exp(A), of the nodes of an undirected network by probing.
+    The nodes are colored so that two nodes within distance d of each other have different colors, and exp(A) is
+    applied to the indicator vector of each color with expm_multiply. The entry of a node in the product of its color
+    is its entry on the diagonal of exp(A), plus the entries of exp(A) between the node and the other nodes of its
+    color, which count walks longer than d and decay quickly with d. The number of products is the number of colors,
+    which is bounded by the size of the d-neighbourhoods of the nodes, not by the number of nodes.
+
+    The distance d is increased until the estimates of all nodes change by less than :param tolerance times the
+    estimate. When this does not happen up to :param max_probing_distance, when the coloring needs as many colors as
+    half of the nodes or when the neighbourhoods outgrow :const PROBING_DISTANCE_MATRIX_MAX_SIZE, as in networks with
+    a small diameter, the diagonal is computed exactly by compute_subgraph_centrality_array.
+
+    :param adjacency_matrix: Symmetric CSR adjacency matrix of the network.
+    :param tolerance: Relative change of the estimates at which the distance stops increasing.
+    :param block_size: Number of colors whose products are computed together.
+    :param max_probing_distance: Maximum distance between the nodes which have different colors.
+    :return: Array containing the estimated subgraph centrality of each node.
+    """
+
+    subgraph_centrality_array = ones(adjacency_matrix.shape[0])
+
+    node_index_array = flatnonzero(adjacency_matrix.getnnz(axis=1))
+
+    if len(node_index_array) == 0:
+        return subgraph_centrality_array
+
+    non_isolated_adjacency_matrix = adjacency_matrix[node_index_array][:, node_index_array].astype(bool)
+    exponential_adjacency_matrix = non_isolated_adjacency_matrix.astype(float)
+
+    # Nodes within the probing distance of each other
+    distance_adjacency_matrix = non_isolated_adjacency_matrix
+    estimate_array = None
+
+    for _ in range(max_probing_distance):
+        color_array = create_greedy_coloring_array(distance_adjacency_matrix)
+        number_of_colors = int(color_array.max()) + 1
+
+        if 2 * number_of_colors >= len(node_index_array) or \
+                distance_adjacency_matrix.nnz > PROBING_DISTANCE_MATRIX_MAX_SIZE:
+            break
+
+        previous_estimate_array = estimate_array
+        estimate_array = estimate_probing_exponential_diagonal(
+            exponential_adjacency_matrix, color_array, number_of_colors, block_size)
+
+        if previous_estimate_array is not None and \
+                (abs(estimate_array - previous_estimate_array) <= tolerance * abs(estimate_array)).all():
+            subgraph_centrality_array[node_index_array] = estimate_array
+
+            return subgraph_centrality_array
+
+        distance_adjacency_matrix = (distance_adjacency_matrix @ non_isolated_adjacency_matrix +
+                                     distance_adjacency_matrix).tocsr()
+
+    return compute_subgraph_centrality_array(adjacency_matrix, block_size)
+
+
+def create_greedy_coloring_array(adjacency_matrix):
+    """
+    Colors the nodes of a network greedily, in order of decreasing degree, so that adjacent nodes have different
+    colors. Each node gets the smallest color which none of its already colored neighbours has.
+
+    :param adjacency_matrix: Symmetric CSR adjacency matrix of the network.
+    :return: Array containing the color of each node, numbered from 0.
+    """
+
+    indptr_array = adjacency_matrix.indptr
+    indices_array = adjacency_matrix.indices
+    degree_array = diff(indptr_array)
+
+    color_array = full(adjacency_matrix.shape[0], -1)
+
+    for node in argsort(-degree_array, kind='stable'):
+        neighbour_color_array = color_array[indices_array[indptr_array[node]:indptr_array[node + 1]]]
+
+        # A node with k neighbours gets one of the colors 0, ..., k
+        used_color_mask = zeros(len(neighbour_color_array) + 1, dtype=bool)
+        used_color_mask[neighbour_color_array[
+            (neighbour_color_array >= 0) & (neighbour_color_array < len(used_color_mask))]] = True
+
+        color_array[node] = argmin(used_color_mask)
+
+    return color_array
+
+
+def estimate_probing_exponential_diagonal(adjacency_matrix, color_array, number_of_colors, block_size):
+    """
+    Estimates the diagonal of exp(A) from the products of exp(A) with the indicator vectors of the colors of the
+    nodes, see estimate_subgraph_centrality_array. The products of a block of colors are computed together.
+
+    :param adjacency_matrix: Symmetric CSR adjacency matrix of the network, with float values.
+    :param color_array: Array containing the color of each node.
+    :param number_of_colors: Number of colors.
+    :param block_size: Number of colors whose products are computed together.
+    :return: Array containing the estimate of each node.
+    """
+
+    estimate_array = zeros(adjacency_matrix.shape[0])
+
+    for block_start in range(0, number_of_colors, block_size):
+        block_node_index_array = flatnonzero((color_array >= block_start) & (color_array < block_start + block_size))
+        block_color_array = color_array[block_node_index_array] - block_start
+
+        probing_matrix = zeros((adjacency_matrix.shape[0], min(block_size, number_of_colors - block_start)))
+        probing_matrix[block_node_index_array, block_color_array] = 1
+
+        estimate_array[block_node_index_array] = expm_multiply(adjacency_matrix, probing_matrix)[
+            block_node_index_array, block_color_array]
+
+    return estimate_array
@@ -0,0 +1,190 @@
+import json
+from hashlib import sha256
+from os import makedirs, remove, replace, scandir, utime
+from os.path import exists, join
+from tempfile import NamedTemporaryFile
+from numpy import arange, ascontiguousarray, empty_like, load, save, zeros
+
+
+# Version of the cache key and of the layout of the cache entries, changing it invalidates all existing entries
+COALITION_TABLE_CACHE_VERSION = 1
+
+
+class CoalitionTableCache:
+    """
+    Persistent cache of (coalition x node) centrality tables. An entry is addressed by a hash of the layers of the
+    multilayer network, the name of the centrality measure and its parameters, and consists of the table, stored as
+    a binary numpy file, and of a small json file holding the checksum of the table, which is verified on read. When
+    the cache grows over :attr max_cache_size bytes, the least recently used entries are evicted.
+
+    The layers are hashed and the table rows are stored in the order of the sorted layer names, so an entry is found
+    whatever the order in which the layers of the network were loaded.
+    """
+
+    def __init__(self, cache_directory, max_cache_size=2 ** 30):
+        self.cache_directory = cache_directory
+        self.max_cache_size = max_cache_size
+
+        makedirs(cache_directory, exist_ok=True)
+
+    def get_cache_key(self, layer_adjacency, centrality_measure_name, centrality_parameter_dict):
+        """
+        Computes the key of a coalition table from the layers of a multilayer network, in the order of their sorted
+        names, together with the node list, which defines the columns of the table.
+
+        :param layer_adjacency: Layer adjacency of the multilayer network.
+        :param centrality_measure_name: Name of the centrality measure.
+        :param centrality_parameter_dict: Dictionary of the parameters which change the centrality values.
+        :return: Hexadecimal key.
+        """
+
+        layer_list = layer_adjacency.coalition_index.layer_list
+        canonical_layer_list = [layer_list[i] for i in self.get_canonical_layer_index_list(layer_list)]
+
+        key_hash = sha256()
+
+        key_hash.update(json.dumps({
+            'version': COALITION_TABLE_CACHE_VERSION,
+            'centrality_measure_name': centrality_measure_name,
+            'centrality_parameter_dict': centrality_parameter_dict,
+            'layer_list': [repr(layer) for layer in canonical_layer_list],
+            'node_list': [repr(node) for node in layer_adjacency.node_list]
+        }, sort_keys=True).encode())
+
+        for layer in canonical_layer_list:
+            layer_adjacency_matrix = layer_adjacency.get_layer_adjacency_matrix(layer).sorted_indices()
+
+            key_hash.update(layer_adjacency.get_layer_node_presence_array(layer).tobytes())
+            key_hash.update(layer_adjacency_matrix.indptr.astype('<i8').tobytes())
+            key_hash.update(layer_adjacency_matrix.indices.astype('<i8').tobytes())
+
+        return key_hash.hexdigest()
+
+    def get_canonical_layer_index_list(self, layer_list):
+        return sorted(range(len(layer_list)), key=lambda i: repr(layer_list[i]))
+
+    def get_canonical_coalition_mask_array(self, layer_list):
+        """
+        Maps the coalition bitmasks over :param layer_list to the bitmasks over the sorted layers.
+
+        :param layer_list: List of layers defining the coalition bitmasks.
+        :return: Array containing the canonical bitmask of each coalition bitmask.
+        """
+
+        coalition_mask_array = arange(1 << len(layer_list))
+        canonical_coalition_mask_array = zeros(1 << len(layer_list), dtype=int)
+
+        for canonical_position, i in enumerate(self.get_canonical_layer_index_list(layer_list)):
+            canonical_coalition_mask_array |= (coalition_mask_array >> i & 1) << canonical_position
+
+        return canonical_coalition_mask_array
+
+    def get_table_path(self, cache_key):
+        return join(self.cache_directory, cache_key + '.npy')
+
+    def get_metadata_path(self, cache_key):
+        return join(self.cache_directory, cache_key + '.json')
+
+    def load(self, cache_key, layer_list):
+        """
+        Loads the coalition table of a cache key. An entry whose checksum does not match its table is removed.
+
+        :param cache_key: Key returned by get_cache_key.
+        :param layer_list: List of layers defining the coalition bitmasks of the returned table.
+        :return: Coalition table, or None if the cache does not contain a valid entry for the key.
+        """
+
+        table_path = self.get_table_path(cache_key)
+        metadata_path = self.get_metadata_path(cache_key)
+
+        if not exists(table_path) or not exists(metadata_path):
+            return None
+
+        try:
+            with open(metadata_path) as metadata_file:
+                metadata_dict = json.load(metadata_file)
+
+            coalition_node_table = load(table_path, allow_pickle=False)
+        except (OSError, ValueError):
+            self.remove(cache_key)
+
+            return None
+
+        if metadata_dict.get('version') != COALITION_TABLE_CACHE_VERSION or \
+                metadata_dict.get('sha256') != sha256(coalition_node_table.tobytes()).hexdigest():
+            self.remove(cache_key)
+
+            return None
+
+        # Mark the entry as recently used
+        utime(table_path)
+        utime(metadata_path)
+
+        return coalition_node_table[self.get_canonical_coalition_mask_array(layer_list)]
+
+    def store(self, cache_key, coalition_node_table, layer_list):
+        """
+        Stores the coalition table of a cache key, replacing any existing entry, and evicts the least recently used
+        entries if the cache becomes too large. The files are written under temporary names and then renamed, so
+        that concurrent readers never see a partially written entry.
+
+        :param cache_key: Key returned by get_cache_key.
+        :param coalition_node_table: (coalition x node) table of centrality values.
+        :param layer_list: List of layers defining the coalition bitmasks of the table.
+        :return: void
+        """
+
+        canonical_coalition_node_table = empty_like(coalition_node_table)
+        canonical_coalition_node_table[self.get_canonical_coalition_mask_array(layer_list)] = coalition_node_table
+        coalition_node_table = ascontiguousarray(canonical_coalition_node_table)
+
+        metadata_dict = {
+            'version': COALITION_TABLE_CACHE_VERSION,
+            'shape': list(coalition_node_table.shape),
+            'dtype': coalition_node_table.dtype.str,
+            'sha256': sha256(coalition_node_table.tobytes()).hexdigest()
+        }
+
+        with NamedTemporaryFile(dir=self.cache_directory, suffix='.tmp', delete=False) as table_file:
+            save(table_file, coalition_node_table, allow_pickle=False)
+
+        with NamedTemporaryFile('w', dir=self.cache_directory, suffix='.tmp', delete=False) as metadata_file:
+            json.dump(metadata_dict, metadata_file)
+
+        replace(table_file.name, self.get_table_path(cache_key))
+        replace(metadata_file.name, self.get_metadata_path(cache_key))
+
+        self.evict()
+
+    def remove(self, cache_key):
+        for path in [self.get_table_path(cache_key), self.get_metadata_path(cache_key)]:
+            if exists(path):
+                remove(path)
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the size of the cache is at most :attr max_cache_size.
+
+        :return: void
+        """
+
+        cache_entry_dict = {}
+
+        for directory_entry in scandir(self.cache_directory):
+            cache_key, _, extension = directory_entry.name.rpartition('.')
+
+            if extension not in ('npy', 'json'):
+                continue
+
+            size, last_used_time = cache_entry_dict.get(cache_key, (0, 0))
+            cache_entry_dict[cache_key] = (
+                size + directory_entry.stat().st_size, max(last_used_time, directory_entry.stat().st_mtime))
+
+        cache_size = sum(size for size, _ in cache_entry_dict.values())
+
+        for cache_key, (size, _) in sorted(cache_entry_dict.items(), key=lambda item: item[1][1]):
+            if cache_size <= self.max_cache_size:
+                break
+
+            self.remove(cache_key)
+            cache_size -= size
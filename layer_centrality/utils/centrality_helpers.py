@@ -1,63 +1,588 @@
 import abc
-from itertools import combinations
-from networkx import degree, harmonic_centrality, katz_centrality, adjacency_matrix, subgraph_centrality
-from numpy.linalg import eigvals
-from pandas import DataFrame
+from inspect import signature
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count
+from networkx import degree, harmonic_centrality, katz_centrality, subgraph_centrality
+from numpy import arange, array, concatenate, dtype, exp, flatnonzero, float64, full, isnan, nan, ndarray, ones, \
+    unique, where, zeros
+from numpy.linalg import eigh, eigvalsh
+from scipy.sparse import identity
+from scipy.sparse.linalg import cg, eigsh, spsolve
+from layer_centrality.utils.adjacency_helpers import LayerAdjacency, compute_harmonic_centrality_array, \
+    compute_subgraph_centrality_array, estimate_subgraph_centrality_array, get_component_node_index_array
+from layer_centrality.utils.cache_helpers import CoalitionTableCache
+from layer_centrality.utils.coalition_helpers import CoalitionGraphBuilder, CoalitionIndex, CoalitionKeyView
 from layer_centrality.utils.data_helpers import get_node_connections_on_layers
-from uunet.multinet import empty, add_nx_layer, flatten, layers, to_nx_dict
+from layer_centrality.utils.store_helpers import CoalitionValueStore, CoalitionValueTable
 
 
 CENTRALITY_MEASURES = ["degree", "harmonic", "katz", "subgraph"]
 
+# Networks up to this number of nodes have their largest eigenvalue computed by a dense solver
+DENSE_EIGENVALUE_SOLVER_MAX_NODES = 256
+
+KATZ_SOLVERS = ["cg", "direct"]
+
+# The relative tolerance of the conjugate gradient solver was renamed from tol to rtol in scipy 1.12
+CG_TOLERANCE_KEYWORD = "rtol" if "rtol" in signature(cg).parameters else "tol"
+
+SUBGRAPH_SOLVERS = ["auto", "dense", "expm", "probing"]
+
+# In the auto mode, networks up to this number of non-isolated nodes have their subgraph centrality computed from a
+# dense eigendecomposition, larger networks with blocked expm_multiply. The probing estimate is only used on request
+SUBGRAPH_DENSE_SOLVER_MAX_NODES = 2000
+
+# Without precomputation, the dense (coalition x node) table is only allocated up front when its size in bytes is
+# at most this value
+DENSE_COALITION_TABLE_MAX_SIZE = 2 ** 27
+
+# State of a coalition worker process: the centrality helper and the shared result table
+_coalition_worker_state_dict = {}
+
+
+def _initialize_coalition_worker(centrality_helper, shared_memory_name, coalition_node_table_shape):
+    shared_memory = SharedMemory(name=shared_memory_name)
+
+    _coalition_worker_state_dict['centrality_helper'] = centrality_helper
+    _coalition_worker_state_dict['shared_memory'] = shared_memory
+    _coalition_worker_state_dict['coalition_node_table'] = ndarray(
+        coalition_node_table_shape, dtype=float64, buffer=shared_memory.buf)
+
+
+def _compute_coalition_node_centrality_row(coalition_mask):
+    centrality_helper = _coalition_worker_state_dict['centrality_helper']
+
+    _coalition_worker_state_dict['coalition_node_table'][coalition_mask] = \
+        centrality_helper.compute_coalition_node_centrality_array(coalition_mask)
+
 
 class CentralityHelper:
 
-    layer_combinations_node_centrality_dict = {}
+    # Whether the centrality measure can be computed directly from a sparse adjacency matrix
+    supports_sparse_adjacency = False
+
+    # Whether the centrality value of a node only depends on its own connections. Then only the end nodes of changed
+    # connections are recomputed on updates, and the layers on which a node has no connections are null players of
+    # its layer centrality game
+    is_local_measure = False
+
+    # Whether the centrality value of a node only depends on the connected component of the node in the flattened
+    # network. Then only the nodes in the components which contain end nodes of changed connections are recomputed
+    # on updates
+    is_component_measure = False
+
+    def __init__(
+            self,
+            nx_layer_dict,
+            precompute=True,
+            number_of_workers=1,
+            use_sparse_adjacency=True,
+            cache=None,
+            memory_budget=None,
+            spill_to_disk=False,
+            value_dtype=float64,
+            memory_map=None,
+            layer_adjacency=None
+    ):
+        self.nx_layer_dict = nx_layer_dict
+
+        # A layer adjacency created from CSR matrices, e.g. by DatasetHelper.get_layer_adjacency, is used as it is, and
+        # then the networkx layers are only needed by the helpers which do not use sparse adjacency
+        if layer_adjacency is None:
+            self.coalition_index = CoalitionIndex(nx_layer_dict.keys())
+            self.layer_adjacency = LayerAdjacency(nx_layer_dict, self.coalition_index)
+        else:
+            self.coalition_index = layer_adjacency.coalition_index
+            self.layer_adjacency = layer_adjacency
+
+        self.node_list = self.layer_adjacency.node_list
+        self.use_sparse_adjacency = use_sparse_adjacency and self.supports_sparse_adjacency
+
+        if nx_layer_dict is None and not self.use_sparse_adjacency:
+            raise ValueError("The {0} helper needs the networkx layers when it does not use sparse adjacency".format(
+                self.centrality_measure_name))
+        self.coalition_graph_builder = None
+        self.number_of_workers = cpu_count() if number_of_workers is None else number_of_workers
+        self.cache = CoalitionTableCache(cache) if isinstance(cache, str) else cache
+
+        # Node centrality values of the layer combinations, keyed by coalition bitmask. The dense (coalition x node)
+        # table is only allocated when all coalitions are evaluated, when it is memory-mapped or when it is small.
+        # Otherwise, e.g. when sampling coalitions, only the rows of the evaluated coalitions are kept. With a memory
+        # budget, rows evicted from memory are recomputed when they are accessed again
+        coalition_node_table_size = \
+            (self.coalition_index.full_coalition_mask + 1) * len(self.node_list) * dtype(value_dtype).itemsize
+
+        if memory_budget is None and (precompute or memory_map not in (None, False) or
+                                      coalition_node_table_size <= DENSE_COALITION_TABLE_MAX_SIZE):
+            self.coalition_node_centrality_dict = CoalitionValueTable(
+                self.node_list, self.coalition_index.full_coalition_mask + 1, self.layer_adjacency.node_index_dict,
+                value_dtype, memory_map)
+        elif memory_budget is None:
+            self.coalition_node_centrality_dict = CoalitionValueStore(
+                self.node_list, self.layer_adjacency.node_index_dict, dtype=value_dtype)
+        else:
+            self.coalition_node_centrality_dict = CoalitionValueStore(
+                self.node_list, self.layer_adjacency.node_index_dict, memory_budget, spill_to_disk,
+                self.compute_coalition_node_centrality_array, value_dtype)
+
+        self.prepare_centrality_measure()
+
+        if self.load_cached_coalition_node_table():
+            return
+
+        if precompute and self.number_of_workers > 1:
+            self.create_layer_combinations_node_centrality_dict_in_parallel()
+        elif precompute:
+            self.create_layer_combinations_node_centrality_dict(nx_layer_dict)
+
+        if precompute and self.cache is not None:
+            self.cache.store(
+                self.get_cache_key(), self.create_coalition_node_table(), self.coalition_index.layer_list)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Releases the node centrality values of all layer combinations, including those spilled to disk.
+
+        :return: void
+        """
+
+        self.coalition_node_centrality_dict.close()
 
-    def __init__(self, nx_layer_dict):
-        self.create_layer_combinations_node_centrality_dict(nx_layer_dict)
+    @property
+    def layer_combinations_node_centrality_dict(self):
+        """
+        Read-only view of the node centrality values for all layer combinations, keyed by the legacy string keys
+        obtained by joining the sorted layer names of the combinations.
+        """
+
+        return CoalitionKeyView(self.coalition_index, self.coalition_node_centrality_dict)
 
     def create_layer_combinations_node_centrality_dict(
             self,
             nx_layer_dict
     ):
         """
-        Creates a dictionary containing node centrality values for all layer combinations of all possible lengths.
+        Creates a dictionary containing node centrality values for all layer combinations of all possible lengths,
+        keyed by the coalition bitmasks of :attr coalition_index. The flattened networks of the layer combinations
+        are built incrementally while walking the coalition lattice. Layer combinations which differ only by
+        identical layers have the same flattened network, so only the first of them is evaluated.
 
         :param nx_layer_dict: Multilayer network layer dictionary.
         :return: Dictionary containing node centrality values for all layer combinations of all possible lengths
         """
 
-        # Generate all possible layer combinations of all possible lengths
-        for i in range(len(nx_layer_dict)):
-            layer_combination_tuple_list = list(combinations(nx_layer_dict.keys(), i + 1))
-            self.compute_layer_combinations_node_centrality(
-                nx_layer_dict, layer_combination_tuple_list, self.layer_combinations_node_centrality_dict)
+        if nx_layer_dict is self.nx_layer_dict:
+            canonical_coalition_mask_array = self.layer_adjacency.create_canonical_coalition_mask_array()
+        else:
+            canonical_coalition_mask_array = arange(self.coalition_index.full_coalition_mask + 1)
+
+        # Evaluated coalition of each canonical coalition
+        evaluated_coalition_mask_dict = {}
+
+        if self.use_sparse_adjacency and nx_layer_dict is self.nx_layer_dict:
+            # Generate all possible layer combinations of all possible lengths
+            for coalition_mask, coalition_adjacency_matrix, coalition_node_presence_array in \
+                    self.layer_adjacency.iterate_coalition_adjacency_matrices():
+                if canonical_coalition_mask_array[coalition_mask] in evaluated_coalition_mask_dict:
+                    self.copy_coalition_node_row(
+                        evaluated_coalition_mask_dict[canonical_coalition_mask_array[coalition_mask]], coalition_mask)
+                    continue
+
+                self.coalition_node_centrality_dict[coalition_mask] = self.create_node_centrality_dict(
+                    self.get_sparse_node_centrality_array(coalition_adjacency_matrix, coalition_mask),
+                    coalition_node_presence_array)
+                evaluated_coalition_mask_dict[canonical_coalition_mask_array[coalition_mask]] = coalition_mask
+        else:
+            # Generate all possible layer combinations of all possible lengths
+            for coalition_mask, flattened_layer in \
+                    self.get_coalition_graph_builder(nx_layer_dict).iterate_coalition_graphs():
+                if canonical_coalition_mask_array[coalition_mask] in evaluated_coalition_mask_dict:
+                    self.copy_coalition_node_row(
+                        evaluated_coalition_mask_dict[canonical_coalition_mask_array[coalition_mask]], coalition_mask)
+                    continue
+
+                self.coalition_node_centrality_dict[coalition_mask] = self.get_node_centrality_dict(flattened_layer)
+                evaluated_coalition_mask_dict[canonical_coalition_mask_array[coalition_mask]] = coalition_mask
+
+        return self.coalition_node_centrality_dict
+
+    def copy_coalition_node_row(self, source_coalition_mask, coalition_mask):
+        self.coalition_node_centrality_dict.set_row(
+            coalition_mask, self.coalition_node_centrality_dict.get_row(source_coalition_mask).copy())
+
+    def get_centrality_parameter_dict(self):
+        """
+        Returns the parameters of the centrality measure which change the centrality values, used to address the
+        cached coalition tables.
+
+        :return: Dictionary of json serializable parameter values.
+        """
+
+        return {}
+
+    def get_cache_key(self):
+        # Values stored in single precision are rounded, so they are cached separately
+        centrality_parameter_dict = dict(
+            self.get_centrality_parameter_dict(), value_dtype=dtype(self.coalition_node_centrality_dict.dtype).name)
+
+        return self.cache.get_cache_key(self.layer_adjacency, self.centrality_measure_name, centrality_parameter_dict)
+
+    def load_cached_coalition_node_table(self):
+        """
+        Loads the node centrality values for all layer combinations from :attr cache, if it contains them.
+
+        :return: True if the values were loaded, False otherwise.
+        """
+
+        if self.cache is None:
+            return False
+
+        coalition_node_table = self.cache.load(self.get_cache_key(), self.coalition_index.layer_list)
+
+        if coalition_node_table is None:
+            return False
+
+        self.store_coalition_node_table(coalition_node_table, self.coalition_index.get_coalition_masks())
+
+        return True
+
+    def create_coalition_node_table(self):
+        """
+        Creates a (coalition x node) table of the node centrality values for all layer combinations, whose columns
+        follow :attr node_list and where missing nodes have the value NaN.
+
+        :return: Table containing node centrality values, indexed by coalition bitmask.
+        """
+
+        coalition_node_table = full((self.coalition_index.full_coalition_mask + 1, len(self.node_list)), nan)
+
+        for coalition_mask in self.coalition_index.get_coalition_masks():
+            coalition_node_table[coalition_mask] = self.coalition_node_centrality_dict.get_row(coalition_mask)
+
+        return coalition_node_table
+
+    def get_coalition_graph_builder(self, nx_layer_dict):
+        """
+        Returns the builder of the flattened networks of the layer combinations of :param nx_layer_dict. The builder
+        of the helper network is only created when it is first needed.
+
+        :param nx_layer_dict: Multilayer network layer dictionary.
+        :return: Coalition graph builder.
+        """
+
+        if nx_layer_dict is not self.nx_layer_dict:
+            return CoalitionGraphBuilder(nx_layer_dict, self.coalition_index)
+
+        if self.coalition_graph_builder is None:
+            self.coalition_graph_builder = CoalitionGraphBuilder(nx_layer_dict, self.coalition_index)
+
+        return self.coalition_graph_builder
+
+    def create_node_centrality_dict(self, node_centrality_array, node_presence_array):
+        """
+        Creates a dictionary of node centrality values from an array over :attr node_list, keeping only the nodes
+        which are present.
+
+        :param node_centrality_array: Array containing the centrality of each node.
+        :param node_presence_array: Boolean array marking the nodes which are present.
+        :return: Dictionary of centrality values for the present nodes.
+        """
+
+        node_index_array = flatnonzero(node_presence_array)
+
+        return dict(zip([self.node_list[i] for i in node_index_array],
+                        node_centrality_array[node_index_array].tolist()))
 
-        return self.layer_combinations_node_centrality_dict
+    def compute_coalition_node_centrality_array(self, coalition_mask):
+        """
+        Computes the centrality values for all nodes in the flattened network of a coalition, as an array over
+        :attr node_list where the nodes which are not present have the value NaN.
+
+        :param coalition_mask: Coalition bitmask of a combination of layers.
+        :return: Array of centrality values.
+        """
+
+        coalition_node_array = full(len(self.node_list), nan)
+
+        if self.use_sparse_adjacency:
+            coalition_node_presence_array = self.layer_adjacency.get_coalition_node_presence_array(coalition_mask)
+            coalition_node_array[coalition_node_presence_array] = self.get_sparse_node_centrality_array(
+                self.layer_adjacency.get_coalition_adjacency_matrix(coalition_mask),
+                coalition_mask)[coalition_node_presence_array]
+        else:
+            for node, centrality in self.compute_flattened_layer_combination_node_centrality(
+                    self.nx_layer_dict, self.coalition_index.get_coalition_layers(coalition_mask)).items():
+                coalition_node_array[self.layer_adjacency.node_index_dict[node]] = centrality
+
+        return coalition_node_array
+
+    def compute_coalition_node_centrality_subarray(self, coalition_mask, node_index_array):
+        """
+        Computes the centrality values of a subset of the nodes in the flattened network of a coalition. Helpers of
+        local centrality measures compute only the values of the requested nodes, the others compute the values of all
+        nodes.
+
+        :param coalition_mask: Coalition bitmask of a combination of layers.
+        :param node_index_array: Indices of the nodes in :attr node_list.
+        :return: Array of centrality values of the nodes in :param node_index_array, where the nodes which are not
+                 present have the value NaN.
+        """
+
+        return self.compute_coalition_node_centrality_array(coalition_mask)[node_index_array]
+
+    def update_layer_edges(self, layer, added_edges=(), removed_edges=()):
+        """
+        Removes and then inserts connections in a layer of the multilayer network, see update_layers_edges.
+
+        :param layer: Layer name.
+        :param added_edges: Iterable of (source, target) node tuples of the inserted connections.
+        :param removed_edges: Iterable of (source, target) node tuples of the removed connections.
+        :return: List of the nodes whose centrality value changed in at least one layer combination.
+        """
+
+        return self.update_layers_edges({layer: (added_edges, removed_edges)})
+
+    def update_layers_edges(self, layer_edge_delta_dict):
+        """
+        Removes and then inserts connections in several layers of the multilayer network, which is modified in place,
+        and recomputes the node centrality values of the stored layer combinations which contain at least one of the
+        layers, once per layer combination. Only the values of the end nodes of changed connections in the layers of
+        a combination are recomputed for local centrality measures, and only the values of the nodes in their
+        connected components for centrality measures which depend on the component of a node. If a parameter of the
+        centrality measure depends on the whole network and changes, all stored layer combinations are recomputed.
+
+        :param layer_edge_delta_dict: Dictionary containing an (added_edges, removed_edges) tuple for each changed
+               layer, where both are iterables of (source, target) node tuples, as returned by
+               compute_snapshot_edge_delta_dict.
+        :return: List of the nodes whose centrality value changed in at least one layer combination.
+        """
+
+        for layer in layer_edge_delta_dict:
+            if layer not in self.coalition_index.layer_list:
+                raise ValueError("Unknown layer {0}".format(layer))
+
+        layer_edge_index_array_dict = {
+            layer: (self.get_edge_index_array(added_edges), self.get_edge_index_array(removed_edges))
+            for layer, (added_edges, removed_edges) in layer_edge_delta_dict.items()}
+
+        centrality_parameter_dict = self.get_centrality_parameter_dict()
+
+        for layer, (added_edge_index_array, removed_edge_index_array) in layer_edge_index_array_dict.items():
+            if self.nx_layer_dict is not None:
+                self.nx_layer_dict[layer].remove_edges_from(
+                    [self.node_list[i] for i in edge] for edge in removed_edge_index_array)
+                self.nx_layer_dict[layer].add_edges_from(
+                    [self.node_list[i] for i in edge] for edge in added_edge_index_array)
+
+            self.layer_adjacency.update_layer_edges(layer, added_edge_index_array, removed_edge_index_array)
+
+        self.coalition_graph_builder = None
+
+        self.prepare_centrality_measure()
+
+        # End nodes of the changed connections of each changed layer, keyed by the bitmask of the layer
+        layer_node_index_array_dict = {
+            self.coalition_index.get_coalition_mask((layer,)): unique(concatenate(
+                [added_edge_index_array.ravel(), removed_edge_index_array.ravel()]))
+            for layer, (added_edge_index_array, removed_edge_index_array) in layer_edge_index_array_dict.items()}
+
+        changed_layers_mask = self.coalition_index.get_coalition_mask(layer_edge_delta_dict)
+
+        centrality_parameters_changed = self.get_centrality_parameter_dict() != centrality_parameter_dict
+
+        if centrality_parameters_changed:
+            updated_coalition_mask_list = list(self.coalition_node_centrality_dict)
+        else:
+            updated_coalition_mask_list = [
+                coalition_mask for coalition_mask in self.coalition_node_centrality_dict
+                if coalition_mask & changed_layers_mask]
+
+        def get_node_index_array(coalition_mask):
+            if centrality_parameters_changed or not (self.is_local_measure or self.is_component_measure):
+                return None
+
+            node_index_array = unique(concatenate([
+                node_index_array for layer_mask, node_index_array in layer_node_index_array_dict.items()
+                if coalition_mask & layer_mask]))
+
+            if self.is_local_measure:
+                return node_index_array
+
+            # A connection only changes the centrality values of the nodes in the connected component of its end
+            # nodes, which after a removal may be split in the components of both end nodes
+            return get_component_node_index_array(
+                self.layer_adjacency.get_coalition_adjacency_matrix(coalition_mask), node_index_array)
+
+        changed_node_array = zeros(len(self.node_list), dtype=bool)
+
+        # The previous values of layer combinations which are not stored, e.g. evicted from a value store, are unknown,
+        # so all nodes which may have changed are reported. The connected components of the union of these layer
+        # combinations contain the components of each of them
+        unstored_coalitions_mask = 0
+
+        for coalition_mask in self.coalition_index.get_coalition_masks():
+            if coalition_mask & changed_layers_mask and coalition_mask not in self.coalition_node_centrality_dict:
+                unstored_coalitions_mask |= coalition_mask
+
+        if unstored_coalitions_mask:
+            node_index_array = get_node_index_array(unstored_coalitions_mask)
+            changed_node_array[slice(None) if node_index_array is None else node_index_array] = True
+
+        for coalition_mask in sorted(updated_coalition_mask_list, key=lambda mask: bin(mask).count("1")):
+            coalition_node_row = self.coalition_node_centrality_dict.get_row(coalition_mask).copy()
+            node_index_array = get_node_index_array(coalition_mask)
+
+            if node_index_array is None:
+                updated_coalition_node_row = self.compute_coalition_node_centrality_array(coalition_mask)
+            else:
+                updated_coalition_node_row = coalition_node_row.copy()
+                updated_coalition_node_row[node_index_array] = \
+                    self.compute_coalition_node_centrality_subarray(coalition_mask, node_index_array)
+
+            self.coalition_node_centrality_dict.set_row(coalition_mask, updated_coalition_node_row)
+
+            # Compare the stored values, which may be rounded to the precision of the table
+            updated_coalition_node_row = self.coalition_node_centrality_dict.get_row(coalition_mask)
+
+            changed_node_array |= (coalition_node_row != updated_coalition_node_row) & \
+                ~(isnan(coalition_node_row) & isnan(updated_coalition_node_row))
+
+        return [self.node_list[i] for i in flatnonzero(changed_node_array)]
+
+    def get_edge_index_array(self, edges):
+        """
+        Maps connections between nodes of the multilayer network to their node indices.
+
+        :param edges: Iterable of (source, target) node tuples.
+        :return: (E x 2) array containing the node indices of the end nodes of each connection.
+        """
+
+        node_index_dict = self.layer_adjacency.node_index_dict
+
+        for source, target in edges:
+            for node in (source, target):
+                if node not in node_index_dict:
+                    raise ValueError("Unknown node {0}".format(node))
+
+        return array(
+            [(node_index_dict[source], node_index_dict[target]) for source, target in edges], dtype=int).reshape(-1, 2)
+
+    def create_layer_combinations_node_centrality_dict_in_parallel(self):
+        """
+        Creates the dictionary containing node centrality values for all layer combinations of all possible lengths,
+        evaluating the layer combinations in a pool of :attr number_of_workers processes. The workers write their
+        results into a (coalition x node) table in shared memory, where a node which is not present in the flattened
+        network of a coalition has the value NaN, so that no dictionaries are sent back from the workers.
+
+        :return: Dictionary containing node centrality values for all layer combinations of all possible lengths
+        """
+
+        # Only the canonical coalitions are evaluated, the others have the same flattened network
+        canonical_coalition_mask_array = self.layer_adjacency.create_canonical_coalition_mask_array()
+        coalition_mask_list = [
+            coalition_mask for coalition_mask in self.coalition_index.get_coalition_masks()
+            if canonical_coalition_mask_array[coalition_mask] == coalition_mask]
+        coalition_node_table_shape = (self.coalition_index.full_coalition_mask + 1, len(self.node_list))
+
+        shared_memory = SharedMemory(
+            create=True, size=max(1, coalition_node_table_shape[0] * coalition_node_table_shape[1] * 8))
+
+        try:
+            coalition_node_table = ndarray(coalition_node_table_shape, dtype=float64, buffer=shared_memory.buf)
+            coalition_node_table[:] = nan
+
+            with ProcessPoolExecutor(
+                    max_workers=self.number_of_workers,
+                    initializer=_initialize_coalition_worker,
+                    initargs=(self, shared_memory.name, coalition_node_table_shape)
+            ) as executor:
+                chunk_size = max(1, len(coalition_mask_list) // (4 * self.number_of_workers))
+
+                for _ in executor.map(_compute_coalition_node_centrality_row, coalition_mask_list,
+                                      chunksize=chunk_size):
+                    pass
+
+            for coalition_mask in self.coalition_index.get_coalition_masks():
+                self.coalition_node_centrality_dict.set_row(
+                    coalition_mask, coalition_node_table[canonical_coalition_mask_array[coalition_mask]].copy())
+
+            # Release the view on the shared memory buffer before closing it
+            del coalition_node_table
+        finally:
+            shared_memory.close()
+            shared_memory.unlink()
+
+        return self.coalition_node_centrality_dict
+
+    def store_coalition_node_table(self, coalition_node_table, coalition_mask_list):
+        """
+        Stores the node centrality values of the layer combinations in :param coalition_mask_list, taken from a
+        (coalition x node) table whose columns follow :attr node_list and where missing nodes have the value NaN.
+
+        :param coalition_node_table: Table containing node centrality values, indexed by coalition bitmask.
+        :param coalition_mask_list: List of coalition bitmasks of the layer combinations which are stored.
+        :return: void
+        """
+
+        for coalition_mask in coalition_mask_list:
+            self.coalition_node_centrality_dict.set_row(coalition_mask, coalition_node_table[coalition_mask].copy())
 
     def compute_layer_combinations_node_centrality(
             self,
             nx_layer_dict,
-            layer_combination_tuple_list,
-            layer_combinations_node_centrality_dict
+            coalition_mask_list,
+            coalition_node_centrality_dict
     ):
         """
-        Computes the node centrality for each layer combination in :param layer_combination_tuple_list. Each tuple
-        is sorted in lexicographic order. In order to compute the node centrality, the layer combinations are flattened
-        to avoid duplicate connections.
+        Computes the node centrality for each layer combination in :param coalition_mask_list. In order to compute
+        the node centrality, the layer combinations are flattened to avoid duplicate connections.
 
         :param nx_layer_dict: Multilayer network layer dictionary.
-        :param layer_combination_tuple_list: List of tuples containing layer combinations of same length.
-        :param layer_combinations_node_centrality_dict: Dictionary reference
+        :param coalition_mask_list: List of coalition bitmasks of layer combinations of same length.
+        :param coalition_node_centrality_dict: Dictionary reference
         :return: void
         """
 
-        for layer_combination_tuple in layer_combination_tuple_list:
-            layer_combinations_node_centrality_dict[''.join(sorted(list(layer_combination_tuple)))] = \
+        for coalition_mask in coalition_mask_list:
+            coalition_node_centrality_dict[coalition_mask] = \
                 self.compute_flattened_layer_combination_node_centrality(
-                    nx_layer_dict, layer_combination_tuple)
-            # print(''.join(sorted(list(layerTuple))), layerTupleDict[''.join(sorted(list(layerTuple)))])
+                    nx_layer_dict, self.coalition_index.get_coalition_layers(coalition_mask))
+
+    def get_coalition_node_centrality_dict(self, coalition_mask):
+        """
+        Returns the node centrality values for a layer coalition, computing them on demand if they have not been
+        computed yet.
+
+        :param coalition_mask: Coalition bitmask of a combination of layers.
+        :return: Dictionary of centrality values for all nodes in the flattened network obtained from the
+                 combination of layers.
+        """
+
+        if coalition_mask not in self.coalition_node_centrality_dict:
+            self.coalition_node_centrality_dict[coalition_mask] = \
+                self.compute_flattened_layer_combination_node_centrality(
+                    self.nx_layer_dict, self.coalition_index.get_coalition_layers(coalition_mask))
+
+        return self.coalition_node_centrality_dict[coalition_mask]
+
+    def get_layer_combination_node_centrality_dict(self, layer_combination_tuple):
+        """
+        Returns the node centrality values for a layer combination, computing them on demand if they have not been
+        computed yet.
+
+        :param layer_combination_tuple: Tuple containing a combination of layers.
+        :return: Dictionary of centrality values for all nodes in the flattened network obtained from the
+                 combination of layers.
+        """
+
+        return self.get_coalition_node_centrality_dict(self.coalition_index.get_coalition_mask(layer_combination_tuple))
 
     def compute_flattened_layer_combination_node_centrality(
             self,
@@ -74,29 +599,70 @@ class CentralityHelper:
                  combination of layers.
         """
 
-        temp_multilayered_network = empty()
+        coalition_mask = self.coalition_index.get_coalition_mask(layer_combination_tuple)
 
-        for layer in layer_combination_tuple:
-            add_nx_layer(temp_multilayered_network, nx_layer_dict[layer], layer)
+        if self.use_sparse_adjacency and nx_layer_dict is self.nx_layer_dict:
+            coalition_adjacency_matrix = self.layer_adjacency.get_coalition_adjacency_matrix(coalition_mask)
 
-        flatten(temp_multilayered_network, "flattened_layer", layers=layers(temp_multilayered_network))
+            return self.create_node_centrality_dict(
+                self.get_sparse_node_centrality_array(coalition_adjacency_matrix, coalition_mask),
+                self.layer_adjacency.get_coalition_node_presence_array(coalition_mask))
 
-        flattened_layer = to_nx_dict(temp_multilayered_network)["flattened_layer"]
-        # print(nx.degree_centrality(flattened_layer))
-        # print(nx.degree(flattened_layer), "\n")
+        flattened_layer = self.get_coalition_graph_builder(nx_layer_dict).build_coalition_graph(coalition_mask)
 
         return self.get_node_centrality_dict(flattened_layer)
 
+    def prepare_centrality_measure(self):
+        """
+        Computes the parameters of the centrality measure which depend on the whole multilayer network, before any
+        layer combination is evaluated.
+
+        :return: void
+        """
+
+        pass
+
     @abc.abstractmethod
     def get_node_centrality_dict(self, flattened_layer):
         return {}
 
+    def get_sparse_node_centrality_array(self, coalition_adjacency_matrix, coalition_mask=None):
+        """
+        Returns an array which contains the centrality measure for each node in :attr node_list, computed directly
+        from the adjacency matrix of a flattened network. Only used by helpers which support sparse adjacency.
+
+        :param coalition_adjacency_matrix: Boolean CSR adjacency matrix of the flattened network.
+        :param coalition_mask: Coalition bitmask of the flattened network, or None if it is not a coalition of the
+               helper network.
+        :return: Array of centrality values. The values of nodes which are not present are ignored.
+        """
+
+        raise NotImplementedError
+
 
 class DegreeCentralityHelper(CentralityHelper):
     centrality_measure_name = "degree_centrality"
 
-    def __init__(self, nx_layer_dict):
-        super().__init__(nx_layer_dict)
+    supports_sparse_adjacency = True
+
+    is_local_measure = True
+
+    def __init__(
+            self,
+            nx_layer_dict,
+            precompute=True,
+            number_of_workers=1,
+            use_sparse_adjacency=True,
+            cache=None,
+            memory_budget=None,
+            spill_to_disk=False,
+            value_dtype=float64,
+            memory_map=None,
+            layer_adjacency=None
+    ):
+        super().__init__(
+            nx_layer_dict, precompute, number_of_workers, use_sparse_adjacency, cache, memory_budget, spill_to_disk,
+            value_dtype, memory_map, layer_adjacency)
 
     def get_node_degree_centrality_analysis(
             self,
@@ -180,6 +746,8 @@ class DegreeCentralityHelper(CentralityHelper):
             node_layer_centrality_analysis_dict[layer_key] = temp_layer_data_dict
         '''
 
+        from pandas import DataFrame
+
         analysis_results_data_frame = DataFrame.from_dict(node_layer_centrality_analysis_dict).T.sort_index(axis=0)
         analysis_results_data_frame.columns.name = "Node " + node
         analysis_results_data_frame = analysis_results_data_frame.round(2)
@@ -208,13 +776,76 @@ class DegreeCentralityHelper(CentralityHelper):
 
         return flattened_layer_degree_dict
 
+    def get_sparse_node_centrality_array(self, coalition_adjacency_matrix, coalition_mask=None):
+        """
+        Returns an array which contains the degree centrality measure for each node, computed from the adjacency
+        matrix of a flattened network. As in networkx, a self loop adds 2 to the degree of its node.
+
+        :param coalition_adjacency_matrix: Boolean CSR adjacency matrix of the flattened network.
+        :param coalition_mask: Coalition bitmask of the flattened network.
+        :return: Array of degree centrality values.
+        """
+
+        return coalition_adjacency_matrix.getnnz(axis=1) + coalition_adjacency_matrix.diagonal()
+
+    def compute_coalition_node_centrality_subarray(self, coalition_mask, node_index_array):
+        """
+        Computes the degree centrality values of a subset of the nodes in the flattened network of a coalition, from
+        the rows of its adjacency matrix which belong to the nodes.
+
+        :param coalition_mask: Coalition bitmask of a combination of layers.
+        :param node_index_array: Indices of the nodes in :attr node_list.
+        :return: Array of degree centrality values of the nodes in :param node_index_array, where the nodes which are
+                 not present have the value NaN.
+        """
+
+        if not self.use_sparse_adjacency:
+            return super().compute_coalition_node_centrality_subarray(coalition_mask, node_index_array)
+
+        coalition_adjacency_rows = self.layer_adjacency.get_coalition_adjacency_rows(coalition_mask, node_index_array)
+
+        coalition_node_subarray = (coalition_adjacency_rows.getnnz(axis=1) + coalition_adjacency_rows[
+            arange(len(node_index_array)), node_index_array].A1).astype(float)
+        coalition_node_subarray[
+            ~self.layer_adjacency.get_coalition_node_presence_array(coalition_mask)[node_index_array]] = nan
+
+        return coalition_node_subarray
+
 
 class HarmonicCentralityHelper(CentralityHelper):
 
     centrality_measure_name = "harmonic_centrality"
 
-    def __init__(self, nx_layer_dict):
-        super().__init__(nx_layer_dict)
+    supports_sparse_adjacency = True
+
+    is_component_measure = True
+
+    def __init__(
+            self,
+            nx_layer_dict,
+            precompute=True,
+            number_of_workers=1,
+            use_sparse_adjacency=True,
+            cache=None,
+            memory_budget=None,
+            spill_to_disk=False,
+            value_dtype=float64,
+            memory_map=None,
+            bfs_chunk_size=None,
+            number_of_bfs_threads=None,
+            layer_adjacency=None
+    ):
+        self.bfs_chunk_size = bfs_chunk_size
+
+        # By default the CPUs are shared between the coalition workers
+        if number_of_bfs_threads is None:
+            number_of_bfs_threads = 1 if number_of_workers is None else max(1, cpu_count() // max(1, number_of_workers))
+
+        self.number_of_bfs_threads = number_of_bfs_threads
+
+        super().__init__(
+            nx_layer_dict, precompute, number_of_workers, use_sparse_adjacency, cache, memory_budget, spill_to_disk,
+            value_dtype, memory_map, layer_adjacency)
 
     def get_node_centrality_dict(self, flattened_layer):
         """
@@ -229,54 +860,135 @@ class HarmonicCentralityHelper(CentralityHelper):
 
         return harmonic_centrality(flattened_layer)
 
+    def get_sparse_node_centrality_array(self, coalition_adjacency_matrix, coalition_mask=None):
+        """
+        Returns an array which contains the harmonic centrality measure for each node, computed with a batched
+        breadth first search over the adjacency matrix of a flattened network. Gives the same values as networkx.
 
-class KatzCentralityHelper(CentralityHelper):
+        :param coalition_adjacency_matrix: Boolean CSR adjacency matrix of the flattened network.
+        :param coalition_mask: Coalition bitmask of the flattened network.
+        :return: Array of harmonic centrality values.
+        """
 
-    centrality_measure_name = "katz_centrality"
+        return compute_harmonic_centrality_array(
+            coalition_adjacency_matrix, chunk_size=self.bfs_chunk_size, number_of_threads=self.number_of_bfs_threads)
 
-    min_overall_eigenvalue = 0.01
+    def compute_coalition_node_centrality_subarray(self, coalition_mask, node_index_array):
+        """
+        Computes the harmonic centrality values of a subset of the nodes in the flattened network of a coalition, with
+        a breadth first search started only from the requested nodes.
 
-    def __init__(self, nx_layer_dict):
-        self.compute_min_overall_eigen_value(nx_layer_dict)
-        super().__init__(nx_layer_dict)
+        :param coalition_mask: Coalition bitmask of a combination of layers.
+        :param node_index_array: Indices of the nodes in :attr node_list.
+        :return: Array of harmonic centrality values of the nodes in :param node_index_array, where the nodes which
+                 are not present have the value NaN.
+        """
 
-    def compute_min_overall_eigen_value(self, nx_layer_dict):
+        if not self.use_sparse_adjacency:
+            return super().compute_coalition_node_centrality_subarray(coalition_mask, node_index_array)
 
-        max_eigenvalue_list = []
+        coalition_node_subarray = compute_harmonic_centrality_array(
+            self.layer_adjacency.get_coalition_adjacency_matrix(coalition_mask), node_index_array,
+            chunk_size=self.bfs_chunk_size, number_of_threads=self.number_of_bfs_threads)
+        coalition_node_subarray[
+            ~self.layer_adjacency.get_coalition_node_presence_array(coalition_mask)[node_index_array]] = nan
 
-        # Generate all possible layer combinations of all possible lengths
-        for i in range(len(nx_layer_dict)):
-            layer_combination_tuple_list = list(combinations(nx_layer_dict.keys(), i + 1))
-            for layer_combination_tuple in layer_combination_tuple_list:
-                max_eigenvalue_list.append(
-                    self.compute_max_eigenvalue_for_layer_combination_tuple(nx_layer_dict, layer_combination_tuple))
+        return coalition_node_subarray
 
-        self.min_overall_eigenvalue = min(max_eigenvalue_list)
 
-        print("Min ", self.min_overall_eigenvalue)
+class KatzCentralityHelper(CentralityHelper):
+
+    centrality_measure_name = "katz_centrality"
 
-    def compute_max_eigenvalue_for_layer_combination_tuple(
+    supports_sparse_adjacency = True
+
+    is_component_measure = True
+
+    min_overall_eigenvalue = 0.01
+
+    def __init__(
             self,
             nx_layer_dict,
-            layer_combination_tuple
+            precompute=True,
+            number_of_workers=1,
+            use_sparse_adjacency=True,
+            cache=None,
+            memory_budget=None,
+            spill_to_disk=False,
+            value_dtype=float64,
+            memory_map=None,
+            katz_solver="cg",
+            katz_tolerance=1e-10,
+            katz_max_iterations=None,
+            layer_adjacency=None
     ):
+        if katz_solver not in KATZ_SOLVERS:
+            raise ValueError("Unknown katz solver {0}, expected one of {1}".format(katz_solver, KATZ_SOLVERS))
 
-        temp_multilayered_network = empty()
+        self.katz_solver = katz_solver
+        self.katz_tolerance = katz_tolerance
+        self.katz_max_iterations = katz_max_iterations
 
-        for layer in layer_combination_tuple:
-            add_nx_layer(temp_multilayered_network, nx_layer_dict[layer], layer)
+        # Convergence information of the iterative solves, keyed by coalition bitmask
+        self.coalition_solver_info_dict = {}
 
-        flatten(temp_multilayered_network, "flattened_layer", layers=layers(temp_multilayered_network))
+        super().__init__(
+            nx_layer_dict, precompute, number_of_workers, use_sparse_adjacency, cache, memory_budget, spill_to_disk,
+            value_dtype, memory_map, layer_adjacency)
 
-        flattened_layer = to_nx_dict(temp_multilayered_network)["flattened_layer"]
+    def prepare_centrality_measure(self):
+        self.compute_min_overall_eigen_value(self.nx_layer_dict)
 
-        flattened_layer_adjacency_matrix = adjacency_matrix(flattened_layer)
+    def get_centrality_parameter_dict(self):
+        return {
+            'alpha': 1 / self.min_overall_eigenvalue / 10.0,
+            'use_sparse_adjacency': self.use_sparse_adjacency,
+            'katz_solver': self.katz_solver,
+            'katz_tolerance': self.katz_tolerance,
+            'katz_max_iterations': self.katz_max_iterations
+        }
 
-        max_eigen_value = max(eigvals(flattened_layer_adjacency_matrix.todense()))
+    def compute_min_overall_eigen_value(self, nx_layer_dict):
+        """
+        Computes the minimum over all layer combinations of the largest eigenvalue of their adjacency matrix. Adding
+        connections to a network can not decrease the spectral radius of its adjacency matrix, therefore the minimum
+        is reached on a single layer and only the layers themselves are evaluated.
 
-        print("Max Eigenv: ", layer_combination_tuple, max_eigen_value)
+        :param nx_layer_dict: Multilayer network layer dictionary.
+        :return: void
+        """
+
+        if nx_layer_dict is self.nx_layer_dict:
+            layer_adjacency = self.layer_adjacency
+        else:
+            layer_adjacency = LayerAdjacency(nx_layer_dict)
+
+        self.min_overall_eigenvalue = min(
+            self.compute_max_eigenvalue_for_adjacency_matrix(layer_adjacency.get_layer_adjacency_matrix(layer))
+            for layer in layer_adjacency.coalition_index.layer_list)
+
+    def compute_max_eigenvalue_for_adjacency_matrix(self, coalition_adjacency_matrix):
+        """
+        Computes the largest eigenvalue of a symmetric adjacency matrix with the ARPACK Lanczos solver, or with a
+        dense solver for small networks.
+
+        :param coalition_adjacency_matrix: Sparse adjacency matrix of a flattened network.
+        :return: Largest eigenvalue.
+        """
+
+        # Isolated nodes only add zero eigenvalues
+        node_index_array = flatnonzero(coalition_adjacency_matrix.getnnz(axis=1))
+
+        if len(node_index_array) == 0:
+            return 0
 
-        return max_eigen_value
+        non_isolated_adjacency_matrix = \
+            coalition_adjacency_matrix[node_index_array][:, node_index_array].astype(float)
+
+        if len(node_index_array) <= DENSE_EIGENVALUE_SOLVER_MAX_NODES:
+            return float(eigvalsh(non_isolated_adjacency_matrix.toarray())[-1])
+
+        return float(eigsh(non_isolated_adjacency_matrix, k=1, which="LA", return_eigenvectors=False)[0])
 
     def get_node_centrality_dict(self, flattened_layer):
         """
@@ -289,14 +1001,10 @@ class KatzCentralityHelper(CentralityHelper):
         combination of layers.
         """
 
-        print(len(flattened_layer.nodes))
-
         flattened_layer_katz_dict = {}
 
         alpha = 1 / self.min_overall_eigenvalue / 10.0
 
-        print(alpha)
-
         centrality = katz_centrality(flattened_layer, alpha, normalized=False)
 
         for n, c in sorted(centrality.items()):
@@ -307,13 +1015,197 @@ class KatzCentralityHelper(CentralityHelper):
 
         return flattened_layer_katz_dict
 
+    def get_sparse_node_centrality_array(self, coalition_adjacency_matrix, coalition_mask=None):
+        """
+        Returns an array which contains the katz centrality measure for each node, obtained by solving
+        (I - alpha * A) x = 1 on the adjacency matrix A of a flattened network, either with a sparse direct solver or
+        with the conjugate gradient method. The conjugate gradient solve of a coalition is started from the solution
+        of its largest already solved subset coalition, and its convergence is recorded in
+        :attr coalition_solver_info_dict. Both solvers raise a ValueError when the katz series of the flattened network
+        diverges.
+
+        :param coalition_adjacency_matrix: Boolean CSR adjacency matrix of the flattened network.
+        :param coalition_mask: Coalition bitmask of the flattened network.
+        :return: Array of katz centrality values.
+        """
+
+        alpha = 1 / self.min_overall_eigenvalue / 10.0
+
+        katz_system_matrix = identity(coalition_adjacency_matrix.shape[0], format="csr") - \
+            alpha * coalition_adjacency_matrix.astype(float)
+
+        # The direct solve returns the exact solution of the system even when the katz series diverges, so both
+        # solvers check convergence first
+        self.check_katz_series_convergence(coalition_adjacency_matrix, alpha, coalition_mask)
+
+        if self.katz_solver == "direct":
+            # The katz system matrix is symmetric, so the fill reducing ordering is computed on its structure
+            return spsolve(
+                katz_system_matrix.tocsc(), ones(coalition_adjacency_matrix.shape[0]), permc_spec="MMD_AT_PLUS_A")
+
+        iteration_counter_list = [0]
+
+        def count_iteration(_):
+            iteration_counter_list[0] += 1
+
+        # Without a coalition, e.g. for the system of some connected components, the solve starts from 1
+        katz_warm_start_array = ones(coalition_adjacency_matrix.shape[0]) if coalition_mask is None else \
+            self.get_katz_warm_start_array(coalition_mask)
+
+        katz_centrality_array, info = cg(
+            katz_system_matrix, ones(coalition_adjacency_matrix.shape[0]),
+            x0=katz_warm_start_array, maxiter=self.katz_max_iterations,
+            callback=count_iteration, **{CG_TOLERANCE_KEYWORD: self.katz_tolerance})
+
+        # The katz centrality of a node is at least 1, its value when isolated, so a non-positive value means that
+        # the solve failed
+        is_positive = bool((katz_centrality_array > 0).all())
+
+        if coalition_mask is not None:
+            self.coalition_solver_info_dict[coalition_mask] = {
+                'converged': info == 0 and is_positive,
+                'number_of_iterations': iteration_counter_list[0],
+                'number_of_connections': coalition_adjacency_matrix.nnz
+            }
+
+        if not is_positive:
+            raise ValueError("The katz centrality of the layer combination {0} has non-positive values, the conjugate "
+                             "gradient solve did not converge".format(self.get_coalition_description(coalition_mask)))
+
+        return katz_centrality_array
+
+    def compute_coalition_node_centrality_subarray(self, coalition_mask, node_index_array):
+        """
+        Computes the katz centrality values of a subset of the nodes in the flattened network of a coalition. The katz
+        system of each connected component is independent of the others, so only the system of the components which
+        contain the requested nodes is solved, without a warm start.
+
+        :param coalition_mask: Coalition bitmask of a combination of layers.
+        :param node_index_array: Indices of the nodes in :attr node_list.
+        :return: Array of katz centrality values of the nodes in :param node_index_array, where the nodes which are
+                 not present have the value NaN.
+        """
+
+        if not self.use_sparse_adjacency:
+            return super().compute_coalition_node_centrality_subarray(coalition_mask, node_index_array)
+
+        coalition_adjacency_matrix = self.layer_adjacency.get_coalition_adjacency_matrix(coalition_mask)
+        component_node_index_array = get_component_node_index_array(coalition_adjacency_matrix, node_index_array)
+
+        coalition_node_array = full(len(self.node_list), nan)
+        coalition_node_array[component_node_index_array] = self.get_sparse_node_centrality_array(
+            coalition_adjacency_matrix[component_node_index_array][:, component_node_index_array])
+
+        coalition_node_subarray = coalition_node_array[node_index_array]
+        coalition_node_subarray[
+            ~self.layer_adjacency.get_coalition_node_presence_array(coalition_mask)[node_index_array]] = nan
+
+        return coalition_node_subarray
+
+    def check_katz_series_convergence(self, coalition_adjacency_matrix, alpha, coalition_mask=None):
+        """
+        Checks that alpha is smaller than the inverse of the largest eigenvalue of the adjacency matrix of a flattened
+        network, otherwise the katz series diverges and the system (I - alpha * A) x = 1 is indefinite, so its solution
+        is not the katz centrality. The largest eigenvalue is at most the largest degree, so it is only computed when
+        this bound is not small enough.
+
+        :param coalition_adjacency_matrix: Boolean CSR adjacency matrix of the flattened network.
+        :param alpha: Attenuation factor of the katz centrality.
+        :param coalition_mask: Coalition bitmask of the flattened network, used in the error message.
+        :return: void
+        """
+
+        if alpha * coalition_adjacency_matrix.getnnz(axis=1).max(initial=0) < 1:
+            return
+
+        max_eigenvalue = self.compute_max_eigenvalue_for_adjacency_matrix(coalition_adjacency_matrix)
+
+        if alpha * max_eigenvalue >= 1:
+            raise ValueError(
+                "The katz series diverges on the layer combination {0}: alpha {1} is not smaller than the inverse of "
+                "its largest eigenvalue {2}".format(self.get_coalition_description(coalition_mask), alpha,
+                                                    max_eigenvalue))
+
+    def get_coalition_description(self, coalition_mask):
+        if coalition_mask is None:
+            return "(unknown)"
+
+        return "({0})".format(", ".join(
+            str(layer) for layer in self.coalition_index.get_coalition_layers(coalition_mask)))
+
+    def get_katz_warm_start_array(self, coalition_mask):
+        """
+        Returns the initial solution of the katz system of a coalition, taken from the stored katz centrality values
+        of the subset coalition with the most connections among the already solved coalitions which lack one of its
+        layers. The nodes which are not present in the subset coalition start from 1, their value when isolated.
+
+        :param coalition_mask: Coalition bitmask.
+        :return: Array over :attr node_list.
+        """
+
+        katz_warm_start_array = ones(len(self.node_list))
+
+        solved_subset_mask_list = [
+            subset_mask for subset_mask in self.coalition_index.get_subset_masks(coalition_mask)
+            if subset_mask in self.coalition_solver_info_dict and subset_mask in self.coalition_node_centrality_dict]
+
+        if not solved_subset_mask_list:
+            return katz_warm_start_array
+
+        largest_subset_mask = max(
+            solved_subset_mask_list,
+            key=lambda subset_mask: self.coalition_solver_info_dict[subset_mask]['number_of_connections'])
+
+        largest_subset_node_row = self.coalition_node_centrality_dict.get_row(largest_subset_mask)
+
+        return where(isnan(largest_subset_node_row), katz_warm_start_array, largest_subset_node_row)
+
 
 class SubgraphCentralityHelper(CentralityHelper):
 
     centrality_measure_name = "subgraph_centrality"
 
-    def __init__(self, nx_layer_dict):
-        super().__init__(nx_layer_dict)
+    supports_sparse_adjacency = True
+
+    is_component_measure = True
+
+    def __init__(
+            self,
+            nx_layer_dict,
+            precompute=True,
+            number_of_workers=1,
+            use_sparse_adjacency=True,
+            cache=None,
+            memory_budget=None,
+            spill_to_disk=False,
+            value_dtype=float64,
+            memory_map=None,
+            subgraph_solver="auto",
+            subgraph_block_size=256,
+            subgraph_tolerance=1e-6,
+            subgraph_max_probing_distance=32,
+            layer_adjacency=None
+    ):
+        if subgraph_solver not in SUBGRAPH_SOLVERS:
+            raise ValueError(
+                "Unknown subgraph solver {0}, expected one of {1}".format(subgraph_solver, SUBGRAPH_SOLVERS))
+
+        self.subgraph_solver = subgraph_solver
+        self.subgraph_block_size = subgraph_block_size
+        self.subgraph_tolerance = subgraph_tolerance
+        self.subgraph_max_probing_distance = subgraph_max_probing_distance
+
+        super().__init__(
+            nx_layer_dict, precompute, number_of_workers, use_sparse_adjacency, cache, memory_budget, spill_to_disk,
+            value_dtype, memory_map, layer_adjacency)
+
+    def get_centrality_parameter_dict(self):
+        return {
+            'use_sparse_adjacency': self.use_sparse_adjacency,
+            'subgraph_solver': self.subgraph_solver,
+            'subgraph_tolerance': self.subgraph_tolerance,
+            'subgraph_max_probing_distance': self.subgraph_max_probing_distance
+        }
 
     def get_node_centrality_dict(self, flattened_layer):
         """
@@ -327,3 +1219,109 @@ class SubgraphCentralityHelper(CentralityHelper):
         """
 
         return subgraph_centrality(flattened_layer)
+
+    def get_sparse_node_centrality_array(self, coalition_adjacency_matrix, coalition_mask=None):
+        """
+        Returns an array which contains the subgraph centrality measure for each node, i.e. the diagonal of exp(A) for
+        the adjacency matrix A of a flattened network. Depending on :attr subgraph_solver, the diagonal is computed
+        from a dense eigendecomposition, computed exactly in blocks with expm_multiply, or estimated up to
+        :attr subgraph_tolerance by probing with a coloring of the nodes, whose cost grows with the size of the
+        neighbourhoods of the nodes instead of their number. The auto mode chooses between the two exact methods by
+        the number of non-isolated nodes.
+
+        :param coalition_adjacency_matrix: Boolean CSR adjacency matrix of the flattened network.
+        :param coalition_mask: Coalition bitmask of the flattened network.
+        :return: Array of subgraph centrality values.
+        """
+
+        subgraph_solver = self.subgraph_solver
+
+        if subgraph_solver == "auto":
+            number_of_non_isolated_nodes = (coalition_adjacency_matrix.getnnz(axis=1) > 0).sum()
+            subgraph_solver = "dense" if number_of_non_isolated_nodes <= SUBGRAPH_DENSE_SOLVER_MAX_NODES else "expm"
+
+        if subgraph_solver == "expm":
+            return compute_subgraph_centrality_array(coalition_adjacency_matrix, self.subgraph_block_size)
+
+        if subgraph_solver == "probing":
+            return estimate_subgraph_centrality_array(
+                coalition_adjacency_matrix, self.subgraph_tolerance, self.subgraph_block_size,
+                self.subgraph_max_probing_distance)
+
+        return self.compute_dense_subgraph_centrality_array(coalition_adjacency_matrix)
+
+    def compute_dense_subgraph_centrality_array(self, coalition_adjacency_matrix):
+        """
+        Computes the subgraph centrality of each node from the eigendecomposition of the adjacency matrix of a
+        flattened network. The decomposition is restricted to the non-isolated nodes, since the subgraph centrality
+        of an isolated node is 1.
+
+        :param coalition_adjacency_matrix: Boolean CSR adjacency matrix of the flattened network.
+        :return: Array of subgraph centrality values.
+        """
+
+        subgraph_centrality_array = ones(coalition_adjacency_matrix.shape[0])
+
+        node_index_array = flatnonzero(coalition_adjacency_matrix.getnnz(axis=1))
+
+        eigenvalue_array, eigenvector_matrix = eigh(
+            coalition_adjacency_matrix[node_index_array][:, node_index_array].toarray().astype(float))
+
+        subgraph_centrality_array[node_index_array] = (eigenvector_matrix ** 2) @ exp(eigenvalue_array)
+
+        return subgraph_centrality_array
+
+
+def create_layer_combinations_node_centrality_dicts(centrality_helper_list, number_of_threads=None):
+    """
+    Computes the node centrality values of all layer combinations for several centrality helpers of the same
+    multilayer network in a single walk of the coalition lattice, so that the adjacency matrix of each flattened
+    network is built once and evaluated by all helpers. The helpers evaluate a flattened network in a pool of
+    threads. The helpers are usually created with precompute=False and must support sparse adjacency.
+
+    :param centrality_helper_list: List of centrality helpers of the same multilayer network.
+    :param number_of_threads: Number of helpers evaluating a flattened network in parallel, or None for one thread
+           per helper.
+    :return: void
+    """
+
+    if not centrality_helper_list:
+        return
+
+    layer_adjacency = centrality_helper_list[0].layer_adjacency
+
+    for centrality_helper in centrality_helper_list:
+        if not centrality_helper.use_sparse_adjacency:
+            raise ValueError("The {0} helper does not use sparse adjacency".format(
+                centrality_helper.centrality_measure_name))
+
+        if centrality_helper.coalition_index.layer_list != layer_adjacency.coalition_index.layer_list or \
+                centrality_helper.node_list != layer_adjacency.node_list:
+            raise ValueError("The centrality helpers must belong to the same multilayer network")
+
+    canonical_coalition_mask_array = layer_adjacency.create_canonical_coalition_mask_array()
+
+    # Evaluated coalition of each canonical coalition
+    evaluated_coalition_mask_dict = {}
+
+    with ThreadPoolExecutor(max_workers=number_of_threads or len(centrality_helper_list)) as executor:
+        for coalition_mask, coalition_adjacency_matrix, coalition_node_presence_array in \
+                layer_adjacency.iterate_coalition_adjacency_matrices():
+            if canonical_coalition_mask_array[coalition_mask] in evaluated_coalition_mask_dict:
+                for centrality_helper in centrality_helper_list:
+                    centrality_helper.copy_coalition_node_row(
+                        evaluated_coalition_mask_dict[canonical_coalition_mask_array[coalition_mask]], coalition_mask)
+                continue
+
+            def compute_coalition_node_row(centrality_helper):
+                coalition_node_row = full(len(layer_adjacency.node_list), nan)
+                coalition_node_row[coalition_node_presence_array] = centrality_helper.get_sparse_node_centrality_array(
+                    coalition_adjacency_matrix, coalition_mask)[coalition_node_presence_array]
+
+                return coalition_node_row
+
+            for centrality_helper, coalition_node_row in zip(
+                    centrality_helper_list, executor.map(compute_coalition_node_row, centrality_helper_list)):
+                centrality_helper.coalition_node_centrality_dict.set_row(coalition_mask, coalition_node_row)
+
+            evaluated_coalition_mask_dict[canonical_coalition_mask_array[coalition_mask]] = coalition_mask
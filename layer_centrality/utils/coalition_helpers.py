@@ -0,0 +1,278 @@
+from collections.abc import Mapping
+from itertools import combinations
+from networkx import Graph
+
+
+class CoalitionIndex:
+    """
+    Maps the layers of a multilayer network to bit positions and layer coalitions to integer bitmasks, where the
+    layer at position i in the layer list is represented by bit i.
+    """
+
+    def __init__(self, layer_list):
+        self.layer_list = list(layer_list)
+        self.number_of_layers = len(self.layer_list)
+        self.full_coalition_mask = (1 << self.number_of_layers) - 1
+
+        self.__layer_mask_dict = {layer: 1 << i for i, layer in enumerate(self.layer_list)}
+
+        # Number of layers of each coalition, indexed by coalition mask
+        self.__coalition_size_list = [0] * (1 << self.number_of_layers)
+
+        for coalition_mask in range(1, 1 << self.number_of_layers):
+            self.__coalition_size_list[coalition_mask] = \
+                self.__coalition_size_list[coalition_mask & (coalition_mask - 1)] + 1
+
+        self.__coalition_key_mask_dict = None
+
+    def get_layer_mask(self, layer):
+        """
+        Returns the bitmask of the coalition containing only :param layer.
+
+        :param layer: Layer name.
+        :return: Integer bitmask.
+        """
+
+        return self.__layer_mask_dict[layer]
+
+    def get_coalition_mask(self, layer_combination):
+        """
+        Returns the bitmask of a layer coalition.
+
+        :param layer_combination: Iterable containing the layers of the coalition.
+        :return: Integer bitmask.
+        """
+
+        coalition_mask = 0
+
+        for layer in layer_combination:
+            coalition_mask |= self.__layer_mask_dict[layer]
+
+        return coalition_mask
+
+    def get_coalition_layers(self, coalition_mask):
+        """
+        Returns the layers of a coalition, in the order of the layer list.
+
+        :param coalition_mask: Integer bitmask of the coalition.
+        :return: Tuple containing the layers of the coalition.
+        """
+
+        return tuple(layer for i, layer in enumerate(self.layer_list) if coalition_mask >> i & 1)
+
+    def get_coalition_size(self, coalition_mask):
+        """
+        Returns the number of layers of a coalition.
+
+        :param coalition_mask: Integer bitmask of the coalition.
+        :return: Number of layers.
+        """
+
+        return self.__coalition_size_list[coalition_mask]
+
+    def get_coalition_key(self, coalition_mask):
+        """
+        Returns the legacy string key of a coalition, obtained by joining its sorted layer names.
+
+        :param coalition_mask: Integer bitmask of the coalition.
+        :return: String key.
+        """
+
+        return ''.join(sorted(self.get_coalition_layers(coalition_mask)))
+
+    def get_coalition_mask_for_key(self, layer_combination_key):
+        """
+        Returns the bitmask of the coalition with the given legacy string key. Different coalitions can have the same
+        legacy key, in which case the first coalition in the order of get_coalition_masks is returned.
+
+        :param layer_combination_key: Legacy string key.
+        :return: Integer bitmask, or None if no coalition has the key.
+        """
+
+        if self.__coalition_key_mask_dict is None:
+            self.__coalition_key_mask_dict = {}
+
+            for coalition_mask in self.get_coalition_masks():
+                self.__coalition_key_mask_dict.setdefault(self.get_coalition_key(coalition_mask), coalition_mask)
+
+        return self.__coalition_key_mask_dict.get(layer_combination_key)
+
+    def contains_layer(self, coalition_mask, layer):
+        return bool(coalition_mask & self.__layer_mask_dict[layer])
+
+    def add_layer(self, coalition_mask, layer):
+        return coalition_mask | self.__layer_mask_dict[layer]
+
+    def remove_layer(self, coalition_mask, layer):
+        return coalition_mask & ~self.__layer_mask_dict[layer]
+
+    def get_subset_masks(self, coalition_mask):
+        """
+        Returns the coalitions obtained by removing one layer from a coalition.
+
+        :param coalition_mask: Integer bitmask of the coalition.
+        :return: List of integer bitmasks.
+        """
+
+        return [coalition_mask & ~(1 << i) for i in range(self.number_of_layers) if coalition_mask >> i & 1]
+
+    def get_superset_masks(self, coalition_mask):
+        """
+        Returns the coalitions obtained by adding one layer to a coalition.
+
+        :param coalition_mask: Integer bitmask of the coalition.
+        :return: List of integer bitmasks.
+        """
+
+        return [coalition_mask | (1 << i) for i in range(self.number_of_layers) if not coalition_mask >> i & 1]
+
+    def get_coalition_masks(self, coalition_size=None):
+        """
+        Generates the bitmasks of all non-empty coalitions, ordered by size and then in the order in which
+        itertools.combinations generates the layer combinations.
+
+        :param coalition_size: If given, only the coalitions with this number of layers are generated.
+        :return: Generator of integer bitmasks.
+        """
+
+        coalition_size_list = range(1, self.number_of_layers + 1) if coalition_size is None else [coalition_size]
+
+        for size in coalition_size_list:
+            for layer_index_tuple in combinations(range(self.number_of_layers), size):
+                yield sum(1 << i for i in layer_index_tuple)
+
+
+class CoalitionKeyView(Mapping):
+    """
+    Read-only view of a dictionary keyed by coalition bitmasks, which is accessed using the legacy string keys
+    obtained by joining the sorted layer names of the coalitions.
+    """
+
+    def __init__(self, coalition_index, coalition_dict):
+        self.__coalition_index = coalition_index
+        self.__coalition_dict = coalition_dict
+
+    def __getitem__(self, layer_combination_key):
+        coalition_mask = self.__coalition_index.get_coalition_mask_for_key(layer_combination_key)
+
+        if coalition_mask is None or coalition_mask not in self.__coalition_dict:
+            raise KeyError(layer_combination_key)
+
+        return self.__coalition_dict[coalition_mask]
+
+    def __iter__(self):
+        for coalition_mask in self.__coalition_dict:
+            yield self.__coalition_index.get_coalition_key(coalition_mask)
+
+    def __len__(self):
+        return len(self.__coalition_dict)
+
+
+class CoalitionGraphBuilder:
+    """
+    Builds the flattened networks of layer coalitions directly from the networkx layers, without the uunet
+    round-trip. Nodes are interned to integer ids and each layer is kept as a set of integer edge keys, so the union
+    of layers removes duplicate connections by set union.
+    """
+
+    def __init__(self, nx_layer_dict, coalition_index=None):
+        self.coalition_index = CoalitionIndex(nx_layer_dict.keys()) if coalition_index is None else coalition_index
+        self.node_list = sorted(set().union(*[nx_layer.nodes for nx_layer in nx_layer_dict.values()]))
+
+        node_id_dict = {node: i for i, node in enumerate(self.node_list)}
+
+        self.__layer_node_id_set_list = []
+        self.__layer_edge_key_set_list = []
+
+        for layer in self.coalition_index.layer_list:
+            nx_layer = nx_layer_dict[layer]
+
+            self.__layer_node_id_set_list.append(frozenset(node_id_dict[node] for node in nx_layer.nodes))
+            self.__layer_edge_key_set_list.append(frozenset(
+                self.get_edge_key(node_id_dict[source], node_id_dict[target]) for source, target in nx_layer.edges))
+
+    def get_edge_key(self, source_node_id, target_node_id):
+        """
+        Returns the integer key of an undirected edge, which does not depend on the order of its end nodes.
+
+        :param source_node_id: Integer id of the first end node.
+        :param target_node_id: Integer id of the second end node.
+        :return: Integer edge key.
+        """
+
+        if source_node_id > target_node_id:
+            source_node_id, target_node_id = target_node_id, source_node_id
+
+        return source_node_id * len(self.node_list) + target_node_id
+
+    def create_graph(self, node_id_set, edge_key_set):
+        """
+        Creates a networkx network from sets of node ids and edge keys.
+
+        :param node_id_set: Set of integer node ids.
+        :param edge_key_set: Set of integer edge keys.
+        :return: Networkx network.
+        """
+
+        graph = Graph()
+        graph.add_nodes_from(self.node_list[node_id] for node_id in node_id_set)
+        graph.add_edges_from(
+            (self.node_list[edge_key // len(self.node_list)], self.node_list[edge_key % len(self.node_list)])
+            for edge_key in edge_key_set)
+
+        return graph
+
+    def build_coalition_graph(self, coalition_mask):
+        """
+        Builds the flattened network of a single coalition from its layers.
+
+        :param coalition_mask: Coalition bitmask.
+        :return: Networkx network obtained by flattening the layers of the coalition.
+        """
+
+        layer_index_list = [i for i in range(self.coalition_index.number_of_layers) if coalition_mask >> i & 1]
+
+        return self.create_graph(
+            frozenset().union(*[self.__layer_node_id_set_list[i] for i in layer_index_list]),
+            frozenset().union(*[self.__layer_edge_key_set_list[i] for i in layer_index_list]))
+
+    def iterate_coalition_graphs(self):
+        """
+        Generates the flattened networks of all non-empty coalitions by walking the coalition lattice depth first.
+        The union of each coalition is obtained from the union of the coalition without its highest layer, plus that
+        layer, so every layer is only joined once per coalition. Only the unions on the current path of the walk are
+        kept in memory.
+
+        :return: Generator of (coalition bitmask, networkx network) tuples.
+        """
+
+        yield from self.__iterate_coalition_graphs(0, -1, frozenset(), frozenset())
+
+    def __iterate_coalition_graphs(self, coalition_mask, highest_layer_index, node_id_set, edge_key_set):
+        for i in range(highest_layer_index + 1, self.coalition_index.number_of_layers):
+            extended_node_id_set = node_id_set | self.__layer_node_id_set_list[i]
+            extended_edge_key_set = edge_key_set | self.__layer_edge_key_set_list[i]
+
+            yield coalition_mask | (1 << i), self.create_graph(extended_node_id_set, extended_edge_key_set)
+
+            yield from self.__iterate_coalition_graphs(
+                coalition_mask | (1 << i), i, extended_node_id_set, extended_edge_key_set)
+
+
+def flatten_layer_combination(nx_layer_dict, layer_combination_tuple):
+    """
+    Flattens a combination of layers into a single networkx network containing the nodes and the connections of all
+    layers, without duplicate connections.
+
+    :param nx_layer_dict: Multilayer network layer dictionary.
+    :param layer_combination_tuple: Tuple containing a combination of layers.
+    :return: Networkx network obtained by flattening the layers.
+    """
+
+    flattened_layer = Graph()
+
+    for layer in layer_combination_tuple:
+        flattened_layer.add_nodes_from(nx_layer_dict[layer].nodes)
+        flattened_layer.add_edges_from(nx_layer_dict[layer].edges)
+
+    return flattened_layer
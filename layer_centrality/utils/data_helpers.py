@@ -1,6 +1,4 @@
-import matplotlib.pyplot as plt
 from networkx import degree
-from uunet.multinet import vertices, to_nx_dict
 from networkx import draw, nx_agraph, neighbors
 from os.path import dirname
 
@@ -32,6 +30,8 @@ def print_node_layers(node, multilayered_network):
     :return:
     """
 
+    from uunet.multinet import vertices
+
     test_dict = dict(zip(vertices(multilayered_network)["actor"], vertices(multilayered_network)["layer"]))
 
     for key in test_dict.keys():
@@ -53,6 +53,9 @@ def draw_layers(
     :return: void
     """
 
+    import matplotlib.pyplot as plt
+    from uunet.multinet import to_nx_dict
+
     layers = to_nx_dict(multilayered_network)
 
     for layer_name in layers.keys():
@@ -73,6 +76,8 @@ def draw_layers(
 
 def get_layer_total_number_of_nodes(multilayered_network):
 
+    from uunet.multinet import to_nx_dict
+
     layers = to_nx_dict(multilayered_network)
 
     layer_number_of_nodes_dict = {}
@@ -87,6 +92,8 @@ def get_layer_total_number_of_nodes(multilayered_network):
 
 def get_layer_total_number_of_edges(multilayered_network):
 
+    from uunet.multinet import to_nx_dict
+
     layers = to_nx_dict(multilayered_network)
 
     layer_number_of_nodes_dict = {}
@@ -101,6 +108,8 @@ def get_layer_total_number_of_edges(multilayered_network):
 
 def get_layer_most_connected_node(multilayered_network):
 
+    from uunet.multinet import to_nx_dict
+
     layers = to_nx_dict(multilayered_network)
 
     layer_number_of_nodes_dict = {}
@@ -115,6 +124,8 @@ def get_layer_most_connected_node(multilayered_network):
 
 def get_layer_number_of_isolated_nodes(multilayered_network):
 
+    from uunet.multinet import to_nx_dict
+
     layers = to_nx_dict(multilayered_network)
 
     layer_number_of_nodes_dict = {}
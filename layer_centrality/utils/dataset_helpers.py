@@ -1,26 +1,130 @@
-from uunet.multinet import data, vertices, to_nx_dict
+from os.path import abspath, isfile
+from networkx import Graph
+from numpy import arange, array, diff, fromiter, int32, repeat, zeros
+from layer_centrality.utils.adjacency_helpers import LayerAdjacency, create_symmetric_adjacency_matrix
+from layer_centrality.utils.network_file_helpers import read_multilayer_network_file
+from layer_centrality.utils.snapshot_helpers import is_network_snapshot, load_network_snapshot, save_network_snapshot
 
 
 UUNET_DATASETS = ["aucs"]
 
 
 class DatasetHelper:
+    """
+    Loads a multilayer network and interns its actors to contiguous int32 ids, which are their positions in the
+    sorted node list. Each layer is also kept as a pair of source and target id arrays, from which its CSR adjacency
+    matrix is built on demand. Ids are translated back to actor names only when producing output.
+
+    Besides the bundled uunet datasets, a dataset can be a path to a multinet text file or to an actor,actor,layer
+    edge list, which is streamed in chunks of :attr chunk_size bytes, optionally memory-mapped, directly into the id
+    arrays. The networkx layers of such a dataset are only built when they are requested.
+
+    A loaded dataset can be saved as a binary snapshot, which is reloaded by passing its path as the dataset name.
+    Reloading a snapshot only memory-maps the file: the actor presences and the CSR adjacency matrices of the layers
+    are read-only views of the mapping, and the edge arrays are derived from the matrices when they are requested.
+
+    The centrality helpers are created from get_layer_adjacency, which passes the CSR matrices of the layers on as
+    they are, so that the computation never goes through networkx graphs.
+    """
+
+    def __init__(self, dataset_name, file_format=None, memory_map=False, chunk_size=2 ** 24, verify_snapshot=False):
+        self.file_format = file_format
+        self.memory_map = memory_map
+        self.chunk_size = chunk_size
+        self.verify_snapshot = verify_snapshot
 
-    def __init__(self, dataset_name):
         self.__multilayered_network = None
         self.__node_list = []
+        self.__layer_list = []
         self.__nx_layer_dict = {}
+        self.__node_id_dict = {}
+        self.__node_name_array = array([], dtype=object)
+        self.__layer_node_id_array_dict = {}
+        self.__layer_edge_array_dict = {}
+        self.__layer_csr_matrix_dict = {}
+        self.__snapshot_path = None
+        self.__snapshot_hash = None
         self.__load_dataset(dataset_name)
 
-    # TODO support external datasets loading
     def __load_dataset(self, dataset_name):
         if dataset_name in UUNET_DATASETS:
             self.__load_uunet_dataset(dataset_name)
+            self.__intern_nodes()
+        elif isfile(dataset_name) and is_network_snapshot(dataset_name):
+            self.__load_network_snapshot(dataset_name)
+        elif isfile(dataset_name):
+            self.__load_network_file(dataset_name)
 
     def __load_uunet_dataset(self, dataset_name):
+        from uunet.multinet import data, vertices, to_nx_dict
+
         self.__multilayered_network = data(dataset_name)
         self.__node_list = sorted(set(vertices(self.__multilayered_network)["actor"]))
         self.__nx_layer_dict = to_nx_dict(self.__multilayered_network)
+        self.__layer_list = list(self.__nx_layer_dict.keys())
+
+    def __load_network_file(self, path):
+        self.__node_list, self.__layer_list, self.__layer_node_id_array_dict, self.__layer_edge_array_dict = \
+            read_multilayer_network_file(path, self.file_format, self.chunk_size, self.memory_map)
+
+        self.__node_id_dict = {node: node_id for node_id, node in enumerate(self.__node_list)}
+        self.__node_name_array = array(self.__node_list, dtype=object)
+
+        # The networkx layers are built from the id arrays when they are first requested
+        self.__nx_layer_dict = None
+
+    def __load_network_snapshot(self, path):
+        self.__node_list, self.__layer_list, self.__layer_node_id_array_dict, self.__layer_csr_matrix_dict, \
+            self.__snapshot_hash = load_network_snapshot(path, self.verify_snapshot)
+
+        self.__snapshot_path = abspath(path)
+        self.__node_id_dict = {node: node_id for node_id, node in enumerate(self.__node_list)}
+        self.__node_name_array = array(self.__node_list, dtype=object)
+        self.__nx_layer_dict = None
+
+    def __intern_nodes(self):
+        self.__node_id_dict = {node: node_id for node_id, node in enumerate(self.__node_list)}
+        self.__node_name_array = array(self.__node_list, dtype=object)
+
+        for layer_name, nx_layer in self.__nx_layer_dict.items():
+            self.__layer_node_id_array_dict[layer_name] = fromiter(
+                (self.__node_id_dict[node] for node in nx_layer.nodes), dtype=int32,
+                count=nx_layer.number_of_nodes())
+
+            edge_id_array = fromiter(
+                (self.__node_id_dict[node] for edge in nx_layer.edges for node in edge), dtype=int32,
+                count=2 * nx_layer.number_of_edges()).reshape(-1, 2)
+
+            self.__layer_edge_array_dict[layer_name] = (edge_id_array[:, 0].copy(), edge_id_array[:, 1].copy())
+
+    def __create_nx_layer_dict(self):
+        nx_layer_dict = {}
+
+        for layer_name in self.__layer_list:
+            source_id_array, target_id_array = self.get_layer_edge_arrays(layer_name)
+
+            nx_layer = Graph()
+            nx_layer.add_nodes_from(self.get_node_names(self.__layer_node_id_array_dict[layer_name]))
+            nx_layer.add_edges_from(zip(self.get_node_names(source_id_array), self.get_node_names(target_id_array)))
+
+            nx_layer_dict[layer_name] = nx_layer
+
+        return nx_layer_dict
+
+    def save_snapshot(self, path):
+        """
+        Saves the dataset as a binary snapshot, see save_network_snapshot.
+
+        :param path: Path of the snapshot file.
+        :return: Hexadecimal sha256 checksum of the snapshot data.
+        """
+
+        return save_network_snapshot(
+            path, self.__node_list, self.__layer_list, self.__layer_node_id_array_dict,
+            {layer_name: self.get_layer_csr_matrix(layer_name) for layer_name in self.__layer_list})
+
+    def get_snapshot_hash(self):
+        return self.__snapshot_hash
 
     def get_multilayered_network(self):
         return self.__multilayered_network
@@ -28,15 +132,122 @@ class DatasetHelper:
     def get_node_list(self):
         return self.__node_list
 
+    def has_nx_layer_dict(self):
+        """
+        Checks whether the networkx layers of the dataset exist, which is the case for the uunet datasets, while the
+        layers of network files and snapshots are only built when get_nx_layer_dict is called.
+
+        :return: True if the networkx layers exist, False otherwise.
+        """
+
+        return self.__nx_layer_dict is not None
+
     def get_nx_layer_dict(self):
+        if self.__nx_layer_dict is None:
+            self.__nx_layer_dict = self.__create_nx_layer_dict()
+
         return self.__nx_layer_dict
 
     def get_layer_names_list(self):
-        return self.__nx_layer_dict.keys()
+        return self.__layer_list
+
+    def get_node_id(self, node):
+        return self.__node_id_dict[node]
+
+    def get_node_ids(self, nodes):
+        """
+        Translates actor names to their interned ids.
+
+        :param nodes: Iterable of actor names.
+        :return: int32 array of ids.
+        """
+
+        return fromiter((self.__node_id_dict[node] for node in nodes), dtype=int32)
+
+    def get_node_name(self, node_id):
+        return self.__node_list[node_id]
+
+    def get_node_names(self, node_id_array):
+        """
+        Translates interned ids back to actor names.
+
+        :param node_id_array: Array of ids.
+        :return: List of actor names.
+        """
+
+        return self.__node_name_array[node_id_array].tolist()
+
+    def get_layer_node_id_array(self, layer_name):
+        return self.__layer_node_id_array_dict[layer_name]
+
+    def get_layer_edge_arrays(self, layer_name):
+        """
+        Returns the edges of a layer as columnar arrays of interned ids.
+
+        :param layer_name: Layer name.
+        :return: Tuple (source id array, target id array) of int32 arrays.
+        """
+
+        if layer_name not in self.__layer_edge_array_dict:
+            # The dataset was loaded from a snapshot, which only holds the adjacency matrix, whose upper triangle
+            # contains each edge once
+            layer_csr_matrix = self.__layer_csr_matrix_dict[layer_name]
+            source_id_array = repeat(arange(len(self.__node_list), dtype=int32), diff(layer_csr_matrix.indptr))
+            upper_triangle_mask = source_id_array <= layer_csr_matrix.indices
+
+            self.__layer_edge_array_dict[layer_name] = (
+                source_id_array[upper_triangle_mask], layer_csr_matrix.indices[upper_triangle_mask].astype(int32))
+
+        return self.__layer_edge_array_dict[layer_name]
+
+    def get_layer_csr_matrix(self, layer_name):
+        """
+        Returns the symmetric boolean CSR adjacency matrix of a layer over all interned ids. The matrix is built
+        when it is first requested.
+
+        :param layer_name: Layer name.
+        :return: CSR adjacency matrix.
+        """
+
+        if layer_name not in self.__layer_csr_matrix_dict:
+            source_id_array, target_id_array = self.get_layer_edge_arrays(layer_name)
+
+            self.__layer_csr_matrix_dict[layer_name] = create_symmetric_adjacency_matrix(
+                source_id_array, target_id_array, len(self.__node_list))
+
+        return self.__layer_csr_matrix_dict[layer_name]
+
+    def get_layer_node_presence_array(self, layer_name):
+        """
+        Returns the actors which are present on a layer.
+
+        :param layer_name: Layer name.
+        :return: Boolean array over the interned ids.
+        """
+
+        layer_node_presence_array = zeros(len(self.__node_list), dtype=bool)
+        layer_node_presence_array[self.__layer_node_id_array_dict[layer_name]] = True
+
+        return layer_node_presence_array
+
+    def get_layer_adjacency(self):
+        """
+        Creates the layer adjacency of the dataset from the CSR adjacency matrices of its layers. Its node index is
+        the dictionary of the interned ids, so the actors are not interned again. The matrices of a snapshot stay
+        views of the mapping, also in the worker processes of the centrality helpers. Each call returns a new layer
+        adjacency, so updating the connections of one does not change the dataset.
+
+        :return: Layer adjacency.
+        """
+
+        return LayerAdjacency.from_csr(
+            {layer_name: self.get_layer_csr_matrix(layer_name) for layer_name in self.__layer_list},
+            {layer_name: self.get_layer_node_presence_array(layer_name) for layer_name in self.__layer_list},
+            self.__node_list, self.__node_id_dict, snapshot_path=self.__snapshot_path,
+            snapshot_hash=self.__snapshot_hash)
 
     def get_node_edges_for_layer(self, layer_name):
-        node_edges = []
-        layer_graph = self.__nx_layer_dict[layer_name]
-        for node in self.__node_list:
-            node_edges = node_edges + list(layer_graph.edges(node))
-        return set([tuple(sorted(i)) for i in node_edges])
+        source_id_array, target_id_array = self.get_layer_edge_arrays(layer_name)
+
+        return set(zip(self.get_node_names(source_id_array.clip(max=target_id_array)),
+                       self.get_node_names(target_id_array.clip(min=source_id_array))))
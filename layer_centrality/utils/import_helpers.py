@@ -0,0 +1,35 @@
+from importlib import import_module
+
+
+def attach_lazy_submodules(package_name, submodule_name_dict):
+    """
+    Creates the module level __getattr__ and __dir__ functions (PEP 562) of a package which re-exports the names of
+    its submodules, so that a submodule, together with its dependencies, is only imported when one of its names is
+    first accessed, e.g. by `from package import name`, instead of when the package is imported.
+
+    :param package_name: Name of the package, i.e. __name__ of its __init__ module.
+    :param submodule_name_dict: Dictionary containing the list of re-exported names of each submodule.
+    :return: Tuple of the __getattr__ function, of the __dir__ function and of the __all__ list of the package.
+    """
+
+    name_submodule_dict = {
+        name: submodule_name for submodule_name, name_list in submodule_name_dict.items() for name in name_list}
+
+    def __getattr__(name):
+        if name in submodule_name_dict:
+            return import_module('{0}.{1}'.format(package_name, name))
+
+        if name not in name_submodule_dict:
+            raise AttributeError("module {0!r} has no attribute {1!r}".format(package_name, name))
+
+        value = getattr(import_module('{0}.{1}'.format(package_name, name_submodule_dict[name])), name)
+
+        # Later accesses find the name in the package namespace and no longer call __getattr__
+        setattr(import_module(package_name), name, value)
+
+        return value
+
+    def __dir__():
+        return sorted(set(vars(import_module(package_name))) | set(name_submodule_dict) | set(submodule_name_dict))
+
+    return __getattr__, __dir__, list(name_submodule_dict)
@@ -0,0 +1,283 @@
+from itertools import count
+from mmap import ACCESS_READ, mmap
+from os.path import getsize, splitext
+from re import MULTILINE, finditer
+from numpy import arange, concatenate, empty, flatnonzero, fromiter, int32, int64, ones, stack, zeros
+
+
+NETWORK_FILE_FORMATS = ["multinet", "edgelist"]
+
+# Sections of the multinet text format, other sections such as the attribute declarations are skipped
+MULTINET_TYPE_SECTION = "#TYPE"
+MULTINET_LAYERS_SECTION = "#LAYERS"
+MULTINET_VERTICES_SECTION = "#VERTICES"
+MULTINET_EDGES_SECTION = "#EDGES"
+
+# Network types of the multinet text format, whose connections are actor,actor,layer and actor,layer,actor,layer
+MULTINET_NETWORK_TYPES = ["multiplex", "multilayer"]
+
+
+def get_network_file_format(path, file_format=None):
+    """
+    Returns the format of a multilayer network file, given explicitly or deduced from its extension: .mpx and .txt
+    files are read as multinet files, any other file as an actor,actor,layer edge list.
+
+    :param path: Path of the network file.
+    :param file_format: "multinet" or "edgelist", or None to use the extension of :param path.
+    :return: Name of the file format.
+    """
+
+    if file_format is None:
+        file_format = "multinet" if splitext(path)[1].lower() in (".mpx", ".txt") else "edgelist"
+
+    if file_format not in NETWORK_FILE_FORMATS:
+        raise ValueError("Unknown network file format {0}, expected one of {1}".format(
+            file_format, NETWORK_FILE_FORMATS))
+
+    return file_format
+
+
+def iterate_network_file_text_chunks(path, chunk_size=2 ** 24, memory_map=False):
+    """
+    Generates the text of a file in chunks, reading about :param chunk_size bytes at a time, so that only one chunk
+    of the file is decoded at once. A chunk always ends at the end of a line.
+
+    :param path: Path of the file.
+    :param chunk_size: Number of bytes read at a time.
+    :param memory_map: Whether the file is memory-mapped instead of read through a buffered file object.
+    :return: Generator of strings containing whole lines, with \n line terminators.
+    """
+
+    with open(path, 'rb') as network_file:
+        # Empty files can not be memory-mapped
+        if memory_map and getsize(path) > 0:
+            network_buffer = mmap(network_file.fileno(), 0, access=ACCESS_READ)
+        else:
+            network_buffer = network_file
+
+        try:
+            partial_line = b''
+
+            while True:
+                block = network_buffer.read(chunk_size)
+
+                if not block:
+                    break
+
+                block = partial_line + block
+                last_line_end = block.rfind(b'\n')
+
+                if last_line_end < 0:
+                    partial_line = block
+                    continue
+
+                partial_line = block[last_line_end + 1:]
+
+                yield block[:last_line_end + 1].decode('utf-8').replace('\r', '')
+
+            if partial_line:
+                yield partial_line.decode('utf-8').replace('\r', '')
+        finally:
+            if network_buffer is not network_file:
+                network_buffer.close()
+
+
+def split_network_file_columns(text, number_of_columns):
+    """
+    Splits lines of comma separated records into columns. Records may have more fields than
+    :param number_of_columns, e.g. attributes, which are ignored. When all lines have the same number of fields and
+    no blank characters, the whole text is split at once, otherwise line by line, stripping the fields.
+
+    :param text: Lines of records.
+    :param number_of_columns: Number of leading fields which are returned.
+    :return: List containing a list of the values of each of the first :param number_of_columns fields.
+    """
+
+    text = text.strip('\n')
+
+    if not text:
+        return [[] for _ in range(number_of_columns)]
+
+    number_of_lines = text.count('\n') + 1
+    first_line_end = text.find('\n')
+    number_of_fields = text[:first_line_end if first_line_end >= 0 else len(text)].count(',') + 1
+
+    if number_of_fields >= number_of_columns and text.count(',') == number_of_lines * (number_of_fields - 1) and \
+            '\n\n' not in text and ' ' not in text and '\t' not in text:
+        field_list = text.replace('\n', ',').split(',')
+
+        return [field_list[i::number_of_fields] for i in range(number_of_columns)]
+
+    field_list_list = [[field.strip() for field in line.split(',')] for line in text.split('\n') if line.strip()]
+
+    for field_list in field_list_list:
+        if len(field_list) < number_of_columns:
+            raise ValueError("Expected at least {0} fields in line: {1}".format(
+                number_of_columns, ','.join(field_list)))
+
+    return [[field_list[i] for field_list in field_list_list] for i in range(number_of_columns)]
+
+
+def intern_values(value_id_dict, values):
+    """
+    Maps values to int32 ids, adding the values which have no id yet to :param value_id_dict with the next ids, in
+    the order in which they appear. Only the distinct values are looped over in Python, the lookups of all values
+    run through map.
+
+    :param value_id_dict: Dictionary containing the id of each value, updated in place.
+    :param values: List of values.
+    :return: int32 array containing the id of each of :param values.
+    """
+
+    new_values = [value for value in dict.fromkeys(values) if value not in value_id_dict]
+    value_id_dict.update(zip(new_values, count(len(value_id_dict))))
+
+    return fromiter(map(value_id_dict.__getitem__, values), dtype=int32, count=len(values))
+
+
+def read_multilayer_network_file(path, file_format=None, chunk_size=2 ** 24, memory_map=False):
+    """
+    Reads a multilayer network from a multinet text file or from an edge list whose lines are actor,actor,layer,
+    streaming the file in chunks. The actors are interned to int32 ids while the file is read and each layer is
+    collected as arrays of ids, without building graph objects. At the end, the ids are renumbered to the positions
+    of the actors in the sorted actor list. The layers are undirected, so repeated connections, in either direction,
+    are kept once.
+
+    In a multinet file, the #TYPE section declares the network type, multiplex when it is missing, the #LAYERS
+    section declares layers, possibly without connections, the #VERTICES section declares actor,layer presences,
+    possibly without connections, and the #EDGES section the connections, as actor,actor,layer in multiplex files
+    and as actor,layer,actor,layer in multilayer files, where connections between two layers are rejected. The
+    other sections are skipped. An actor is present on the layers on which it has a vertex or a connection. In an
+    edge list, lines starting with # are comments.
+
+    :param path: Path of the network file.
+    :param file_format: "multinet" or "edgelist", or None to use the extension of :param path.
+    :param chunk_size: Number of bytes read at a time.
+    :param memory_map: Whether the file is memory-mapped.
+    :return: Tuple of the sorted actor list, of the list of layers in the order in which they appear, of a dictionary
+             containing the int32 array of the ids of the actors present on each layer, and of a dictionary containing
+             the (source id array, target id array) int32 arrays of the connections of each layer.
+    """
+
+    file_format = get_network_file_format(path, file_format)
+
+    node_id_dict = {}
+    layer_id_dict = {}
+    layer_node_id_chunk_list_dict = {}
+    layer_edge_id_chunk_list_dict = {}
+    network_type = "multiplex"
+
+    def set_network_type(network_type_name):
+        nonlocal network_type
+
+        network_type = network_type_name.strip().lower()
+
+        if network_type not in MULTINET_NETWORK_TYPES:
+            raise ValueError("Unknown multinet network type {0}, expected one of {1}".format(
+                network_type_name, MULTINET_NETWORK_TYPES))
+
+    def intern_layers(layer_names):
+        layer_id_array = intern_values(layer_id_dict, layer_names)
+
+        for layer_name in layer_id_dict:
+            if layer_name not in layer_node_id_chunk_list_dict:
+                layer_node_id_chunk_list_dict[layer_name] = []
+                layer_edge_id_chunk_list_dict[layer_name] = []
+
+        return layer_id_array
+
+    def add_records(section, text):
+        if section == MULTINET_TYPE_SECTION:
+            network_type_column = split_network_file_columns(text, 1)[0]
+
+            if network_type_column:
+                set_network_type(network_type_column[0])
+
+        elif section == MULTINET_LAYERS_SECTION:
+            intern_layers(split_network_file_columns(text, 1)[0])
+
+        elif section == MULTINET_VERTICES_SECTION:
+            node_column, layer_column = split_network_file_columns(text, 2)
+            node_id_array = intern_values(node_id_dict, node_column)
+            layer_id_array = intern_layers(layer_column)
+
+            for layer_name, layer_id in layer_id_dict.items():
+                layer_node_id_chunk_list_dict[layer_name].append(node_id_array[layer_id_array == layer_id])
+
+        elif section == MULTINET_EDGES_SECTION:
+            if network_type == "multilayer":
+                source_column, layer_column, target_column, target_layer_column = split_network_file_columns(text, 4)
+
+                if layer_column != target_layer_column:
+                    edge_index = next(i for i, layer_names in enumerate(zip(layer_column, target_layer_column))
+                                      if layer_names[0] != layer_names[1])
+
+                    raise ValueError("Connections between layers are not supported, got {0},{1},{2},{3}".format(
+                        source_column[edge_index], layer_column[edge_index], target_column[edge_index],
+                        target_layer_column[edge_index]))
+            else:
+                source_column, target_column, layer_column = split_network_file_columns(text, 3)
+
+            edge_id_array = stack(
+                [intern_values(node_id_dict, source_column), intern_values(node_id_dict, target_column)], axis=1)
+            layer_id_array = intern_layers(layer_column)
+
+            for layer_name, layer_id in layer_id_dict.items():
+                layer_edge_id_chunk_list_dict[layer_name].append(edge_id_array[layer_id_array == layer_id])
+
+    section = MULTINET_EDGES_SECTION if file_format == "edgelist" else None
+
+    for text in iterate_network_file_text_chunks(path, chunk_size, memory_map):
+        position = 0
+
+        # Lines starting with # are section headers in multinet files and comments in edge lists
+        for header_match in finditer(r'^#.*$', text, MULTILINE):
+            add_records(section, text[position:header_match.start()])
+            position = header_match.end()
+
+            if file_format == "multinet":
+                # The value of a section may follow its name on the header line, e.g. #TYPE multilayer
+                header_field_list = header_match.group().split(None, 1)
+                section = header_field_list[0].upper()
+
+                if section == MULTINET_TYPE_SECTION and len(header_field_list) > 1:
+                    set_network_type(header_field_list[1])
+
+        add_records(section, text[position:])
+
+    # Renumber the ids, which follow the order in which the actors were read, in the order of the sorted actor list
+    node_list = sorted(node_id_dict)
+    node_order_array = fromiter(map(node_id_dict.__getitem__, node_list), dtype=int32, count=len(node_list))
+
+    sorted_node_id_array = empty(len(node_list), dtype=int32)
+    sorted_node_id_array[node_order_array] = arange(len(node_list), dtype=int32)
+
+    layer_node_id_array_dict = {}
+    layer_edge_array_dict = {}
+
+    for layer_name in layer_id_dict:
+        edge_id_array = sorted_node_id_array[concatenate(
+            layer_edge_id_chunk_list_dict[layer_name] + [empty((0, 2), dtype=int32)])]
+
+        # Keep each undirected connection once
+        edge_id_array.sort(axis=1)
+        edge_key_array = edge_id_array[:, 0].astype(int64) * len(node_list) + edge_id_array[:, 1]
+        edge_key_array.sort()
+        first_edge_key_mask = ones(len(edge_key_array), dtype=bool)
+        first_edge_key_mask[1:] = edge_key_array[1:] != edge_key_array[:-1]
+        edge_key_array = edge_key_array[first_edge_key_mask]
+
+        layer_edge_array_dict[layer_name] = (
+            (edge_key_array // max(1, len(node_list))).astype(int32),
+            (edge_key_array % max(1, len(node_list))).astype(int32))
+
+        node_presence_array = zeros(len(node_list), dtype=bool)
+        node_presence_array[edge_id_array.ravel()] = True
+
+        for node_id_array in layer_node_id_chunk_list_dict[layer_name]:
+            node_presence_array[sorted_node_id_array[node_id_array]] = True
+
+        layer_node_id_array_dict[layer_name] = flatnonzero(node_presence_array).astype(int32)
+
+    return node_list, list(layer_id_dict), layer_node_id_array_dict, layer_edge_array_dict
+
@@ -1,15 +1,7 @@
-import matplotlib.pyplot as plt
-from matplotlib.lines import Line2D
-from uunet.multinet import to_nx_dict, flatten, layers
 from networkx import draw, nx_agraph
-from pandas import set_option, ExcelWriter
-from os.path import dirname
+from os.path import dirname, splitext
 
-# Module scope settings
-
-# Pandas settings
-set_option('display.width', 1000)
-set_option('display.max_columns', 20)
+LAYER_CENTRALITY_RESULT_FILE_FORMATS = ["csv", "parquet"]
 
 """
 Dictionary containing settings for each class of layer influence.
@@ -42,6 +34,20 @@ class LayerCentralityExcelModel:
         self.end_col = end_col
 
 
+def set_pandas_display_options():
+    """
+    Widens the pandas display, so that printed result data frames show all layers on one line. The options are
+    global, so they are only set by the scripts which print results, instead of when this module is imported.
+
+    :return: void
+    """
+
+    from pandas import set_option
+
+    set_option('display.width', 1000)
+    set_option('display.max_columns', 20)
+
+
 def get_layer_influence_class(layer_centrality):
     """
     Returns the layer influence class based on the given :param layer_centrality.
@@ -88,6 +94,10 @@ def draw_results_layers(
     :return: void
     """
 
+    import matplotlib.pyplot as plt
+    from matplotlib.lines import Line2D
+    from uunet.multinet import to_nx_dict
+
     layer_dict = to_nx_dict(multilayered_network)
 
     for layer_name in layer_dict.keys():
@@ -144,6 +154,10 @@ def draw_flattened_network_clustering_results(
     :param save_to_path: Disk path for saving the plots.
     """
 
+    import matplotlib.pyplot as plt
+    from matplotlib.lines import Line2D
+    from uunet.multinet import to_nx_dict, flatten, layers
+
     cluster_colors = ['#00FFFF', '#FFD700', '#00FF00', '#B34D4D', '#0000FF',
                       '#D316C8', '#FF0000', '#065535', '#99FF99', '#999966']
 
@@ -200,6 +214,9 @@ def draw_network_clustering_results(
     :param save_to_path: Disk path for saving the plots.
     """
 
+    import matplotlib.pyplot as plt
+    from matplotlib.lines import Line2D
+
     cluster_colors = ['#00FFFF', '#FFD700', '#00FF00', '#B34D4D', '#0000FF',
                       '#D316C8', '#FF0000', '#065535', '#99FF99', '#999966']
 
@@ -260,6 +277,8 @@ def plot_results_histograms(
     :return: void
     """
 
+    import matplotlib.pyplot as plt
+
     bins = [i for i in range(0, number_of_bins * step_size + step_size, step_size)]
 
     results_data_frame_dict = results_data_frame.to_dict()
@@ -297,6 +316,104 @@ def save_results_data_frame_as_csv(data_set_name, centrality_measure, results_da
     # print(results_data_frame)
 
 
+class LayerCentralityResultSink:
+    """
+    Writes chunks of layer centrality results to a .csv or .parquet file as soon as they are received, so that the
+    results of all nodes never have to be kept in memory. The rows of the file are the nodes and the columns are the
+    sorted layer names. Writing parquet files requires pyarrow, which is installed with the parquet extra of the
+    package and is checked when the sink is created, before any result is computed.
+    """
+
+    def __init__(self, path, file_format=None):
+        self.path = path
+        self.file_format = (file_format or splitext(path)[1].lstrip('.')).lower()
+        self.number_of_rows = 0
+
+        if self.file_format not in LAYER_CENTRALITY_RESULT_FILE_FORMATS:
+            raise ValueError("Unknown result file format {0}, expected one of {1}".format(
+                self.file_format, LAYER_CENTRALITY_RESULT_FILE_FORMATS))
+
+        if self.file_format == 'parquet':
+            try:
+                import pyarrow.parquet
+            except ImportError as import_error:
+                raise ImportError("Writing parquet result files requires pyarrow, install it with "
+                                  "pip install layer-centrality[parquet]") from import_error
+
+        self.__column_list = None
+        self.__parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_chunk(self, nodes_layer_centrality_chunk):
+        """
+        Appends a chunk of results to the file.
+
+        :param nodes_layer_centrality_chunk: Dictionary of dictionaries containing the centrality of each layer for
+               each node of the chunk, or a data frame with a row for each node.
+        :return: void
+        """
+
+        from pandas import DataFrame
+
+        if isinstance(nodes_layer_centrality_chunk, DataFrame):
+            chunk_data_frame = nodes_layer_centrality_chunk
+        else:
+            chunk_data_frame = DataFrame.from_dict(nodes_layer_centrality_chunk, orient='index')
+
+        if len(chunk_data_frame) == 0:
+            return
+
+        if self.__column_list is None:
+            self.__column_list = sorted(chunk_data_frame.columns)
+
+        chunk_data_frame = chunk_data_frame[self.__column_list]
+        chunk_data_frame.index.name = 'node'
+
+        if self.file_format == 'csv':
+            chunk_data_frame.to_csv(self.path, mode='w' if self.number_of_rows == 0 else 'a',
+                                    header=self.number_of_rows == 0)
+        else:
+            from pyarrow import Table
+            from pyarrow.parquet import ParquetWriter
+
+            chunk_table = Table.from_pandas(chunk_data_frame, preserve_index=True)
+
+            if self.__parquet_writer is None:
+                self.__parquet_writer = ParquetWriter(self.path, chunk_table.schema)
+
+            self.__parquet_writer.write_table(chunk_table)
+
+        self.number_of_rows += len(chunk_data_frame)
+
+    def close(self):
+        if self.__parquet_writer is not None:
+            self.__parquet_writer.close()
+            self.__parquet_writer = None
+
+
+def write_layer_centrality_chunks(nodes_layer_centrality_chunk_iterable, path, file_format=None):
+    """
+    Writes the chunks of layer centrality results generated by e.g. iterate_multinet_layer_centrality to a .csv or
+    .parquet file, while they are being computed.
+
+    :param nodes_layer_centrality_chunk_iterable: Iterable of result chunks.
+    :param path: Path of the result file.
+    :param file_format: "csv" or "parquet", or None to use the extension of :param path.
+    :return: Number of written rows.
+    """
+
+    with LayerCentralityResultSink(path, file_format) as layer_centrality_result_sink:
+        for nodes_layer_centrality_chunk in nodes_layer_centrality_chunk_iterable:
+            layer_centrality_result_sink.write_chunk(nodes_layer_centrality_chunk)
+
+    return layer_centrality_result_sink.number_of_rows
+
+
 def save_layer_centrality_excel_models_as_xlsx(
         data_set_name,
         centrality_measure,
@@ -311,6 +428,8 @@ def save_layer_centrality_excel_models_as_xlsx(
     :return: void
     """
 
+    from pandas import ExcelWriter
+
     project_root_path = dirname(dirname(__file__))
 
     writer = ExcelWriter('{0}/internal/results/{1}/{2}/{1}_{2}_results.xlsx'.format(
@@ -357,6 +476,8 @@ def save_results_analysis_data_frames_as_xlsx(
     :return: void
     """
 
+    from pandas import ExcelWriter
+
     project_root_path = dirname(dirname(__file__))
 
     writer = ExcelWriter('{0}/internal/results/{1}/{2}/{1}_{2}_results_analysis.xlsx'.format(
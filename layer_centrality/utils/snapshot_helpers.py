@@ -0,0 +1,180 @@
+import json
+from hashlib import sha256
+from mmap import ACCESS_READ, mmap
+from os import replace
+from os.path import abspath, dirname, getsize
+from struct import Struct
+from tempfile import NamedTemporaryFile
+from numpy import frombuffer, ones, uint8
+from scipy.sparse import csr_matrix
+
+
+# Version of the layout of the snapshot files, files written with another version are rejected
+NETWORK_SNAPSHOT_VERSION = 1
+
+NETWORK_SNAPSHOT_MAGIC = b'LCSNAP\x00\x00'
+
+# Magic, version, header length
+NETWORK_SNAPSHOT_PREFIX = Struct('<8sIQ')
+
+# Offset alignment of the arrays, so that every array can be viewed in place with its own dtype
+NETWORK_SNAPSHOT_ALIGNMENT = 64
+
+
+def is_network_snapshot(path):
+    """
+    Checks whether a file starts with the magic of a network snapshot.
+
+    :param path: Path of the file.
+    :return: True if the file is a network snapshot, False otherwise.
+    """
+
+    if getsize(path) < NETWORK_SNAPSHOT_PREFIX.size:
+        return False
+
+    with open(path, 'rb') as snapshot_file:
+        return snapshot_file.read(len(NETWORK_SNAPSHOT_MAGIC)) == NETWORK_SNAPSHOT_MAGIC
+
+
+def save_network_snapshot(path, node_list, layer_list, layer_node_id_array_dict, layer_csr_matrix_dict):
+    """
+    Saves a multilayer network as a binary snapshot. The file starts with the magic, the layout version and the
+    length of a json header, which holds the layer list, the sha256 checksum of the data and the offset, dtype and
+    shape of each array. The arrays follow, each aligned to :const NETWORK_SNAPSHOT_ALIGNMENT bytes: the actor table,
+    as the utf-8 encoded actor names separated by null characters, and, for each layer, the ids of the actors present
+    on it and the indptr, indices and data arrays of its symmetric CSR adjacency matrix.
+
+    The file is written under a temporary name and then renamed, so that concurrent readers never see a partially
+    written snapshot.
+
+    :param path: Path of the snapshot file.
+    :param node_list: Sorted list of actor names, whose positions are the actor ids.
+    :param layer_list: List of layer names.
+    :param layer_node_id_array_dict: Dictionary containing the array of the ids of the actors present on each layer.
+    :param layer_csr_matrix_dict: Dictionary containing the symmetric boolean CSR adjacency matrix of each layer.
+    :return: Hexadecimal sha256 checksum of the data.
+    """
+
+    for node in node_list:
+        if not isinstance(node, str) or '\x00' in node:
+            raise ValueError("Actor names of a snapshot must be strings without null characters, got {0!r}".format(
+                node))
+
+    array_list = [('node_names', frombuffer('\x00'.join(node_list).encode('utf-8'), dtype=uint8))]
+
+    for layer_index, layer_name in enumerate(layer_list):
+        layer_csr_matrix = layer_csr_matrix_dict[layer_name]
+
+        if not layer_csr_matrix.has_sorted_indices:
+            layer_csr_matrix = layer_csr_matrix.sorted_indices()
+
+        # scipy requires indptr and indices of the same dtype to use them without copying
+        index_dtype = '<i8' if layer_csr_matrix.nnz > 2 ** 31 - 1 else '<i4'
+
+        array_list += [
+            ('layer_{0}_node_ids'.format(layer_index), layer_node_id_array_dict[layer_name].astype('<i4')),
+            ('layer_{0}_indptr'.format(layer_index), layer_csr_matrix.indptr.astype(index_dtype)),
+            ('layer_{0}_indices'.format(layer_index), layer_csr_matrix.indices.astype(index_dtype)),
+            ('layer_{0}_data'.format(layer_index), ones(layer_csr_matrix.nnz, dtype=bool))]
+
+    array_metadata_dict = {}
+    data_hash = sha256()
+    data_size = 0
+
+    for array_name, snapshot_array in array_list:
+        data_size += -data_size % NETWORK_SNAPSHOT_ALIGNMENT
+        array_metadata_dict[array_name] = [data_size, snapshot_array.dtype.str, list(snapshot_array.shape)]
+        data_size += snapshot_array.nbytes
+
+        data_hash.update(snapshot_array.tobytes())
+
+    header = json.dumps({
+        'version': NETWORK_SNAPSHOT_VERSION,
+        'sha256': data_hash.hexdigest(),
+        'number_of_nodes': len(node_list),
+        'layer_list': list(layer_list),
+        'arrays': array_metadata_dict
+    }, sort_keys=True).encode('utf-8')
+
+    data_offset = NETWORK_SNAPSHOT_PREFIX.size + len(header)
+    data_offset += -data_offset % NETWORK_SNAPSHOT_ALIGNMENT
+
+    with NamedTemporaryFile(dir=dirname(abspath(path)), suffix='.tmp', delete=False) as snapshot_file:
+        snapshot_file.write(NETWORK_SNAPSHOT_PREFIX.pack(NETWORK_SNAPSHOT_MAGIC, NETWORK_SNAPSHOT_VERSION, len(header)))
+        snapshot_file.write(header)
+
+        for array_name, snapshot_array in array_list:
+            snapshot_file.write(b'\x00' * (data_offset + array_metadata_dict[array_name][0] - snapshot_file.tell()))
+            snapshot_file.write(snapshot_array.tobytes())
+
+    replace(snapshot_file.name, path)
+
+    return data_hash.hexdigest()
+
+
+def load_network_snapshot(path, verify=False):
+    """
+    Loads a binary snapshot written by save_network_snapshot. The file is memory-mapped read-only and the arrays are
+    views of the mapping, so that nothing is parsed or copied except the actor names, and processes loading the same
+    snapshot share one physical copy of the arrays through the page cache.
+
+    :param path: Path of the snapshot file.
+    :param verify: Whether the sha256 checksum of the data is verified, which reads the whole file.
+    :return: Tuple of the sorted actor list, of the layer list, of a dictionary containing the read-only array of the
+             ids of the actors present on each layer, of a dictionary containing the read-only CSR adjacency matrix
+             of each layer, and of the sha256 checksum of the data.
+    """
+
+    with open(path, 'rb') as snapshot_file:
+        snapshot_buffer = mmap(snapshot_file.fileno(), 0, access=ACCESS_READ)
+
+    magic, version, header_length = NETWORK_SNAPSHOT_PREFIX.unpack_from(snapshot_buffer)
+
+    if magic != NETWORK_SNAPSHOT_MAGIC:
+        raise ValueError("{0} is not a network snapshot".format(path))
+
+    if version != NETWORK_SNAPSHOT_VERSION:
+        raise ValueError("Network snapshot {0} has version {1}, expected version {2}".format(
+            path, version, NETWORK_SNAPSHOT_VERSION))
+
+    header_dict = json.loads(
+        snapshot_buffer[NETWORK_SNAPSHOT_PREFIX.size:NETWORK_SNAPSHOT_PREFIX.size + header_length].decode('utf-8'))
+
+    data_offset = NETWORK_SNAPSHOT_PREFIX.size + header_length
+    data_offset += -data_offset % NETWORK_SNAPSHOT_ALIGNMENT
+
+    snapshot_array_dict = {}
+
+    for array_name, (array_offset, array_dtype, array_shape) in header_dict['arrays'].items():
+        snapshot_array_dict[array_name] = frombuffer(
+            snapshot_buffer, dtype=array_dtype, count=int(array_shape[0]),
+            offset=data_offset + array_offset).reshape(array_shape)
+
+    if verify:
+        data_hash = sha256()
+
+        for array_name in sorted(header_dict['arrays'], key=lambda name: header_dict['arrays'][name][0]):
+            data_hash.update(snapshot_array_dict[array_name])
+
+        if data_hash.hexdigest() != header_dict['sha256']:
+            raise ValueError("Network snapshot {0} is corrupted, its checksum does not match its data".format(path))
+
+    number_of_nodes = header_dict['number_of_nodes']
+    node_names = snapshot_array_dict['node_names'].tobytes().decode('utf-8')
+    node_list = node_names.split('\x00') if number_of_nodes > 0 else []
+
+    layer_list = header_dict['layer_list']
+    layer_node_id_array_dict = {}
+    layer_csr_matrix_dict = {}
+
+    for layer_index, layer_name in enumerate(layer_list):
+        indptr_array = snapshot_array_dict['layer_{0}_indptr'.format(layer_index)]
+        indices_array = snapshot_array_dict['layer_{0}_indices'.format(layer_index)]
+
+        layer_node_id_array_dict[layer_name] = snapshot_array_dict['layer_{0}_node_ids'.format(layer_index)]
+        layer_csr_matrix_dict[layer_name] = csr_matrix(
+            (snapshot_array_dict['layer_{0}_data'.format(layer_index)], indices_array, indptr_array),
+            shape=(number_of_nodes, number_of_nodes), copy=False)
+        layer_csr_matrix_dict[layer_name].has_sorted_indices = True
+
+    return node_list, layer_list, layer_node_id_array_dict, layer_csr_matrix_dict, header_dict['sha256']
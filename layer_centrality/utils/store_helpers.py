@@ -0,0 +1,372 @@
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from os import close as close_file_descriptor, remove
+from os.path import exists, join
+from shutil import rmtree
+from tempfile import mkdtemp, mkstemp
+from weakref import finalize
+from numpy import asarray, flatnonzero, float64, full, isnan, load, memmap, nan, save, zeros
+
+
+class CoalitionValueMapping(MutableMapping):
+    """
+    Base class of the containers of the node centrality values of layer coalitions, keyed by coalition bitmask. The
+    values of a coalition are kept as a row over :attr node_list, where the nodes which are not present have the
+    value NaN, and are read through a dictionary-like view.
+    """
+
+    def __init__(self, node_list, node_index_dict=None):
+        self.node_list = node_list
+        self.node_index_dict = {node: i for i, node in enumerate(node_list)} \
+            if node_index_dict is None else node_index_dict
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def create_row(self, node_centrality_dict):
+        """
+        Creates a row over the node list from a dictionary of node centrality values.
+
+        :param node_centrality_dict: Dictionary of centrality values for the present nodes.
+        :return: Array of centrality values, where the nodes which are not present have the value NaN.
+        """
+
+        coalition_node_row = full(len(self.node_list), nan)
+
+        for node, centrality in node_centrality_dict.items():
+            coalition_node_row[self.node_index_dict[node]] = centrality
+
+        return coalition_node_row
+
+    def get_row(self, coalition_mask):
+        raise NotImplementedError
+
+    def set_row(self, coalition_mask, coalition_node_row):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __getitem__(self, coalition_mask):
+        return CoalitionNodeValueView(self.node_list, self.node_index_dict, self.get_row(coalition_mask))
+
+    def __setitem__(self, coalition_mask, node_centrality_values):
+        if isinstance(node_centrality_values, Mapping):
+            node_centrality_values = self.create_row(node_centrality_values)
+
+        self.set_row(coalition_mask, node_centrality_values)
+
+
+class CoalitionValueTable(CoalitionValueMapping):
+    """
+    Container of the node centrality values of layer coalitions backed by a contiguous (coalition x node) array,
+    indexed by coalition bitmask, with a float64 or float32 data type. The array can be backed by a memory-mapped
+    file, so that tables larger than the memory can be used. A temporary memory-mapped file is removed when the
+    table is closed, which also happens when it is used as a context manager or garbage collected.
+    """
+
+    def __init__(self, node_list, number_of_coalitions, node_index_dict=None, dtype=float64, memory_map=None):
+        """
+        :param node_list: List of nodes, in the order of the table columns.
+        :param number_of_coalitions: Number of table rows, i.e. 2^L for L layers.
+        :param node_index_dict: Dictionary of the position of each node in :param node_list.
+        :param dtype: Data type of the centrality values, float64 or float32.
+        :param memory_map: Path of the file backing the table, True for a temporary file, or None to keep the table
+               in memory.
+        """
+
+        super().__init__(node_list, node_index_dict)
+
+        self.dtype = dtype
+        self.memory_map_path = None
+
+        self.__memory_map_finalizer = None
+
+        table_shape = (number_of_coalitions, len(node_list))
+
+        if memory_map is None or memory_map is False:
+            self.coalition_node_table = full(table_shape, nan, dtype=dtype)
+        else:
+            if memory_map is True:
+                memory_map_file_descriptor, self.memory_map_path = mkstemp(
+                    prefix='coalition_value_table_', suffix='.dat')
+                close_file_descriptor(memory_map_file_descriptor)
+                self.__memory_map_finalizer = finalize(self, remove_file_if_exists, self.memory_map_path)
+            else:
+                self.memory_map_path = memory_map
+
+            self.coalition_node_table = memmap(self.memory_map_path, dtype=dtype, mode='w+', shape=table_shape)
+            self.coalition_node_table[:] = nan
+
+        # Whether the values of each coalition have been stored
+        self.__stored_coalition_array = zeros(number_of_coalitions, dtype=bool)
+
+    def __getstate__(self):
+        # The contents of the table are not copied, e.g. to worker processes
+        state_dict = self.__dict__.copy()
+        state_dict['coalition_node_table'] = None
+        state_dict['memory_map_path'] = None
+        state_dict['_CoalitionValueTable__memory_map_finalizer'] = None
+        state_dict['_CoalitionValueTable__stored_coalition_array'] = None
+
+        return state_dict
+
+    def get_row(self, coalition_mask):
+        """
+        Returns the row of centrality values of a coalition.
+
+        :param coalition_mask: Coalition bitmask.
+        :return: Array of centrality values over the node list, where the nodes which are not present have the value
+                 NaN.
+        """
+
+        if self.__stored_coalition_array is None or not self.__stored_coalition_array[coalition_mask]:
+            raise KeyError(coalition_mask)
+
+        return self.coalition_node_table[coalition_mask]
+
+    def set_row(self, coalition_mask, coalition_node_row):
+        if self.__stored_coalition_array is None:
+            raise ValueError("The coalition value table is closed")
+
+        self.coalition_node_table[coalition_mask] = coalition_node_row
+        self.__stored_coalition_array[coalition_mask] = True
+
+    def close(self):
+        """
+        Releases the table and removes its temporary memory-mapped file.
+
+        :return: void
+        """
+
+        if isinstance(self.coalition_node_table, memmap):
+            self.coalition_node_table.flush()
+
+        self.coalition_node_table = None
+        self.__stored_coalition_array = None
+
+        if self.__memory_map_finalizer is not None:
+            self.__memory_map_finalizer()
+            self.__memory_map_finalizer = None
+
+    def __delitem__(self, coalition_mask):
+        if coalition_mask not in self:
+            raise KeyError(coalition_mask)
+
+        self.coalition_node_table[coalition_mask] = nan
+        self.__stored_coalition_array[coalition_mask] = False
+
+    def __contains__(self, coalition_mask):
+        return self.__stored_coalition_array is not None and 0 <= coalition_mask < len(self.__stored_coalition_array) \
+            and bool(self.__stored_coalition_array[coalition_mask])
+
+    def __iter__(self):
+        if self.__stored_coalition_array is None:
+            return iter([])
+
+        return iter(flatnonzero(self.__stored_coalition_array).tolist())
+
+    def __len__(self):
+        return 0 if self.__stored_coalition_array is None else int(self.__stored_coalition_array.sum())
+
+
+class CoalitionValueStore(CoalitionValueMapping):
+    """
+    Store of the node centrality values of layer coalitions, keeping a separate row for each coalition. The rows kept
+    in memory are bounded by :attr memory_budget bytes. When the budget is exceeded, the least recently used rows are
+    either spilled to a temporary directory, from which they are loaded back when accessed, or evicted. Evicted rows
+    are recomputed by :attr missing_row_function when accessed, if it is given. The spilled rows are removed when the
+    store is closed, which also happens when it is used as a context manager or garbage collected.
+    """
+
+    def __init__(
+            self,
+            node_list,
+            node_index_dict=None,
+            memory_budget=None,
+            spill_to_disk=False,
+            missing_row_function=None,
+            dtype=float64
+    ):
+        super().__init__(node_list, node_index_dict)
+
+        self.dtype = dtype
+        self.memory_budget = memory_budget
+        self.spill_to_disk = spill_to_disk
+        self.missing_row_function = missing_row_function
+
+        self.__memory_row_dict = OrderedDict()
+        self.__memory_usage = 0
+        self.__spilled_row_path_dict = {}
+        self.__spill_directory = None
+        self.__spill_directory_finalizer = None
+
+    def __getstate__(self):
+        # The contents of the store are not copied, e.g. to worker processes
+        state_dict = self.__dict__.copy()
+        state_dict['_CoalitionValueStore__memory_row_dict'] = OrderedDict()
+        state_dict['_CoalitionValueStore__memory_usage'] = 0
+        state_dict['_CoalitionValueStore__spilled_row_path_dict'] = {}
+        state_dict['_CoalitionValueStore__spill_directory'] = None
+        state_dict['_CoalitionValueStore__spill_directory_finalizer'] = None
+
+        return state_dict
+
+    @property
+    def memory_usage(self):
+        """
+        Number of bytes used by the rows kept in memory.
+        """
+
+        return self.__memory_usage
+
+    def get_row(self, coalition_mask):
+        """
+        Returns the row of centrality values of a coalition, loading it back from disk if it was spilled, or
+        recomputing it if it was evicted.
+
+        :param coalition_mask: Coalition bitmask.
+        :return: Array of centrality values over the node list, where the nodes which are not present have the value
+                 NaN.
+        """
+
+        if coalition_mask in self.__memory_row_dict:
+            self.__memory_row_dict.move_to_end(coalition_mask)
+
+            return self.__memory_row_dict[coalition_mask]
+
+        if coalition_mask in self.__spilled_row_path_dict:
+            spilled_row_path = self.__spilled_row_path_dict.pop(coalition_mask)
+            coalition_node_row = load(spilled_row_path)
+            remove(spilled_row_path)
+        elif self.missing_row_function is not None:
+            coalition_node_row = self.missing_row_function(coalition_mask)
+        else:
+            raise KeyError(coalition_mask)
+
+        self.set_row(coalition_mask, coalition_node_row)
+
+        return coalition_node_row
+
+    def set_row(self, coalition_mask, coalition_node_row):
+        """
+        Stores the row of centrality values of a coalition, spilling or evicting the least recently used rows if the
+        memory budget is exceeded.
+
+        :param coalition_mask: Coalition bitmask.
+        :param coalition_node_row: Array of centrality values over the node list.
+        :return: void
+        """
+
+        self.discard_row(coalition_mask)
+
+        self.__memory_row_dict[coalition_mask] = asarray(coalition_node_row, dtype=self.dtype)
+        self.__memory_usage += self.__memory_row_dict[coalition_mask].nbytes
+
+        self.release_memory()
+
+    def discard_row(self, coalition_mask):
+        if coalition_mask in self.__memory_row_dict:
+            self.__memory_usage -= self.__memory_row_dict.pop(coalition_mask).nbytes
+
+        if coalition_mask in self.__spilled_row_path_dict:
+            remove(self.__spilled_row_path_dict.pop(coalition_mask))
+
+    def release_memory(self):
+        """
+        Spills or evicts the least recently used rows until the rows kept in memory fit in the memory budget. The
+        most recently used row is always kept.
+
+        :return: void
+        """
+
+        if self.memory_budget is None:
+            return
+
+        while self.__memory_usage > self.memory_budget and len(self.__memory_row_dict) > 1:
+            coalition_mask, coalition_node_row = self.__memory_row_dict.popitem(last=False)
+            self.__memory_usage -= coalition_node_row.nbytes
+
+            if self.spill_to_disk:
+                self.__spilled_row_path_dict[coalition_mask] = self.spill_row(coalition_mask, coalition_node_row)
+
+    def spill_row(self, coalition_mask, coalition_node_row):
+        if self.__spill_directory is None:
+            self.__spill_directory = mkdtemp(prefix='coalition_value_store_')
+            self.__spill_directory_finalizer = finalize(self, rmtree, self.__spill_directory, ignore_errors=True)
+
+        spilled_row_path = join(self.__spill_directory, '{0}.npy'.format(coalition_mask))
+        save(spilled_row_path, coalition_node_row)
+
+        return spilled_row_path
+
+    def close(self):
+        """
+        Releases all rows of the store and removes the spilled rows from disk.
+
+        :return: void
+        """
+
+        self.__memory_row_dict.clear()
+        self.__memory_usage = 0
+        self.__spilled_row_path_dict.clear()
+
+        if self.__spill_directory_finalizer is not None:
+            self.__spill_directory_finalizer()
+
+        self.__spill_directory = None
+        self.__spill_directory_finalizer = None
+
+    def __delitem__(self, coalition_mask):
+        if coalition_mask not in self:
+            raise KeyError(coalition_mask)
+
+        self.discard_row(coalition_mask)
+
+    def __contains__(self, coalition_mask):
+        return coalition_mask in self.__memory_row_dict or coalition_mask in self.__spilled_row_path_dict
+
+    def __iter__(self):
+        yield from list(self.__memory_row_dict)
+        yield from list(self.__spilled_row_path_dict)
+
+    def __len__(self):
+        return len(self.__memory_row_dict) + len(self.__spilled_row_path_dict)
+
+
+class CoalitionNodeValueView(Mapping):
+    """
+    Read-only dictionary-like view of the row of a coalition, containing the centrality values of the nodes which
+    are present in the flattened network of the coalition.
+    """
+
+    def __init__(self, node_list, node_index_dict, coalition_node_row):
+        self.__node_list = node_list
+        self.__node_index_dict = node_index_dict
+        self.__coalition_node_row = coalition_node_row
+
+    def __getitem__(self, node):
+        centrality = self.__coalition_node_row[self.__node_index_dict[node]]
+
+        if isnan(centrality):
+            raise KeyError(node)
+
+        return float(centrality)
+
+    def __contains__(self, node):
+        return node in self.__node_index_dict and not isnan(self.__coalition_node_row[self.__node_index_dict[node]])
+
+    def __iter__(self):
+        for i in flatnonzero(~isnan(self.__coalition_node_row)):
+            yield self.__node_list[i]
+
+    def __len__(self):
+        return int((~isnan(self.__coalition_node_row)).sum())
+
+
+def remove_file_if_exists(path):
+    if exists(path):
+        remove(path)
@@ -34,5 +34,8 @@ setup(
         "uunet==1.1.4",
         "XlsxWriter==3.1.9",
         "zipp==3.17.0"
-    ]
+    ],
+    extras_require={
+        "parquet": ["pyarrow"]
+    }
 )
@@ -0,0 +1,72 @@
+import pytest
+from networkx import Graph, gnp_random_graph
+
+
+def create_synthetic_nx_layer_dict():
+    """
+    Creates a small multiplex network of 24 actors on 4 layers: two random layers, a copy of the first one, so that
+    the layers are grouped into layer types, and a layer made of two separate components on which some actors are not
+    present and one actor is present without connections.
+
+    :return: Multilayer network layer dictionary.
+    """
+
+    node_list = ["n{0:02d}".format(i) for i in range(24)]
+
+    def create_random_layer(edge_probability, seed):
+        nx_layer = Graph()
+        nx_layer.add_nodes_from(node_list)
+        nx_layer.add_edges_from(
+            (node_list[source], node_list[target])
+            for source, target in gnp_random_graph(len(node_list), edge_probability, seed=seed).edges)
+
+        return nx_layer
+
+    work_layer = create_random_layer(0.15, 1)
+    lunch_layer = create_random_layer(0.1, 2)
+
+    facebook_layer = Graph()
+    facebook_layer.add_edges_from([
+        ("n00", "n01"), ("n01", "n02"), ("n02", "n03"), ("n03", "n00"), ("n02", "n04"),
+        ("n10", "n11"), ("n11", "n12"), ("n12", "n10"), ("n12", "n13")])
+    facebook_layer.add_node("n20")
+
+    return {
+        "work": work_layer,
+        "lunch": lunch_layer,
+        "facebook": facebook_layer,
+        "work_copy": work_layer.copy()
+    }
+
+
+def write_multinet_file(path, nx_layer_dict):
+    with open(path, 'w') as multinet_file:
+        multinet_file.write("#TYPE multiplex\n#VERTICES\n")
+
+        for layer, nx_layer in nx_layer_dict.items():
+            for node in nx_layer.nodes:
+                multinet_file.write("{0},{1}\n".format(node, layer))
+
+        multinet_file.write("#EDGES\n")
+
+        for layer, nx_layer in nx_layer_dict.items():
+            for source, target in nx_layer.edges:
+                multinet_file.write("{0},{1},{2}\n".format(source, target, layer))
+
+
+@pytest.fixture
+def nx_layer_dict():
+    return create_synthetic_nx_layer_dict()
+
+
+@pytest.fixture
+def nodes(nx_layer_dict):
+    return sorted(set(node for nx_layer in nx_layer_dict.values() for node in nx_layer.nodes))
+
+
+@pytest.fixture
+def multinet_path(tmp_path, nx_layer_dict):
+    path = str(tmp_path / "synthetic.mpx")
+    write_multinet_file(path, nx_layer_dict)
+
+    return path
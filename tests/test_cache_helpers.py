@@ -0,0 +1,102 @@
+import json
+from os import listdir, utime
+from numpy import arange
+from numpy.testing import assert_array_equal
+from layer_centrality.utils.adjacency_helpers import LayerAdjacency
+from layer_centrality.utils.cache_helpers import COALITION_TABLE_CACHE_VERSION, CoalitionTableCache
+
+
+def create_coalition_node_table(number_of_layers, number_of_nodes):
+    return arange((1 << number_of_layers) * number_of_nodes, dtype=float).reshape(-1, number_of_nodes)
+
+
+def test_cache_key_does_not_depend_on_layer_order(tmp_path, nx_layer_dict):
+    cache = CoalitionTableCache(str(tmp_path))
+    reordered_nx_layer_dict = {layer: nx_layer_dict[layer] for layer in reversed(list(nx_layer_dict))}
+
+    cache_key = cache.get_cache_key(LayerAdjacency(nx_layer_dict), "harmonic_centrality", {})
+
+    assert cache.get_cache_key(LayerAdjacency(reordered_nx_layer_dict), "harmonic_centrality", {}) == cache_key
+    assert cache.get_cache_key(LayerAdjacency(nx_layer_dict), "katz_centrality", {}) != cache_key
+    assert cache.get_cache_key(LayerAdjacency(nx_layer_dict), "harmonic_centrality", {'alpha': 0.1}) != cache_key
+
+    nx_layer_dict["lunch"].add_edge("n00", "n23")
+
+    assert cache.get_cache_key(LayerAdjacency(nx_layer_dict), "harmonic_centrality", {}) != cache_key
+
+
+def test_cache_round_trip_in_another_layer_order(tmp_path):
+    cache = CoalitionTableCache(str(tmp_path))
+    coalition_node_table = create_coalition_node_table(3, 4)
+
+    cache.store("key", coalition_node_table, ["a", "b", "c"])
+
+    assert_array_equal(cache.load("key", ["a", "b", "c"]), coalition_node_table)
+
+    # The row of a coalition moves with the bitmask of its layers
+    reordered_coalition_node_table = cache.load("key", ["c", "a", "b"])
+
+    for coalition_mask in range(8):
+        reordered_coalition_mask = (coalition_mask >> 2 & 1) | (coalition_mask & 3) << 1
+        assert_array_equal(
+            reordered_coalition_node_table[reordered_coalition_mask], coalition_node_table[coalition_mask])
+
+    assert cache.load("missing", ["a", "b", "c"]) is None
+
+
+def test_cache_rejects_checksum_mismatch(tmp_path):
+    cache = CoalitionTableCache(str(tmp_path))
+    cache.store("key", create_coalition_node_table(2, 4), ["a", "b"])
+
+    # Change the last value of the table without changing the metadata
+    with open(cache.get_table_path("key"), 'r+b') as table_file:
+        table_file.seek(-1, 2)
+        table_file.write(b'\x7f')
+
+    assert cache.load("key", ["a", "b"]) is None
+    assert listdir(str(tmp_path)) == []
+
+
+def test_cache_rejects_version_mismatch(tmp_path):
+    cache = CoalitionTableCache(str(tmp_path))
+    cache.store("key", create_coalition_node_table(2, 4), ["a", "b"])
+
+    with open(cache.get_metadata_path("key")) as metadata_file:
+        metadata_dict = json.load(metadata_file)
+
+    metadata_dict['version'] = COALITION_TABLE_CACHE_VERSION + 1
+
+    with open(cache.get_metadata_path("key"), 'w') as metadata_file:
+        json.dump(metadata_dict, metadata_file)
+
+    assert cache.load("key", ["a", "b"]) is None
+    assert listdir(str(tmp_path)) == []
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    coalition_node_table = create_coalition_node_table(3, 64)
+
+    cache = CoalitionTableCache(str(tmp_path))
+    cache.store("first", coalition_node_table, ["a", "b", "c"])
+
+    entry_size = sum((tmp_path / name).stat().st_size for name in listdir(str(tmp_path)))
+
+    # Room for two entries
+    cache.max_cache_size = 2 * entry_size + entry_size // 2
+
+    def set_last_used_time(cache_key, last_used_time):
+        for path in (cache.get_table_path(cache_key), cache.get_metadata_path(cache_key)):
+            utime(path, (last_used_time, last_used_time))
+
+    set_last_used_time("first", 1000)
+    cache.store("second", coalition_node_table + 1, ["a", "b", "c"])
+    set_last_used_time("second", 2000)
+
+    # Loading the first entry marks it as recently used, so the second one is evicted
+    assert cache.load("first", ["a", "b", "c"]) is not None
+
+    cache.store("third", coalition_node_table + 2, ["a", "b", "c"])
+
+    assert cache.load("second", ["a", "b", "c"]) is None
+    assert_array_equal(cache.load("first", ["a", "b", "c"]), coalition_node_table)
+    assert_array_equal(cache.load("third", ["a", "b", "c"]), coalition_node_table + 2)
@@ -0,0 +1,288 @@
+import pytest
+from numpy import array
+from numpy.testing import assert_allclose
+from layer_centrality.algo.core.layer_centrality import compute_multinet_layer_centrality, \
+    compute_multinet_layer_centrality_for_nodes, compute_vectorized_multinet_layer_centrality, \
+    iterate_multinet_layer_centrality, update_multinet_layer_centrality, update_multinet_layers_centrality
+from layer_centrality.algo.core.temporal_layer_centrality import compute_temporal_multinet_layer_centrality
+from layer_centrality.utils.cache_helpers import CoalitionTableCache
+from layer_centrality.utils.centrality_helpers import DegreeCentralityHelper, HarmonicCentralityHelper, \
+    KatzCentralityHelper, SubgraphCentralityHelper, create_layer_combinations_node_centrality_dicts
+from layer_centrality.utils.dataset_helpers import DatasetHelper
+from layer_centrality.utils.store_helpers import CoalitionValueStore
+
+
+CENTRALITY_HELPER_CLASSES = [
+    DegreeCentralityHelper, HarmonicCentralityHelper, KatzCentralityHelper, SubgraphCentralityHelper]
+
+# The networkx katz centrality of the baseline is computed by a power iteration with a tolerance of 1e-6
+CENTRALITY_HELPER_TOLERANCE_DICT = {KatzCentralityHelper: 1e-3}
+
+# Connections inserted in and removed from the synthetic network of conftest.py. The inserted connection of the
+# facebook layer makes n05 present on it
+LAYER_EDGE_DELTA_DICT = {
+    "work": ([("n00", "n23"), ("n05", "n17")], []),
+    "facebook": ([("n04", "n05"), ("n13", "n20")], [("n10", "n11")])
+}
+
+
+def copy_nx_layer_dict(nx_layer_dict):
+    return {layer: nx_layer.copy() for layer, nx_layer in nx_layer_dict.items()}
+
+
+def apply_layer_edge_delta(nx_layer_dict, layer_edge_delta_dict):
+    for layer, (added_edges, removed_edges) in layer_edge_delta_dict.items():
+        nx_layer_dict[layer].remove_edges_from(removed_edges)
+        nx_layer_dict[layer].add_edges_from(added_edges)
+
+
+def compute_baseline_layer_centrality(nx_layer_dict, nodes, centrality_helper_class):
+    nx_layer_dict = copy_nx_layer_dict(nx_layer_dict)
+
+    return compute_multinet_layer_centrality(
+        nx_layer_dict, nodes, centrality_helper_class(nx_layer_dict, use_sparse_adjacency=False))
+
+
+def assert_layer_centrality_equal(nodes_layer_centrality_dict, expected_nodes_layer_centrality_dict,
+                                  centrality_helper_class):
+    assert set(nodes_layer_centrality_dict) == set(expected_nodes_layer_centrality_dict)
+
+    nodes = sorted(expected_nodes_layer_centrality_dict)
+    layers = sorted(expected_nodes_layer_centrality_dict[nodes[0]])
+
+    assert_allclose(
+        array([[nodes_layer_centrality_dict[node][layer] for layer in layers] for node in nodes]),
+        array([[expected_nodes_layer_centrality_dict[node][layer] for layer in layers] for node in nodes]),
+        rtol=0, atol=CENTRALITY_HELPER_TOLERANCE_DICT.get(centrality_helper_class, 1e-9))
+
+
+@pytest.fixture(params=CENTRALITY_HELPER_CLASSES, ids=lambda helper_class: helper_class.__name__)
+def centrality_helper_class(request):
+    return request.param
+
+
+@pytest.fixture
+def baseline_layer_centrality_dict(nx_layer_dict, nodes, centrality_helper_class):
+    return compute_baseline_layer_centrality(nx_layer_dict, nodes, centrality_helper_class)
+
+
+def test_vectorized_layer_centrality(nx_layer_dict, nodes, centrality_helper_class, baseline_layer_centrality_dict):
+    centrality_helper = centrality_helper_class(nx_layer_dict)
+
+    assert_layer_centrality_equal(
+        compute_vectorized_multinet_layer_centrality(nx_layer_dict, nodes, centrality_helper),
+        baseline_layer_centrality_dict, centrality_helper_class)
+
+
+def test_pruned_layer_centrality(nx_layer_dict, nodes, centrality_helper_class, baseline_layer_centrality_dict):
+    # With a memory budget the nodes are evaluated one by one, on the layer combinations on which they are present
+    centrality_helper = centrality_helper_class(nx_layer_dict, precompute=False, memory_budget=1000)
+
+    assert_layer_centrality_equal(
+        compute_multinet_layer_centrality(nx_layer_dict, nodes, centrality_helper),
+        baseline_layer_centrality_dict, centrality_helper_class)
+
+
+def test_layer_centrality_for_nodes(nx_layer_dict, nodes, centrality_helper_class, baseline_layer_centrality_dict):
+    centrality_helper = centrality_helper_class(nx_layer_dict, precompute=False)
+
+    assert_layer_centrality_equal(
+        compute_multinet_layer_centrality_for_nodes(nx_layer_dict, nodes, centrality_helper, node_chunk_size=5),
+        baseline_layer_centrality_dict, centrality_helper_class)
+
+
+def test_streamed_layer_centrality(nx_layer_dict, nodes, centrality_helper_class, baseline_layer_centrality_dict):
+    # The layer combinations are filled in as by the streaming analyzer
+    centrality_helper = centrality_helper_class(nx_layer_dict, precompute=False)
+    create_layer_combinations_node_centrality_dicts([centrality_helper])
+    nodes_layer_centrality_dict = {}
+
+    for node_chunk_layer_centrality_dict in iterate_multinet_layer_centrality(
+            nx_layer_dict, iter(nodes), centrality_helper, node_chunk_size=5):
+        assert len(node_chunk_layer_centrality_dict) <= 5
+
+        nodes_layer_centrality_dict.update(node_chunk_layer_centrality_dict)
+
+    assert_layer_centrality_equal(nodes_layer_centrality_dict, baseline_layer_centrality_dict, centrality_helper_class)
+
+
+def test_parallel_layer_centrality(nx_layer_dict, nodes, centrality_helper_class, baseline_layer_centrality_dict):
+    # The workers write the values of the layer combinations into a table in shared memory
+    with centrality_helper_class(nx_layer_dict, number_of_workers=2) as centrality_helper:
+        assert_layer_centrality_equal(
+            compute_multinet_layer_centrality(nx_layer_dict, nodes, centrality_helper),
+            baseline_layer_centrality_dict, centrality_helper_class)
+
+
+def test_cached_layer_centrality(tmp_path, monkeypatch, nx_layer_dict, nodes, centrality_helper_class,
+                                 baseline_layer_centrality_dict):
+    cache = CoalitionTableCache(str(tmp_path / "cache"))
+
+    centrality_helper_class(nx_layer_dict, cache=cache)
+
+    # The second helper takes its values from the cache, in another layer order
+    def fail_to_compute(*_):
+        raise AssertionError("The layer combinations were computed instead of loaded from the cache")
+
+    monkeypatch.setattr(centrality_helper_class, "create_layer_combinations_node_centrality_dict", fail_to_compute)
+
+    reordered_nx_layer_dict = {layer: nx_layer_dict[layer] for layer in reversed(list(nx_layer_dict))}
+    centrality_helper = centrality_helper_class(reordered_nx_layer_dict, cache=cache)
+
+    assert_layer_centrality_equal(
+        compute_multinet_layer_centrality(reordered_nx_layer_dict, nodes, centrality_helper),
+        baseline_layer_centrality_dict, centrality_helper_class)
+
+
+def test_spilled_layer_centrality(nx_layer_dict, nodes, centrality_helper_class, baseline_layer_centrality_dict):
+    with centrality_helper_class(nx_layer_dict, memory_budget=500, spill_to_disk=True) as centrality_helper:
+        coalition_node_centrality_dict = centrality_helper.coalition_node_centrality_dict
+
+        # All layer combinations are kept, most of them on disk
+        assert isinstance(coalition_node_centrality_dict, CoalitionValueStore)
+        assert len(coalition_node_centrality_dict) == centrality_helper.coalition_index.full_coalition_mask
+        assert coalition_node_centrality_dict.memory_usage <= 500
+
+        assert_layer_centrality_equal(
+            compute_multinet_layer_centrality(nx_layer_dict, nodes, centrality_helper),
+            baseline_layer_centrality_dict, centrality_helper_class)
+
+
+@pytest.mark.parametrize("number_of_workers", [1, 2])
+def test_snapshot_loaded_layer_centrality(tmp_path, multinet_path, nodes, centrality_helper_class,
+                                          baseline_layer_centrality_dict, number_of_workers):
+    snapshot_path = str(tmp_path / "synthetic.snapshot")
+    DatasetHelper(multinet_path).save_snapshot(snapshot_path)
+
+    dataset = DatasetHelper(snapshot_path, verify_snapshot=True)
+    assert dataset.get_node_list() == nodes
+    assert not dataset.has_nx_layer_dict()
+
+    # The helpers work on the memory-mapped CSR matrices of the snapshot, without networkx layers
+    with centrality_helper_class(
+            None, number_of_workers=number_of_workers, layer_adjacency=dataset.get_layer_adjacency()
+    ) as centrality_helper:
+        assert_layer_centrality_equal(
+            compute_multinet_layer_centrality(None, nodes, centrality_helper),
+            baseline_layer_centrality_dict, centrality_helper_class)
+
+    assert not dataset.has_nx_layer_dict()
+
+
+@pytest.mark.parametrize("centrality_helper_kwargs", [
+    {}, {'memory_budget': 1000}, {'use_sparse_adjacency': False}], ids=["table", "store", "networkx"])
+def test_updated_layer_centrality(nx_layer_dict, nodes, centrality_helper_class, centrality_helper_kwargs):
+    helper_nx_layer_dict = copy_nx_layer_dict(nx_layer_dict)
+    centrality_helper = centrality_helper_class(helper_nx_layer_dict, **centrality_helper_kwargs)
+    nodes_layer_centrality_dict = compute_vectorized_multinet_layer_centrality(
+        helper_nx_layer_dict, nodes, centrality_helper)
+    previous_nodes_layer_centrality_dict = {node: dict(value_dict) for node, value_dict in
+                                            nodes_layer_centrality_dict.items()}
+
+    updated_nodes = update_multinet_layers_centrality(
+        nodes_layer_centrality_dict, helper_nx_layer_dict, centrality_helper, LAYER_EDGE_DELTA_DICT)
+
+    apply_layer_edge_delta(nx_layer_dict, LAYER_EDGE_DELTA_DICT)
+    baseline_layer_centrality_dict = compute_baseline_layer_centrality(nx_layer_dict, nodes, centrality_helper_class)
+
+    assert_layer_centrality_equal(nodes_layer_centrality_dict, baseline_layer_centrality_dict, centrality_helper_class)
+
+    # The nodes which were not recomputed keep their previous layer centrality
+    for node in set(nodes) - set(updated_nodes):
+        assert nodes_layer_centrality_dict[node] == previous_nodes_layer_centrality_dict[node]
+
+    # The updated helper holds the same layer combinations as a helper of the updated network
+    fresh_centrality_helper = centrality_helper_class(copy_nx_layer_dict(nx_layer_dict), **centrality_helper_kwargs)
+
+    for coalition_mask in centrality_helper.coalition_index.get_coalition_masks():
+        assert_allclose(
+            centrality_helper.coalition_node_centrality_dict.get_row(coalition_mask),
+            fresh_centrality_helper.coalition_node_centrality_dict.get_row(coalition_mask), rtol=1e-7, atol=1e-12)
+
+
+def test_layer_updates_match_multi_layer_update(nx_layer_dict, nodes, centrality_helper_class):
+    layer_nx_layer_dict = copy_nx_layer_dict(nx_layer_dict)
+    layer_centrality_helper = centrality_helper_class(layer_nx_layer_dict)
+    layer_nodes_layer_centrality_dict = compute_vectorized_multinet_layer_centrality(
+        layer_nx_layer_dict, nodes, layer_centrality_helper)
+
+    for layer, (added_edges, removed_edges) in LAYER_EDGE_DELTA_DICT.items():
+        update_multinet_layer_centrality(
+            layer_nodes_layer_centrality_dict, layer_nx_layer_dict, layer_centrality_helper, layer, added_edges,
+            removed_edges)
+
+    # Each layer combination which contains a changed layer is recomputed once
+    recomputed_coalition_mask_list = []
+    centrality_helper = centrality_helper_class(nx_layer_dict)
+    nodes_layer_centrality_dict = compute_vectorized_multinet_layer_centrality(nx_layer_dict, nodes, centrality_helper)
+    coalition_node_centrality_dict = centrality_helper.coalition_node_centrality_dict
+    set_row = coalition_node_centrality_dict.set_row
+
+    def record_row(coalition_mask, coalition_node_row):
+        recomputed_coalition_mask_list.append(coalition_mask)
+        set_row(coalition_mask, coalition_node_row)
+
+    coalition_node_centrality_dict.set_row = record_row
+
+    update_multinet_layers_centrality(nodes_layer_centrality_dict, nx_layer_dict, centrality_helper,
+                                      LAYER_EDGE_DELTA_DICT)
+
+    # All layer combinations are recomputed when a parameter of the measure changes, e.g. the katz alpha
+    changed_layers_mask = centrality_helper.coalition_index.get_coalition_mask(LAYER_EDGE_DELTA_DICT)
+
+    assert len(recomputed_coalition_mask_list) == len(set(recomputed_coalition_mask_list))
+    assert set(recomputed_coalition_mask_list) >= set(
+        coalition_mask for coalition_mask in centrality_helper.coalition_index.get_coalition_masks()
+        if coalition_mask & changed_layers_mask)
+
+    assert_layer_centrality_equal(
+        nodes_layer_centrality_dict, layer_nodes_layer_centrality_dict, centrality_helper_class)
+
+
+def test_katz_update_recomputes_only_changed_components(nx_layer_dict):
+    # A new component of two nodes does not change the largest eigenvalue of a layer, so alpha stays the same and
+    # only the new component is solved again on the facebook layer
+    centrality_helper = KatzCentralityHelper(copy_nx_layer_dict(nx_layer_dict))
+    alpha = centrality_helper.get_centrality_parameter_dict()['alpha']
+    recomputed_node_set_dict = {}
+    compute_coalition_node_centrality_subarray = centrality_helper.compute_coalition_node_centrality_subarray
+
+    def record_coalition_node_centrality_subarray(coalition_mask, node_index_array):
+        recomputed_node_set_dict[coalition_mask] = set(centrality_helper.node_list[i] for i in node_index_array)
+
+        return compute_coalition_node_centrality_subarray(coalition_mask, node_index_array)
+
+    centrality_helper.compute_coalition_node_centrality_subarray = record_coalition_node_centrality_subarray
+    centrality_helper.update_layer_edges("facebook", [("n21", "n22")])
+
+    assert centrality_helper.get_centrality_parameter_dict()['alpha'] == alpha
+
+    facebook_mask = centrality_helper.coalition_index.get_coalition_mask(("facebook",))
+    assert recomputed_node_set_dict[facebook_mask] == {"n21", "n22"}
+
+    apply_layer_edge_delta(nx_layer_dict, {"facebook": ([("n21", "n22")], [])})
+    fresh_centrality_helper = KatzCentralityHelper(nx_layer_dict)
+
+    for coalition_mask in centrality_helper.coalition_index.get_coalition_masks():
+        assert_allclose(
+            centrality_helper.coalition_node_centrality_dict.get_row(coalition_mask),
+            fresh_centrality_helper.coalition_node_centrality_dict.get_row(coalition_mask), rtol=1e-7)
+
+
+def test_temporal_layer_centrality(nx_layer_dict, nodes, centrality_helper_class):
+    updated_nx_layer_dict = copy_nx_layer_dict(nx_layer_dict)
+    apply_layer_edge_delta(updated_nx_layer_dict, LAYER_EDGE_DELTA_DICT)
+
+    nx_layer_dict_list = [nx_layer_dict, updated_nx_layer_dict, nx_layer_dict]
+
+    layer_centrality_cube, layer_list = compute_temporal_multinet_layer_centrality(
+        nx_layer_dict_list, nodes, centrality_helper_class)
+
+    for time_index, snapshot_nx_layer_dict in enumerate(nx_layer_dict_list):
+        baseline_layer_centrality_dict = compute_baseline_layer_centrality(
+            snapshot_nx_layer_dict, nodes, centrality_helper_class)
+
+        assert_layer_centrality_equal(
+            {node: dict(zip(layer_list, layer_centrality_cube[node_index, :, time_index]))
+             for node_index, node in enumerate(nodes)},
+            baseline_layer_centrality_dict, centrality_helper_class)
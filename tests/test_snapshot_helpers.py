@@ -0,0 +1,107 @@
+import json
+import pytest
+from numpy import array, int32
+from numpy.testing import assert_array_equal
+from layer_centrality.utils.dataset_helpers import DatasetHelper
+from layer_centrality.utils.snapshot_helpers import NETWORK_SNAPSHOT_ALIGNMENT, NETWORK_SNAPSHOT_PREFIX, \
+    NETWORK_SNAPSHOT_VERSION, is_network_snapshot, load_network_snapshot, save_network_snapshot
+
+
+@pytest.fixture
+def dataset(multinet_path):
+    return DatasetHelper(multinet_path)
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, dataset):
+    path = str(tmp_path / "synthetic.snapshot")
+    dataset.save_snapshot(path)
+
+    return path
+
+
+def read_snapshot_header(path):
+    with open(path, 'rb') as snapshot_file:
+        snapshot_prefix = snapshot_file.read(NETWORK_SNAPSHOT_PREFIX.size)
+        _, _, header_length = NETWORK_SNAPSHOT_PREFIX.unpack(snapshot_prefix)
+
+        header_dict = json.loads(snapshot_file.read(header_length).decode('utf-8'))
+
+    return header_dict, NETWORK_SNAPSHOT_PREFIX.size + header_length
+
+
+def test_snapshot_round_trip(dataset, snapshot_path):
+    node_list, layer_list, layer_node_id_array_dict, layer_csr_matrix_dict, snapshot_hash = load_network_snapshot(
+        snapshot_path, verify=True)
+
+    assert is_network_snapshot(snapshot_path)
+    assert node_list == dataset.get_node_list()
+    assert layer_list == dataset.get_layer_names_list()
+    assert snapshot_hash == read_snapshot_header(snapshot_path)[0]['sha256']
+
+    for layer in layer_list:
+        assert_array_equal(layer_node_id_array_dict[layer], dataset.get_layer_node_id_array(layer))
+        assert (layer_csr_matrix_dict[layer] != dataset.get_layer_csr_matrix(layer)).nnz == 0
+
+        # The arrays are read-only views of the memory-mapped file
+        assert not layer_csr_matrix_dict[layer].indices.flags.writeable
+        assert not layer_csr_matrix_dict[layer].indices.flags.owndata
+
+
+def test_snapshot_arrays_are_aligned(snapshot_path):
+    header_dict, _ = read_snapshot_header(snapshot_path)
+
+    for array_offset, _, _ in header_dict['arrays'].values():
+        assert array_offset % NETWORK_SNAPSHOT_ALIGNMENT == 0
+
+    _, _, _, layer_csr_matrix_dict, _ = load_network_snapshot(snapshot_path)
+
+    # The data starts at an aligned offset of the file, whose mapping starts at a page boundary
+    for layer_csr_matrix in layer_csr_matrix_dict.values():
+        for snapshot_array in (layer_csr_matrix.indptr, layer_csr_matrix.indices):
+            assert snapshot_array.ctypes.data % NETWORK_SNAPSHOT_ALIGNMENT == 0
+
+
+def test_snapshot_checksum_mismatch(snapshot_path):
+    header_dict, header_end = read_snapshot_header(snapshot_path)
+    data_offset = header_end + -header_end % NETWORK_SNAPSHOT_ALIGNMENT
+
+    # Corrupt the first character of the actor table
+    with open(snapshot_path, 'r+b') as snapshot_file:
+        snapshot_file.seek(data_offset + header_dict['arrays']['node_names'][0])
+        snapshot_file.write(b'x')
+
+    with pytest.raises(ValueError, match="corrupted"):
+        load_network_snapshot(snapshot_path, verify=True)
+
+    with pytest.raises(ValueError, match="corrupted"):
+        DatasetHelper(snapshot_path, verify_snapshot=True)
+
+    # Without verification the file is only mapped
+    assert load_network_snapshot(snapshot_path)[0][0].startswith('x')
+
+
+def test_snapshot_version_mismatch(snapshot_path):
+    with open(snapshot_path, 'r+b') as snapshot_file:
+        magic, _, header_length = NETWORK_SNAPSHOT_PREFIX.unpack(snapshot_file.read(NETWORK_SNAPSHOT_PREFIX.size))
+        snapshot_file.seek(0)
+        snapshot_file.write(NETWORK_SNAPSHOT_PREFIX.pack(magic, NETWORK_SNAPSHOT_VERSION + 1, header_length))
+
+    with pytest.raises(ValueError, match="version"):
+        load_network_snapshot(snapshot_path)
+
+
+def test_not_a_snapshot(multinet_path):
+    assert not is_network_snapshot(multinet_path)
+
+    with pytest.raises(ValueError, match="not a network snapshot"):
+        load_network_snapshot(multinet_path)
+
+
+def test_snapshot_rejects_invalid_actor_names(tmp_path, dataset):
+    layer = dataset.get_layer_names_list()[0]
+
+    with pytest.raises(ValueError, match="null characters"):
+        save_network_snapshot(
+            str(tmp_path / "invalid.snapshot"), ["a\x00b"], [layer], {layer: array([0], dtype=int32)},
+            {layer: dataset.get_layer_csr_matrix(layer)[:1, :1]})
@@ -0,0 +1,94 @@
+from os import listdir
+from os.path import exists
+import pytest
+from numpy import arange, array, nan
+from numpy.testing import assert_array_equal
+from layer_centrality.utils.store_helpers import CoalitionValueStore, CoalitionValueTable
+
+
+NODE_LIST = ["a", "b", "c", "d"]
+
+# Room for two rows of 4 float64 values
+MEMORY_BUDGET = 64
+
+
+def create_coalition_node_row(coalition_mask):
+    return arange(len(NODE_LIST), dtype=float) + 10 * coalition_mask
+
+
+def test_store_spills_rows_to_disk():
+    coalition_value_store = CoalitionValueStore(NODE_LIST, memory_budget=MEMORY_BUDGET, spill_to_disk=True)
+
+    for coalition_mask in range(1, 8):
+        coalition_value_store.set_row(coalition_mask, create_coalition_node_row(coalition_mask))
+
+    assert coalition_value_store.memory_usage <= MEMORY_BUDGET
+    assert sorted(coalition_value_store) == list(range(1, 8))
+
+    spill_directory = coalition_value_store._CoalitionValueStore__spill_directory
+    assert len(listdir(spill_directory)) == 5
+
+    # A spilled row is loaded back, which spills the least recently used row in memory
+    for coalition_mask in range(1, 8):
+        assert_array_equal(coalition_value_store.get_row(coalition_mask), create_coalition_node_row(coalition_mask))
+
+    assert coalition_value_store.memory_usage <= MEMORY_BUDGET
+    assert len(listdir(spill_directory)) == 5
+
+    del coalition_value_store[1]
+
+    assert 1 not in coalition_value_store
+    assert len(coalition_value_store) == 6
+
+    coalition_value_store.close()
+
+    assert not exists(spill_directory)
+    assert len(coalition_value_store) == 0
+
+
+def test_store_recomputes_evicted_rows():
+    computed_coalition_mask_list = []
+
+    def compute_missing_row(coalition_mask):
+        computed_coalition_mask_list.append(coalition_mask)
+
+        return create_coalition_node_row(coalition_mask)
+
+    coalition_value_store = CoalitionValueStore(
+        NODE_LIST, memory_budget=MEMORY_BUDGET, missing_row_function=compute_missing_row)
+
+    for coalition_mask in range(1, 8):
+        coalition_value_store.set_row(coalition_mask, create_coalition_node_row(coalition_mask))
+
+    # Only the two most recently used rows are kept
+    assert sorted(coalition_value_store) == [6, 7]
+
+    assert_array_equal(coalition_value_store.get_row(1), create_coalition_node_row(1))
+    assert_array_equal(coalition_value_store.get_row(7), create_coalition_node_row(7))
+    assert computed_coalition_mask_list == [1]
+
+
+def test_store_without_missing_row_function_raises_key_error():
+    coalition_value_store = CoalitionValueStore(NODE_LIST, memory_budget=MEMORY_BUDGET)
+
+    for coalition_mask in range(1, 4):
+        coalition_value_store.set_row(coalition_mask, create_coalition_node_row(coalition_mask))
+
+    with pytest.raises(KeyError):
+        coalition_value_store.get_row(1)
+
+
+def test_coalition_value_mappings_have_the_same_dictionary_view():
+    coalition_value_table = CoalitionValueTable(NODE_LIST, 4)
+    coalition_value_store = CoalitionValueStore(NODE_LIST, memory_budget=MEMORY_BUDGET, spill_to_disk=True)
+
+    for coalition_value_mapping in (coalition_value_table, coalition_value_store):
+        coalition_value_mapping[1] = {"a": 1.0, "c": 3.0}
+        coalition_value_mapping[2] = {"b": 2.0}
+        coalition_value_mapping[3] = {"d": 4.0}
+
+        assert dict(coalition_value_mapping[1]) == {"a": 1.0, "c": 3.0}
+        assert "b" not in coalition_value_mapping[1]
+        assert_array_equal(coalition_value_mapping.get_row(2), array([nan, 2.0, nan, nan]))
+
+    coalition_value_store.close()